@@ -30,9 +30,12 @@ from .llms import (
 
 from .noisers import (
     ContextNoiser,
+    NoiserChain,
     # Add other noisers here
 )
 
+from .orchestrators import DefaultOrchestrator, ShardedOrchestrator
+
 __version__ = "0.1.0"
 
 __all__ = [
@@ -61,5 +64,10 @@ __all__ = [
     "HuggingFaceLLM",
     
     # Noisers
-    "ContextNoiser"
+    "ContextNoiser",
+    "NoiserChain",
+    
+    # Orchestrators
+    "DefaultOrchestrator",
+    "ShardedOrchestrator"
 ]
@@ -13,6 +13,13 @@ from .base_orchestrator import BaseOrchestrator
 
 # Model connectivity
 from .model_connector import ModelConnector, ModelType
+from .cache import ResponseCache
+from .journal import RunJournal
+from .dedup import NearDuplicateFilter
+from .retry import RetryPolicy, classify_error, parse_retry_after
+from .resilience import AdaptiveConcurrencyLimiter, CircuitBreaker, ProviderGuard
+from .http import SessionRegistry, get_session, close_sessions
+from .inference_engine import InferenceEngine, VLLMEngine, TransformersEngine, create_engine
 
 # Exceptions
 from .exceptions import (
@@ -24,6 +31,7 @@ from .exceptions import (
     ModelError,
     ModelConnectionError,
     ModelAPIError,
+    CircuitOpenError,
     ModelTokenLimitError,
     PipelineError,
     DataError,
@@ -38,7 +46,10 @@ from .utils import (
     setup_logging,
     load_config,
     save_results,
+    load_jsonl_keys,
     retry_with_exponential_backoff,
+    gather_with_concurrency,
+    run_sync,
     validate_config_schema,
     merge_configs,
     get_timestamp,
@@ -55,6 +66,22 @@ __all__ = [
     # Model connectivity
     "ModelConnector",
     "ModelType",
+    "ResponseCache",
+    "RunJournal",
+    "NearDuplicateFilter",
+    "RetryPolicy",
+    "classify_error",
+    "parse_retry_after",
+    "AdaptiveConcurrencyLimiter",
+    "CircuitBreaker",
+    "ProviderGuard",
+    "SessionRegistry",
+    "get_session",
+    "close_sessions",
+    "InferenceEngine",
+    "VLLMEngine",
+    "TransformersEngine",
+    "create_engine",
     
     # Exceptions
     "WeaveError",
@@ -65,6 +92,7 @@ __all__ = [
     "ModelError",
     "ModelConnectionError",
     "ModelAPIError",
+    "CircuitOpenError",
     "ModelTokenLimitError",
     "PipelineError",
     "DataError",
@@ -77,7 +105,10 @@ __all__ = [
     "setup_logging",
     "load_config",
     "save_results",
+    "load_jsonl_keys",
     "retry_with_exponential_backoff",
+    "gather_with_concurrency",
+    "run_sync",
     "validate_config_schema",
     "merge_configs",
     "get_timestamp",
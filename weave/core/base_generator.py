@@ -1,5 +1,11 @@
+import logging
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional, Tuple, Union
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from .dedup import NearDuplicateFilter
+from .exceptions import GenerationError, NotImplementedInBaseClassError
+from .utils import gather_with_concurrency
 
 class BaseGenerator(ABC):
     """Abstract base class for all data generators in the Weave framework.
@@ -9,6 +15,11 @@ class BaseGenerator(ABC):
     their reference answers.
     """
     
+    # Builds the fused chain used with config ``fuse_noisers`` from a list of
+    # noisers (e.g. ``weave.noisers.NoiserChain``). Core does not depend on
+    # the noisers package, so concrete generators plug the chain in.
+    noiser_chain_factory: Optional[Callable[[List[Any]], Any]] = None
+    
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         """Initialize the generator with optional configuration.
         
@@ -16,6 +27,7 @@ class BaseGenerator(ABC):
             config: Optional dictionary containing generator-specific configuration.
         """
         self.config = config or {}
+        self.logger = logging.getLogger(self.__class__.__module__)
         
     @abstractmethod
     def generate(self) -> Tuple[str, Union[str, Dict[str, Any]]]:
@@ -47,6 +59,332 @@ class BaseGenerator(ABC):
         """
         raise NotImplementedError
         
+    def _build_prompt(self) -> Optional[str]:
+        """Render the LLM prompt for one sample.
+        
+        Generators backed by a ``model`` connector override this together with
+        ``_parse_response`` so batches can share prompts. The default returns
+        None, meaning samples are produced only through ``generate``.
+        
+        Returns:
+            The rendered prompt, or None if the sample does not use an LLM.
+        """
+        return None
+        
+    def _parse_response(self, response: str) -> Tuple[str, Union[str, Dict[str, Any]]]:
+        """Parse an LLM response to a prompt from ``_build_prompt``.
+        
+        Args:
+            response: Raw model output.
+            
+        Returns:
+            A (query, reference) tuple before noising.
+            
+        Raises:
+            GenerationError: If the response cannot be parsed.
+        """
+        raise NotImplementedInBaseClassError(self.__class__.__name__, "_parse_response")
+        
+    def _generation_params(self) -> Dict[str, Any]:
+        """Sampling parameters used with prompts from ``_build_prompt``."""
+        return {}
+        
+    async def _apply_noisers(
+        self,
+        query: str,
+        reference: Union[str, Dict[str, Any]]
+    ) -> Tuple[str, Union[str, Dict[str, Any]]]:
+        """Apply the generator's noisers (``self.noisers``) to a query in sequence.
+        
+        A failing noiser is logged and skipped. When the reference is a
+        dictionary, the metadata of every applied noiser is recorded under
+        ``noise_metadata``.
+        
+        With config ``fuse_noisers``, the noisers run as one chain built by
+        ``noiser_chain_factory`` (a ``NoiserChain`` combines adjacent LLM
+        noisers into one call); if the chain fails, the noisers are applied
+        one by one as usual.
+        
+        Args:
+            query: Generated query text.
+            reference: Reference answer for the query.
+            
+        Returns:
+            The (noised query, reference) tuple.
+        """
+        noisers = getattr(self, "noisers", None)
+        if not noisers:
+            return query, reference
+            
+        noised_query = None
+        if self.config.get("fuse_noisers", False) and self.noiser_chain_factory is not None:
+            try:
+                # Building the chain renders each noiser's prompt, which fails
+                # for a misconfigured noiser
+                chain = self._get_noiser_chain(noisers)
+                noised_query = await chain.aaugment(query)
+                noise_metadata = chain.get_member_metadata()
+            except Exception as e:
+                self.logger.warning(f"Noiser chain failed, applying noisers separately: {str(e)}")
+                
+        if noised_query is None:
+            # Keep track of noise transformations
+            noise_metadata = []
+            
+            # Apply each noiser in sequence
+            noised_query = query
+            for noiser in noisers:
+                try:
+                    noised_query = await noiser.aaugment(noised_query)
+                    noise_metadata.append(noiser.get_augmentation_metadata())
+                except Exception as e:
+                    self.logger.warning(f"Noiser {noiser} failed: {str(e)}")
+                    
+        if isinstance(reference, dict):
+            reference["noise_metadata"] = noise_metadata
+            
+        return noised_query, reference
+        
+    def _get_noiser_chain(self, noisers: List[Any]) -> Any:
+        """Get the fused chain for the current noisers, rebuilding it if they changed."""
+        key = tuple(id(noiser) for noiser in noisers)
+        cached = getattr(self, "_noiser_chain", None)
+        if cached is None or cached[0] != key:
+            cached = (key, self.noiser_chain_factory(noisers))
+            self._noiser_chain = cached
+        return cached[1]
+        
+    async def _run_batch(
+        self,
+        batch_size: int,
+        max_concurrency: Optional[int] = None,
+        return_exceptions: bool = True,
+        use_batch_api: Optional[bool] = None
+    ) -> List[Union[Tuple[str, Union[str, Dict[str, Any]]], GenerationError]]:
+        """Generate a batch of samples concurrently, preserving order.
+        
+        When every sample renders an LLM prompt and the model supports
+        ``generate_many``, samples with an identical prompt are requested
+        together as multiple completions of one call (up to
+        ``config["max_samples_per_prompt"]``, default 8), so the prompt tokens
+        and round-trip are paid once per group. Set
+        ``config["share_prompts"] = False`` to always call ``generate`` per
+        sample.
+        
+        With ``use_batch_api`` the same requests are submitted as one offline
+        batch job instead (see ``OpenAILLM.run_batch_job``), which is cheaper
+        per token but may take hours to complete.
+        
+        With ``config["dedup"]`` (see ``NearDuplicateFilter.from_config``),
+        samples whose query nearly duplicates one generated earlier, in this
+        or a previous batch, are dropped, so the batch may come back shorter
+        than ``batch_size``.
+        
+        Args:
+            batch_size: Number of samples to generate.
+            max_concurrency: Maximum number of concurrent model calls. Defaults
+                to ``config["max_concurrency"]`` (8 if unset).
+            return_exceptions: If True, a failed sample is returned as a
+                GenerationError at its position instead of aborting the batch.
+            use_batch_api: Route the batch through an offline batch job.
+                Defaults to ``config["use_batch_api"]`` (False if unset).
+                
+        Returns:
+            List of (query, reference) tuples, with GenerationError entries for
+            failed samples when ``return_exceptions`` is True. Near-duplicates
+            are left out when deduplication is enabled.
+            
+        Raises:
+            GenerationError: If a sample fails and ``return_exceptions`` is False,
+                or if a batch job is requested but cannot be used.
+        """
+        max_concurrency = max_concurrency or self.config.get("max_concurrency", 8)
+        if use_batch_api is None:
+            use_batch_api = self.config.get("use_batch_api", False)
+            
+        model = getattr(self, "model", None)
+        if use_batch_api:
+            if not hasattr(model, "run_batch_job"):
+                raise GenerationError(
+                    f"{model.__class__.__name__} does not support batch jobs"
+                )
+            prompts = [self._build_prompt() for _ in range(batch_size)]
+            if any(prompt is None for prompt in prompts):
+                raise GenerationError(
+                    f"{self.__class__.__name__} samples are not generated by an LLM "
+                    "and cannot be routed through a batch job"
+                )
+            samples = await self._run_batch_job(prompts)
+        else:
+            prompts = []
+            if self.config.get("share_prompts", True) and hasattr(model, "generate_many"):
+                prompts = [self._build_prompt() for _ in range(batch_size)]
+                
+            if prompts and all(prompt is not None for prompt in prompts):
+                samples = await self._run_shared_prompt_batch(prompts, max_concurrency)
+            else:
+                samples = await gather_with_concurrency(
+                    [self.generate] * batch_size,
+                    max_concurrency=max_concurrency,
+                    return_exceptions=True
+                )
+                
+        for index, result in enumerate(samples):
+            if isinstance(result, Exception):
+                self.logger.error(f"Sample {index} failed: {str(result)}")
+                if not return_exceptions:
+                    raise result
+                    
+        dedup = self._get_dedup_filter()
+        if dedup is not None:
+            samples = await self._drop_near_duplicates(samples, dedup)
+            
+        return samples
+        
+    def _get_dedup_filter(self) -> Optional[NearDuplicateFilter]:
+        """Get the near-duplicate filter configured by ``config["dedup"]``.
+        
+        The filter is built once and kept, so duplicates are caught across
+        batches as well as within one.
+        """
+        if not hasattr(self, "_dedup_filter"):
+            self._dedup_filter = NearDuplicateFilter.from_config(self.config.get("dedup"))
+        return self._dedup_filter
+        
+    async def _drop_near_duplicates(
+        self,
+        samples: List[Any],
+        dedup: NearDuplicateFilter
+    ) -> List[Any]:
+        """Remove samples whose query nearly duplicates an earlier one.
+        
+        Failed samples are kept so callers still see their errors.
+        """
+        positions = [index for index, sample in enumerate(samples) if not isinstance(sample, Exception)]
+        keep = await dedup.afilter([samples[index][0] for index in positions])
+        dropped = {index for index, kept in zip(positions, keep) if not kept}
+        if dropped:
+            self.logger.info(f"Dropped {len(dropped)} near-duplicate samples of {len(samples)}")
+        return [sample for index, sample in enumerate(samples) if index not in dropped]
+        
+    def _group_prompts(self, prompts: List[str], share: bool = True) -> List[Tuple[str, List[int]]]:
+        """Group sample indices by prompt.
+        
+        Args:
+            prompts: One rendered prompt per sample.
+            share: Whether identical prompts may be sampled together. Groups
+                hold at most ``config["max_samples_per_prompt"]`` (default 8)
+                samples.
+                
+        Returns:
+            List of (prompt, sample indices) groups in first-seen order.
+        """
+        if not share:
+            return [(prompt, [index]) for index, prompt in enumerate(prompts)]
+            
+        max_per_call = self.config.get("max_samples_per_prompt", 8)
+        groups: "OrderedDict[str, List[int]]" = OrderedDict()
+        for index, prompt in enumerate(prompts):
+            groups.setdefault(prompt, []).append(index)
+            
+        return [
+            (prompt, indices[start:start + max_per_call])
+            for prompt, indices in groups.items()
+            for start in range(0, len(indices), max_per_call)
+        ]
+        
+    async def _collect_samples(
+        self,
+        responses: List[str],
+        indices: List[int],
+        results: List[Any]
+    ) -> None:
+        """Parse and noise the completions of one prompt group into ``results``."""
+        for position, index in enumerate(indices):
+            try:
+                if position >= len(responses):
+                    raise GenerationError("Model returned fewer completions than requested")
+                query, reference = self._parse_response(responses[position])
+                results[index] = await self._apply_noisers(query, reference)
+            except Exception as e:
+                results[index] = e if isinstance(e, GenerationError) else GenerationError(str(e))
+                
+    async def _run_shared_prompt_batch(
+        self,
+        prompts: List[str],
+        max_concurrency: int
+    ) -> List[Union[Tuple[str, Union[str, Dict[str, Any]]], GenerationError]]:
+        """Complete pre-rendered prompts, grouping identical ones into one call.
+        
+        Args:
+            prompts: One rendered prompt per sample.
+            max_concurrency: Maximum number of concurrent model calls.
+            
+        Returns:
+            Samples (or GenerationError entries) in prompt order.
+        """
+        params = self._generation_params()
+        results: List[Any] = [None] * len(prompts)
+        
+        def make_job(prompt: str, indices: List[int]):
+            async def job() -> None:
+                try:
+                    responses = await self.model.generate_many(prompt, n=len(indices), **params)
+                except Exception as e:
+                    for index in indices:
+                        results[index] = GenerationError(f"Generation failed: {str(e)}")
+                    return
+                await self._collect_samples(responses, indices, results)
+            return job
+            
+        jobs = [make_job(prompt, indices) for prompt, indices in self._group_prompts(prompts)]
+        await gather_with_concurrency(jobs, max_concurrency=max_concurrency)
+        return results
+        
+    async def _run_batch_job(
+        self,
+        prompts: List[str]
+    ) -> List[Union[Tuple[str, Union[str, Dict[str, Any]]], GenerationError]]:
+        """Complete pre-rendered prompts through one offline batch job.
+        
+        Identical prompts share a request (and its prompt tokens) unless
+        ``config["share_prompts"]`` is False. ``config["batch_poll_interval"]``
+        and ``config["batch_timeout"]`` control polling; a job that times out
+        is cancelled rather than left running.
+        
+        Args:
+            prompts: One rendered prompt per sample.
+            
+        Returns:
+            Samples (or GenerationError entries) in prompt order.
+        """
+        params = self._generation_params()
+        groups = self._group_prompts(prompts, share=self.config.get("share_prompts", True))
+        requests = [
+            self.model.build_batch_request(f"sample-{indices[0]}", prompt, n=len(indices), **params)
+            for prompt, indices in groups
+        ]
+        
+        try:
+            job_results = await self.model.run_batch_job(
+                requests,
+                poll_interval=self.config.get("batch_poll_interval"),
+                timeout=self.config.get("batch_timeout")
+            )
+        except Exception as e:
+            return [GenerationError(f"Batch job failed: {str(e)}") for _ in prompts]
+            
+        results: List[Any] = [None] * len(prompts)
+        for request, (_, indices) in zip(requests, groups):
+            responses = job_results.get(request["custom_id"])
+            if isinstance(responses, Exception):
+                for index in indices:
+                    results[index] = GenerationError(f"Generation failed: {str(responses)}")
+                continue
+            await self._collect_samples(responses or [], indices, results)
+            
+        return results
+        
     def validate_config(self) -> bool:
         """Validate the generator's configuration.
         
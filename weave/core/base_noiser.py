@@ -1,12 +1,40 @@
-from abc import ABC, abstractmethod
+import json
+import asyncio
+import inspect
+import logging
+from abc import ABC
+from functools import partial
 from typing import Any, Dict, List, Optional, Union
 
+from .exceptions import NoiserError, NotImplementedInBaseClassError
+from .utils import gather_with_concurrency, run_sync
+
+# Stands in for the input text when a noiser prompt is used for a packed batch
+PACKED_TEXT_PLACEHOLDER = "[each of the numbered texts below]"
+
+PACKED_PROMPT_SUFFIX = """
+
+Apply the instructions above to each of the following {count} numbered texts independently.
+
+{texts}
+
+Return only a JSON array with exactly {count} objects, in the same order, each of the form
+{{"id": <text number>, "text": "<transformed text>"}}.
+"""
+
+# Tokens of numbering and JSON syntax per packed item
+PACKED_ITEM_OVERHEAD = 16
+
 class BaseNoiser(ABC):
     """Abstract base class for all data noisers/augmenters in the Weave framework.
     
     Noisers are responsible for applying transformations, augmentations, or
     "noise" to the generated data. This could include style changes, typos,
     persona modifications, etc.
+    
+    The interface is async-first: subclasses implement ``aaugment`` (and
+    optionally ``abatch_augment``), and ``augment``/``batch_augment`` are
+    provided as synchronous wrappers.
     """
     
     def __init__(self, config: Optional[Dict[str, Any]] = None):
@@ -16,36 +44,299 @@ class BaseNoiser(ABC):
             config: Optional dictionary containing noiser-specific configuration.
         """
         self.config = config or {}
+        self.logger = logging.getLogger(__name__)
+        self.packing_stats = {"packed_calls": 0, "packed_items": 0, "fallback_items": 0}
+        
+    # Default number of queries augmented concurrently by abatch_augment
+    DEFAULT_BATCH_CONCURRENCY = 8
+    
+    # Default maximum number of queries per packed prompt
+    DEFAULT_MAX_PACK_SIZE = 16
+    
+    def __init_subclass__(cls, **kwargs: Any):
+        """Adopt ``async def augment``/``batch_augment`` as the async API.
         
-    @abstractmethod
-    def augment(self, query: str) -> str:
+        Noisers written before the async-first contract implemented
+        ``augment`` as a coroutine function. Those implementations become
+        ``aaugment``/``abatch_augment``; their own ``augment`` is kept, so
+        existing callers that await it keep working.
+        """
+        super().__init_subclass__(**kwargs)
+        for sync_name, async_name in (("augment", "aaugment"), ("batch_augment", "abatch_augment")):
+            method = cls.__dict__.get(sync_name)
+            if inspect.iscoroutinefunction(method) and async_name not in cls.__dict__:
+                setattr(cls, async_name, method)
+                
+    async def aaugment(self, query: str, **kwargs: Any) -> str:
         """Apply noise/augmentation to a single query.
         
+        This is the primary interface subclasses implement. Noisers that only
+        implement a synchronous ``augment`` (e.g. CPU-only transformations)
+        are run in a worker thread.
+        
         Args:
             query: The original query string to be transformed.
+            **kwargs: Noiser-specific options.
             
         Returns:
             The transformed/noised query string.
             
         Raises:
-            NotImplementedError: Must be implemented by subclasses.
+            NotImplementedInBaseClassError: If neither ``aaugment`` nor
+                ``augment`` is implemented.
         """
-        raise NotImplementedError
+        if type(self).augment is BaseNoiser.augment:
+            raise NotImplementedInBaseClassError("BaseNoiser", "aaugment")
+        result = await asyncio.to_thread(self.augment, query, **kwargs)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
         
-    @abstractmethod
-    def batch_augment(self, queries: List[str]) -> List[str]:
-        """Apply noise/augmentation to multiple queries.
+    async def abatch_augment(
+        self,
+        queries: List[str],
+        max_concurrency: Optional[int] = None,
+        return_exceptions: bool = True,
+        packed: Optional[bool] = None,
+        **kwargs: Any
+    ) -> List[Union[str, NoiserError]]:
+        """Apply noise/augmentation to multiple queries concurrently.
+        
+        At most ``max_concurrency`` LLM calls are in flight at once. Each
+        call still reserves capacity from its connector's rate limiter, so
+        fanning out never exceeds the connector's request or token budget; it
+        only stops a large batch from running one request at a time.
+        
+        In packed mode, several queries are numbered inside one prompt that
+        carries the noiser's instructions once, and the model answers with a
+        JSON array (see ``_augment_pack``). The number of queries per prompt
+        is chosen from the token budget. Queries whose result is missing or
+        unparseable are retried with single calls. Packing needs a noiser
+        that builds its prompt with ``_build_prompt``.
         
         Args:
             queries: List of original query strings.
+            max_concurrency: Maximum concurrent calls (default: config
+                ``max_concurrency``, else ``DEFAULT_BATCH_CONCURRENCY``).
+            return_exceptions: If True, a failed query yields a
+                ``NoiserError`` (with ``index`` and ``query`` set) at its
+                position instead of aborting the batch.
+            packed: Pack several queries per LLM call (default: config
+                ``packed``, else False).
+            **kwargs: Noiser-specific options passed to ``aaugment``.
             
         Returns:
-            List of transformed/noised query strings.
+            List of transformed/noised query strings (or errors), in input order.
             
         Raises:
-            NotImplementedError: Must be implemented by subclasses.
+            NoiserError: If a query fails and ``return_exceptions`` is False.
+        """
+        limit = max_concurrency or self.config.get("max_concurrency", self.DEFAULT_BATCH_CONCURRENCY)
+        packed = self.config.get("packed", False) if packed is None else packed
+        
+        if packed and getattr(self, "model", None) is not None:
+            instruction = self._build_prompt(PACKED_TEXT_PLACEHOLDER, **kwargs)
+            if instruction is not None:
+                return await self._packed_augment(queries, instruction, limit, return_exceptions, kwargs)
+                
+        return await self._augment_each(queries, list(range(len(queries))), limit, return_exceptions, kwargs)
+        
+    async def _augment_each(
+        self,
+        queries: List[str],
+        indices: List[int],
+        limit: int,
+        return_exceptions: bool,
+        kwargs: Dict[str, Any]
+    ) -> List[Union[str, NoiserError]]:
+        """Augment queries with one ``aaugment`` call each."""
+        async def augment_item(index: int, query: str) -> str:
+            try:
+                return await self.aaugment(query, **kwargs)
+            except Exception as e:
+                raise NoiserError(
+                    f"{self.__class__.__name__} failed on item {index}: {str(e)}",
+                    index=index,
+                    query=query
+                ) from e
+                
+        return await gather_with_concurrency(
+            [partial(augment_item, index, query) for index, query in zip(indices, queries)],
+            limit,
+            return_exceptions=return_exceptions
+        )
+        
+    def _build_prompt(self, text: str, **kwargs: Any) -> Optional[str]:
+        """Build the LLM prompt that transforms ``text``.
+        
+        Noisers whose ``aaugment`` is a single prompt-and-generate call
+        override this; the packed batch mode renders it once with a
+        placeholder as the shared instruction block.
+        
+        Returns:
+            The prompt, or None if the noiser does not work from one prompt.
+        """
+        return None
+        
+    def _generation_params(self, text: str) -> Dict[str, Any]:
+        """Generation parameters (``max_tokens``, ``temperature``) for ``text``."""
+        return {}
+        
+    def _count_tokens(self, texts: List[str]) -> List[int]:
+        """Count tokens with the model's tokenizer, or estimate them."""
+        count_tokens_batch = getattr(self.model, "count_tokens_batch", None)
+        if count_tokens_batch is not None:
+            return count_tokens_batch(texts)
+        return [len(text) // 4 + 1 for text in texts]
+        
+    def _plan_packs(self, queries: List[str], instruction: str) -> List[List[int]]:
+        """Group query indices into packs that fit the token budget.
+        
+        Each query costs its input tokens, its expected output (twice the
+        input, capped by its ``max_tokens``) and some numbering/JSON overhead.
+        Packs are filled greedily in input order up to the budget (config
+        ``packed_token_budget``, default 80% of the model's ``max_tokens``)
+        and ``max_pack_size`` queries.
+        """
+        model_limit = getattr(self.model, "config", {}).get("max_tokens", 4096)
+        budget = self.config.get("packed_token_budget", int(model_limit * 0.8))
+        max_pack_size = self.config.get("max_pack_size", self.DEFAULT_MAX_PACK_SIZE)
+        
+        counts = self._count_tokens([instruction + PACKED_PROMPT_SUFFIX] + queries)
+        overhead = counts[0]
+        
+        packs: List[List[int]] = []
+        current: List[int] = []
+        used = overhead
+        for index, (query, tokens) in enumerate(zip(queries, counts[1:])):
+            max_tokens = self._generation_params(query).get("max_tokens", 2 * tokens + 16)
+            cost = tokens + min(max_tokens, 2 * tokens + 16) + PACKED_ITEM_OVERHEAD
+            if current and (used + cost > budget or len(current) >= max_pack_size):
+                packs.append(current)
+                current, used = [], overhead
+            current.append(index)
+            used += cost
+        if current:
+            packs.append(current)
+        return packs
+        
+    async def _packed_augment(
+        self,
+        queries: List[str],
+        instruction: str,
+        limit: int,
+        return_exceptions: bool,
+        kwargs: Dict[str, Any]
+    ) -> List[Union[str, NoiserError]]:
+        """Augment queries in packs, falling back to single calls per item."""
+        results: List[Any] = [None] * len(queries)
+        packs = self._plan_packs(queries, instruction)
+        
+        async def run_pack(indices: List[int]) -> List[int]:
+            texts = await self._augment_pack(instruction, [queries[index] for index in indices])
+            missing = []
+            for index, text in zip(indices, texts):
+                if text is None:
+                    missing.append(index)
+                else:
+                    results[index] = text
+            return missing
+            
+        outcomes = await gather_with_concurrency(
+            [partial(run_pack, pack) for pack in packs],
+            limit,
+            return_exceptions=True
+        )
+        
+        fallback: List[int] = []
+        for pack, outcome in zip(packs, outcomes):
+            if isinstance(outcome, Exception):
+                self.logger.warning(f"Packed call for {len(pack)} items failed: {str(outcome)}")
+                fallback.extend(pack)
+            else:
+                fallback.extend(outcome)
+                
+        self.packing_stats["packed_calls"] += len(packs)
+        self.packing_stats["packed_items"] += len(queries) - len(fallback)
+        self.packing_stats["fallback_items"] += len(fallback)
+        
+        if fallback:
+            singles = await self._augment_each(
+                [queries[index] for index in fallback], fallback, limit, return_exceptions, kwargs
+            )
+            for index, result in zip(fallback, singles):
+                results[index] = result
+        return results
+        
+    async def _augment_pack(self, instruction: str, texts: List[str]) -> List[Optional[str]]:
+        """Transform several texts with one LLM call.
+        
+        Returns:
+            One entry per text: the transformed text, or None if the model's
+            answer did not contain a usable result for it.
+        """
+        numbered = "\n\n".join(f"{number}. {text}" for number, text in enumerate(texts, 1))
+        prompt = instruction + PACKED_PROMPT_SUFFIX.format(count=len(texts), texts=numbered)
+        
+        params = [self._generation_params(text) for text in texts]
+        counts = self._count_tokens(texts)
+        max_tokens = sum(
+            min(param.get("max_tokens", 2 * tokens + 16), 2 * tokens + 16) + PACKED_ITEM_OVERHEAD
+            for param, tokens in zip(params, counts)
+        )
+        temperature = params[0].get("temperature", 0.7) if params else 0.7
+        
+        response = await self.model.generate(prompt=prompt, max_tokens=max_tokens, temperature=temperature)
+        return self._parse_packed_response(response, len(texts))
+        
+    @staticmethod
+    def _parse_packed_response(response: str, count: int) -> List[Optional[str]]:
+        """Extract per-item texts from a packed JSON answer.
+        
+        Accepts an array of ``{"id": n, "text": ...}`` objects, matched by
+        ``id``, or a plain array of exactly ``count`` strings. Anything else
+        leaves the affected items as None.
+        """
+        texts: List[Optional[str]] = [None] * count
+        start, end = response.find("["), response.rfind("]")
+        if start < 0 or end <= start:
+            return texts
+        try:
+            items = json.loads(response[start:end + 1])
+        except json.JSONDecodeError:
+            return texts
+        if not isinstance(items, list):
+            return texts
+            
+        if all(isinstance(item, str) for item in items):
+            if len(items) == count:
+                texts = [item.strip() or None for item in items]
+            return texts
+            
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            number, text = item.get("id"), item.get("text")
+            if isinstance(number, int) and 1 <= number <= count and isinstance(text, str) and text.strip():
+                if texts[number - 1] is None:
+                    texts[number - 1] = text.strip()
+        return texts
+        
+    def augment(self, query: str, **kwargs: Any) -> str:
+        """Synchronous wrapper around ``aaugment``.
+        
+        Runs on the shared background loop (see ``run_sync``); use
+        ``aaugment`` from async code.
+        """
+        return run_sync(self.aaugment(query, **kwargs))
+        
+    def batch_augment(self, queries: List[str], **kwargs: Any) -> List[Union[str, NoiserError]]:
+        """Synchronous wrapper around ``abatch_augment``.
+        
+        Runs on the shared background loop (see ``run_sync``); use
+        ``abatch_augment`` from async code.
         """
-        raise NotImplementedError
+        return run_sync(self.abatch_augment(queries, **kwargs))
         
     def get_augmentation_metadata(self) -> Dict[str, Any]:
         """Get metadata about the applied augmentation.
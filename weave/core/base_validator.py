@@ -1,12 +1,20 @@
-from abc import ABC, abstractmethod
+import asyncio
+import inspect
+from abc import ABC
 from typing import Any, Dict, List, Optional, Tuple, Union
 
+from .exceptions import NotImplementedInBaseClassError
+from .utils import run_sync
+
 class BaseValidator(ABC):
     """Abstract base class for all validators in the Weave framework.
     
     Validators are responsible for scoring the quality, correctness, or other
     metrics of generated answers. This could include rule-based checks,
     LLM-based validation, or composite scoring approaches.
+    
+    The interface is async-first: subclasses implement ``ascore`` (or a
+    synchronous ``score``), and the remaining methods are derived from it.
     """
     
     def __init__(self, config: Optional[Dict[str, Any]] = None):
@@ -17,8 +25,20 @@ class BaseValidator(ABC):
         """
         self.config = config or {}
         
-    @abstractmethod
-    def score(
+    def __init_subclass__(cls, **kwargs: Any):
+        """Adopt ``async def score``/``batch_score`` as the async API.
+        
+        Validators that implemented ``score`` as a coroutine function get it
+        as ``ascore`` (and likewise for ``batch_score``); their own ``score``
+        is kept, so existing callers that await it keep working.
+        """
+        super().__init_subclass__(**kwargs)
+        for sync_name, async_name in (("score", "ascore"), ("batch_score", "abatch_score")):
+            method = cls.__dict__.get(sync_name)
+            if inspect.iscoroutinefunction(method) and async_name not in cls.__dict__:
+                setattr(cls, async_name, method)
+                
+    async def ascore(
         self,
         query: str,
         reference: Union[str, Dict[str, Any]],
@@ -26,6 +46,10 @@ class BaseValidator(ABC):
     ) -> float:
         """Score a single generated answer against its reference.
         
+        Subclasses implement either this or a synchronous ``score``;
+        synchronous scoring (e.g. rule-based checks) is run in a worker
+        thread so it does not block the event loop.
+        
         Args:
             query: The original query/prompt.
             reference: The reference/ground truth answer.
@@ -35,12 +59,17 @@ class BaseValidator(ABC):
             float: Score in [0.0, 1.0] indicating quality/correctness.
             
         Raises:
-            NotImplementedError: Must be implemented by subclasses.
+            NotImplementedInBaseClassError: If neither ``ascore`` nor
+                ``score`` is implemented.
         """
-        raise NotImplementedError
+        if type(self).score is BaseValidator.score:
+            raise NotImplementedInBaseClassError("BaseValidator", "ascore")
+        result = await asyncio.to_thread(self.score, query, reference, generated)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
         
-    @abstractmethod
-    def batch_score(
+    async def abatch_score(
         self,
         queries: List[str],
         references: List[Union[str, Dict[str, Any]]],
@@ -54,12 +83,38 @@ class BaseValidator(ABC):
             generateds: List of generated/predicted answers to validate.
             
         Returns:
-            List[float]: Scores in [0.0, 1.0] for each sample.
-            
-        Raises:
-            NotImplementedError: Must be implemented by subclasses.
+            List[float]: Scores in [0.0, 1.0] for each sample, in input order.
+        """
+        return [
+            await self.ascore(query, reference, generated)
+            for query, reference, generated in zip(queries, references, generateds)
+        ]
+        
+    def score(
+        self,
+        query: str,
+        reference: Union[str, Dict[str, Any]],
+        generated: Union[str, Dict[str, Any]]
+    ) -> float:
+        """Synchronous wrapper around ``ascore``.
+        
+        Runs on the shared background loop (see ``run_sync``); use ``ascore``
+        from async code.
+        """
+        return run_sync(self.ascore(query, reference, generated))
+        
+    def batch_score(
+        self,
+        queries: List[str],
+        references: List[Union[str, Dict[str, Any]]],
+        generateds: List[Union[str, Dict[str, Any]]]
+    ) -> List[float]:
+        """Synchronous wrapper around ``abatch_score``.
+        
+        Runs on the shared background loop (see ``run_sync``); use
+        ``abatch_score`` from async code.
         """
-        raise NotImplementedError
+        return run_sync(self.abatch_score(queries, references, generateds))
         
     def get_validation_metadata(self) -> Dict[str, Any]:
         """Get metadata about the validation process.
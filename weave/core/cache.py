@@ -0,0 +1,360 @@
+"""Response caching for model connectors."""
+
+import json
+import time
+import asyncio
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+from .exceptions import StorageError
+
+class ResponseCache:
+    """Content-addressed cache for LLM responses.
+    
+    Responses are keyed on a hash of every parameter that influences the
+    completion (provider, model, prompt, sampling parameters, stop sequences,
+    etc.). The cache has two tiers:
+    
+    - An in-memory LRU tier bounded by ``max_entries``.
+    - An optional on-disk SQLite tier bounded by ``max_disk_entries`` that
+      survives process restarts, so re-running a pipeline after a crash does
+      not pay for the same completions twice.
+      
+    Both tiers honour ``ttl``. Entries found on disk are promoted to memory.
+    Async callers should use ``aget``/``aset``, which run disk I/O in a
+    worker thread instead of on the event loop.
+    """
+    
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        ttl: Optional[float] = None,
+        path: Optional[Union[str, Path]] = None,
+        max_disk_entries: Optional[int] = None,
+        cache_sampled: bool = False
+    ):
+        """Initialize the response cache.
+        
+        Args:
+            max_entries: Maximum number of entries held in memory.
+            ttl: Optional time-to-live in seconds. Expired entries are treated
+                as misses and evicted on access.
+            path: Optional SQLite database path for the persistent tier.
+            max_disk_entries: Optional maximum number of entries kept on disk.
+                Least recently used entries are evicted first.
+            cache_sampled: Whether to cache calls made with temperature > 0.
+                Off by default, since a cached sample would be returned for
+                every repeat of the prompt and collapse sample diversity. Enable
+                it to replay a run's completions, e.g. when resuming.
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = Path(path) if path else None
+        self.max_disk_entries = max_disk_entries
+        self.cache_sampled = cache_sampled
+        
+        self._memory: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "evictions": 0,
+            "expirations": 0
+        }
+        
+        self._db = None
+        # Guards the SQLite tier separately, so memory hits never wait on disk I/O
+        self._db_lock = threading.Lock()
+        # Disk hits since the last write; their access times are saved in bulk
+        # before the next trim instead of with a commit per hit
+        self._pending_access: Dict[str, float] = {}
+        self._writes_since_trim = 0
+        if self.path:
+            self._open_db()
+            
+    def _open_db(self) -> None:
+        """Open (and create if needed) the SQLite tier."""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed "
+                "ON responses (accessed_at)"
+            )
+            self._db.commit()
+        except sqlite3.Error as e:
+            raise StorageError(f"Error opening response cache at {self.path}: {str(e)}")
+            
+    @staticmethod
+    def make_key(**params: Any) -> str:
+        """Build a cache key from request parameters.
+        
+        Args:
+            **params: Every parameter that influences the response.
+            
+        Returns:
+            Hex digest identifying the request.
+        """
+        encoded = json.dumps(params, sort_keys=True, default=str)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+        
+    def should_cache(self, temperature: Optional[float]) -> bool:
+        """Check whether a call with the given temperature may be cached.
+        
+        Args:
+            temperature: Sampling temperature of the call.
+            
+        Returns:
+            True if the response may be served from or stored in the cache.
+        """
+        return self.cache_sampled or not temperature
+        
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        return self.ttl is not None and now - created_at > self.ttl
+        
+    def get(self, key: str) -> Optional[Any]:
+        """Look up a cached response.
+        
+        Args:
+            key: Cache key from ``make_key``.
+            
+        Returns:
+            The cached response, or None on a miss.
+            
+        Raises:
+            StorageError: If the disk tier cannot be read.
+        """
+        found, value = self._get_memory(key)
+        if found:
+            return value
+        return self._get_disk(key)
+        
+    async def aget(self, key: str) -> Optional[Any]:
+        """Look up a cached response without blocking the event loop on disk I/O.
+        
+        Args:
+            key: Cache key from ``make_key``.
+            
+        Returns:
+            The cached response, or None on a miss.
+            
+        Raises:
+            StorageError: If the disk tier cannot be read.
+        """
+        found, value = self._get_memory(key)
+        if found:
+            return value
+        if self._db is None:
+            return self._get_disk(key)
+        return await asyncio.to_thread(self._get_disk, key)
+        
+    def set(self, key: str, value: Any) -> None:
+        """Store a response.
+        
+        Args:
+            key: Cache key from ``make_key``.
+            value: JSON-serializable response to store.
+            
+        Raises:
+            StorageError: If the response cannot be written to the disk tier.
+        """
+        now = time.time()
+        with self._lock:
+            self._set_memory(key, value, now)
+        self._set_disk(key, value, now)
+        
+    async def aset(self, key: str, value: Any) -> None:
+        """Store a response without blocking the event loop on disk I/O.
+        
+        Args:
+            key: Cache key from ``make_key``.
+            value: JSON-serializable response to store.
+            
+        Raises:
+            StorageError: If the response cannot be written to the disk tier.
+        """
+        now = time.time()
+        with self._lock:
+            self._set_memory(key, value, now)
+        if self._db is not None:
+            await asyncio.to_thread(self._set_disk, key, value, now)
+            
+    def _get_memory(self, key: str) -> Tuple[bool, Optional[Any]]:
+        """Look up the memory tier.
+        
+        Returns:
+            Tuple of (found, value).
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return False, None
+            value, created_at = entry
+            if not self._is_expired(created_at, now):
+                self._memory.move_to_end(key)
+                self._stats["hits"] += 1
+                self._stats["memory_hits"] += 1
+                return True, value
+            del self._memory[key]
+            self._stats["expirations"] += 1
+            return False, None
+            
+    def _get_disk(self, key: str) -> Optional[Any]:
+        """Look up the disk tier after a memory miss, promoting hits to memory."""
+        now = time.time()
+        value = None
+        expired = False
+        with self._db_lock:
+            if self._db is not None:
+                try:
+                    row = self._db.execute(
+                        "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+                    ).fetchone()
+                    if row is not None and self._is_expired(row[1], now):
+                        self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                        self._db.commit()
+                        expired = True
+                    elif row is not None:
+                        value = json.loads(row[0])
+                        self._pending_access[key] = now
+                except (sqlite3.Error, ValueError) as e:
+                    raise StorageError(f"Error reading response cache: {str(e)}")
+                    
+        with self._lock:
+            if value is not None:
+                self._set_memory(key, value, row[1])
+                self._stats["hits"] += 1
+                self._stats["disk_hits"] += 1
+                return value
+            if expired:
+                self._stats["expirations"] += 1
+            self._stats["misses"] += 1
+            return None
+            
+    def _set_disk(self, key: str, value: Any, now: float) -> None:
+        """Write an entry to the disk tier, trimming it periodically."""
+        evicted = 0
+        with self._db_lock:
+            if self._db is None:
+                return
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(value), now, now)
+                )
+                self._writes_since_trim += 1
+                if self._writes_since_trim >= self._trim_interval():
+                    self._flush_access_times()
+                    evicted = self._evict_disk()
+                    self._writes_since_trim = 0
+                self._db.commit()
+            except (sqlite3.Error, TypeError) as e:
+                raise StorageError(f"Error writing response cache: {str(e)}")
+                
+        if evicted:
+            with self._lock:
+                self._stats["evictions"] += evicted
+                
+    def _flush_access_times(self) -> None:
+        """Save the access times of recent disk hits (caller holds ``_db_lock``)."""
+        if self._pending_access:
+            self._db.executemany(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self._pending_access.items()]
+            )
+            self._pending_access.clear()
+            
+    def _set_memory(self, key: str, value: Any, created_at: float) -> None:
+        """Insert into the memory tier, evicting least recently used entries."""
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+            
+    def _trim_interval(self) -> int:
+        """Number of disk writes between trims (about 5% of the disk budget)."""
+        return max(1, (self.max_disk_entries or 0) // 20)
+        
+    def _evict_disk(self) -> int:
+        """Trim the disk tier to ``max_disk_entries`` and drop expired rows.
+        
+        Returns:
+            Number of entries evicted for space.
+        """
+        if self.ttl is not None:
+            self._db.execute(
+                "DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,)
+            )
+        if self.max_disk_entries is not None:
+            cursor = self._db.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_disk_entries,)
+            )
+            return max(cursor.rowcount, 0)
+        return 0
+        
+    def clear(self) -> None:
+        """Remove all entries from both tiers."""
+        with self._lock:
+            self._memory.clear()
+        with self._db_lock:
+            self._pending_access.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+                
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache hit/miss counters and sizes.
+        
+        Returns:
+            Dictionary of cache statistics.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            lookups = stats["hits"] + stats["misses"]
+            stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+            stats["memory_size"] = len(self._memory)
+        with self._db_lock:
+            if self._db is not None:
+                stats["disk_size"] = self._db.execute(
+                    "SELECT COUNT(*) FROM responses"
+                ).fetchone()[0]
+        return stats
+            
+    def close(self) -> None:
+        """Close the disk tier."""
+        with self._db_lock:
+            if self._db is not None:
+                try:
+                    self._flush_access_times()
+                    self._db.commit()
+                except sqlite3.Error:
+                    pass
+                self._db.close()
+                self._db = None
+                
+    def __len__(self) -> int:
+        return len(self._memory)
+        
+    def __repr__(self) -> str:
+        """Return string representation of the cache."""
+        return (
+            f"ResponseCache(max_entries={self.max_entries}, ttl={self.ttl}, "
+            f"path={self.path})"
+        )
@@ -0,0 +1,424 @@
+"""Near-duplicate filtering for generated samples."""
+
+import re
+import zlib
+import hashlib
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .exceptions import InvalidArgumentError
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+# Mersenne prime modulus of the MinHash permutations
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+_FINGERPRINT_BITS = 64
+
+def _choose_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """Pick the LSH band layout whose S-curve midpoint is closest to ``threshold``.
+    
+    Two signatures land in a common bucket with probability
+    ``1 - (1 - s**rows)**bands`` for Jaccard similarity ``s``; the curve is
+    steepest around ``(1 / bands) ** (1 / rows)``.
+    
+    Returns:
+        ``(bands, rows)`` with ``bands * rows <= num_perm``.
+    """
+    best = (num_perm, 1)
+    best_error = float("inf")
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        error = abs((1.0 / bands) ** (1.0 / rows) - threshold)
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+class NearDuplicateFilter:
+    """Incremental near-duplicate detector with bounded memory.
+    
+    Texts are checked against everything the filter has seen recently and
+    remembered when they are new, so samples can be filtered as they stream
+    out of a generator. Three methods are available:
+    
+    - ``"minhash"``: MinHash signatures over word shingles, indexed with
+      banded LSH; candidates are confirmed by estimated Jaccard similarity
+      of at least ``threshold`` (default 0.8).
+    - ``"simhash"``: 64-bit SimHash fingerprints of the shingles. A text is a
+      duplicate when a fingerprint differs in at most
+      ``floor(64 * (1 - threshold))`` bits (default threshold 0.95, i.e. 3
+      bits); candidates come from a pigeonhole index over bit blocks.
+    - ``"embedding"``: cosine similarity of at least ``threshold`` (default
+      0.95) between embeddings from ``embedder`` (e.g. ``EmbeddingService``).
+      The window is searched exactly with one matrix product per batch.
+      Only available through the async methods.
+      
+    Signatures and hashes are computed locally and deterministically, so the
+    same filter settings give the same decisions in every process. Memory is
+    bounded by ``max_entries``: the filter keeps the most recent entries in a
+    ring buffer and drops the oldest from the index once it is full, so a
+    duplicate is caught when its original is among the last ``max_entries``
+    accepted texts. The buffer grows with use instead of being allocated up
+    front. An entry costs ``4 * num_perm`` bytes plus one index key per LSH
+    band for MinHash, a few hundred bytes for SimHash, and ``4 * dim`` bytes
+    (about 6 KB for 1536-d vectors) for embeddings.
+    """
+    
+    METHODS = ("minhash", "simhash", "embedding")
+    
+    DEFAULT_THRESHOLDS = {
+        "minhash": 0.8,
+        "simhash": 0.95,
+        "embedding": 0.95
+    }
+    
+    def __init__(
+        self,
+        method: str = "minhash",
+        threshold: Optional[float] = None,
+        num_perm: int = 64,
+        shingle_size: int = 3,
+        max_entries: int = 10000,
+        embedder: Optional[Any] = None,
+        seed: int = 1
+    ):
+        """Initialize the filter.
+        
+        Args:
+            method: ``"minhash"``, ``"simhash"`` or ``"embedding"``.
+            threshold: Similarity at or above which a text is a duplicate.
+                Defaults to 0.8 for MinHash and 0.95 otherwise.
+            num_perm: Number of MinHash permutations (signature length).
+            shingle_size: Number of consecutive words per shingle.
+            max_entries: Maximum number of texts remembered.
+            embedder: Object with an async ``aembed(texts)`` method returning
+                one vector per text. Required for the embedding method.
+            seed: Seed of the MinHash permutations.
+            
+        Raises:
+            InvalidArgumentError: If the method is unknown, an argument is out
+                of range, or the embedding method has no embedder.
+        """
+        if method not in self.METHODS:
+            raise InvalidArgumentError("method", f"must be one of {', '.join(self.METHODS)}")
+        if threshold is None:
+            threshold = self.DEFAULT_THRESHOLDS[method]
+        if not 0 < threshold <= 1:
+            raise InvalidArgumentError("threshold", "must be in (0, 1]")
+        if num_perm < 1:
+            raise InvalidArgumentError("num_perm", "must be positive")
+        if shingle_size < 1:
+            raise InvalidArgumentError("shingle_size", "must be positive")
+        if max_entries < 1:
+            raise InvalidArgumentError("max_entries", "must be positive")
+        if method == "embedding" and embedder is None:
+            raise InvalidArgumentError("embedder", "is required for the embedding method")
+            
+        self.method = method
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.max_entries = max_entries
+        self.embedder = embedder
+        self.seed = seed
+        self.logger = logging.getLogger(__name__)
+        
+        # Ring buffer of remembered entries; ``_next`` is the slot written next
+        self._count = 0
+        self._next = 0
+        self._buckets: List[Dict[Any, List[int]]] = []
+        
+        if method == "minhash":
+            generator = np.random.RandomState(seed)
+            self._a = generator.randint(1, 1 << 31, size=num_perm).astype(np.uint64)
+            self._b = generator.randint(0, 1 << 31, size=num_perm).astype(np.uint64)
+            self.bands, self.rows = _choose_bands(num_perm, threshold)
+            self._signatures = np.zeros((0, num_perm), dtype=np.uint32)
+            self._buckets = [{} for _ in range(self.bands)]
+        elif method == "simhash":
+            self.max_distance = int(_FINGERPRINT_BITS * (1 - threshold) + 1e-9)
+            # Pigeonhole: fingerprints within max_distance bits agree on at
+            # least one of max_distance + 1 blocks
+            blocks = min(self.max_distance + 1, _FINGERPRINT_BITS)
+            bounds = [round(i * _FINGERPRINT_BITS / blocks) for i in range(blocks + 1)]
+            self._blocks = [
+                ((1 << (end - start)) - 1) << start
+                for start, end in zip(bounds, bounds[1:])
+            ]
+            self._fingerprints: List[int] = []
+            self._buckets = [{} for _ in self._blocks]
+        else:
+            self._vectors: Optional[np.ndarray] = None
+            
+        self._stats = {"checked": 0, "duplicates": 0, "evicted": 0}
+        
+    def _shingles(self, text: str) -> List[str]:
+        """Split normalized text into overlapping word shingles."""
+        tokens = _TOKEN_PATTERN.findall(text.lower())
+        if len(tokens) <= self.shingle_size:
+            return [" ".join(tokens)]
+        return [
+            " ".join(tokens[i:i + self.shingle_size])
+            for i in range(len(tokens) - self.shingle_size + 1)
+        ]
+        
+    def minhash(self, text: str) -> np.ndarray:
+        """Compute the MinHash signature of a text.
+        
+        Args:
+            text: Text to sign.
+            
+        Returns:
+            ``uint32`` array of length ``num_perm``.
+        """
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode("utf-8")) for shingle in set(self._shingles(text))),
+            dtype=np.uint64
+        )
+        permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME & _MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+        
+    @staticmethod
+    def simhash(shingles: Sequence[str]) -> int:
+        """Compute the 64-bit SimHash fingerprint of a list of shingles."""
+        hashes = np.fromiter(
+            (
+                int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+                for shingle in shingles
+            ),
+            dtype=np.uint64
+        )
+        bits = (hashes[:, None] >> np.arange(_FINGERPRINT_BITS, dtype=np.uint64)) & np.uint64(1)
+        votes = bits.sum(axis=0) * 2 > len(hashes)
+        return int(np.packbits(votes, bitorder="little").view("<u8")[0])
+        
+    def _keys(self, slot: int) -> List[Any]:
+        """Bucket key of a remembered entry in each index table."""
+        if self.method == "minhash":
+            signature = self._signatures[slot]
+            return [
+                signature[band * self.rows:(band + 1) * self.rows].tobytes()
+                for band in range(self.bands)
+            ]
+        fingerprint = self._fingerprints[slot]
+        return [fingerprint & mask for mask in self._blocks]
+        
+    def _grow(self, buffer: np.ndarray, slot: int) -> np.ndarray:
+        """Return ``buffer``, grown geometrically (up to ``max_entries`` rows) to hold ``slot``."""
+        if slot < len(buffer):
+            return buffer
+        rows = min(self.max_entries, max(2 * len(buffer), slot + 1, 64))
+        grown = np.zeros((rows,) + buffer.shape[1:], dtype=buffer.dtype)
+        grown[:len(buffer)] = buffer
+        return grown
+        
+    def _store(self, slot: int, signature: Any) -> None:
+        if self.method == "minhash":
+            self._signatures = self._grow(self._signatures, slot)
+            self._signatures[slot] = signature
+        elif slot == len(self._fingerprints):
+            self._fingerprints.append(signature)
+        else:
+            self._fingerprints[slot] = signature
+            
+    def _evict(self, slot: int) -> None:
+        """Remove the entry in ``slot`` from the index."""
+        for table, key in zip(self._buckets, self._keys(slot)):
+            bucket = table.get(key)
+            if bucket is None:
+                continue
+            bucket.remove(slot)
+            if not bucket:
+                del table[key]
+        self._stats["evicted"] += 1
+        
+    def _claim_slot(self) -> int:
+        """Next ring buffer slot, evicting its previous entry if the buffer is full."""
+        slot = self._next
+        if self._count == self.max_entries:
+            if self.method == "embedding":
+                self._stats["evicted"] += 1
+            else:
+                self._evict(slot)
+        else:
+            self._count += 1
+        self._next = (slot + 1) % self.max_entries
+        return slot
+        
+    def _matches(self, signature: Any) -> bool:
+        """Check a MinHash signature or SimHash fingerprint against the index."""
+        if self.method == "minhash":
+            keys = [
+                signature[band * self.rows:(band + 1) * self.rows].tobytes()
+                for band in range(self.bands)
+            ]
+        else:
+            keys = [signature & mask for mask in self._blocks]
+            
+        candidates = set()
+        for table, key in zip(self._buckets, keys):
+            candidates.update(table.get(key, ()))
+        if not candidates:
+            return False
+            
+        if self.method == "minhash":
+            slots = np.fromiter(candidates, dtype=np.int64)
+            similarity = (self._signatures[slots] == signature).mean(axis=1)
+            return bool((similarity >= self.threshold).any())
+        return any(
+            bin(self._fingerprints[slot] ^ signature).count("1") <= self.max_distance
+            for slot in candidates
+        )
+        
+    def is_duplicate(self, text: str, add: bool = True) -> bool:
+        """Check whether a text nearly duplicates one seen before.
+        
+        Args:
+            text: Text to check.
+            add: Remember the text if it is not a duplicate.
+            
+        Returns:
+            True if the text is a near-duplicate.
+            
+        Raises:
+            InvalidArgumentError: If the filter uses embeddings (use
+                ``ais_duplicate``).
+        """
+        if self.method == "embedding":
+            raise InvalidArgumentError(
+                "method", "embedding filters must be used through ais_duplicate or afilter"
+            )
+            
+        signature = self.minhash(text) if self.method == "minhash" else self.simhash(self._shingles(text))
+        self._stats["checked"] += 1
+        if self._matches(signature):
+            self._stats["duplicates"] += 1
+            return True
+            
+        if add:
+            slot = self._claim_slot()
+            self._store(slot, signature)
+            for table, key in zip(self._buckets, self._keys(slot)):
+                table.setdefault(key, []).append(slot)
+        return False
+        
+    def filter(self, texts: Sequence[str]) -> List[bool]:
+        """Filter texts in order, remembering the ones kept.
+        
+        A text that nearly duplicates an earlier text of the same call is
+        dropped as well.
+        
+        Args:
+            texts: Texts to check.
+            
+        Returns:
+            One flag per text, True if the text should be kept.
+        """
+        return [not self.is_duplicate(text) for text in texts]
+        
+    async def ais_duplicate(self, text: str, add: bool = True) -> bool:
+        """Async version of ``is_duplicate`` that also supports embeddings."""
+        if self.method != "embedding":
+            return self.is_duplicate(text, add=add)
+        return not (await self._afilter_embeddings([text], add=add))[0]
+        
+    async def afilter(self, texts: Sequence[str]) -> List[bool]:
+        """Async version of ``filter`` that also supports embeddings.
+        
+        Embeddings for the whole list are requested in one ``aembed`` call.
+        """
+        if self.method != "embedding":
+            return self.filter(texts)
+        return await self._afilter_embeddings(texts)
+        
+    async def _afilter_embeddings(self, texts: Sequence[str], add: bool = True) -> List[bool]:
+        """Filter texts by cosine similarity of their embeddings."""
+        if not texts:
+            return []
+        vectors = np.asarray(await self.embedder.aembed(list(texts)), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.maximum(norms, 1e-12)
+        
+        if self._vectors is None:
+            self._vectors = np.zeros((0, vectors.shape[1]), dtype=np.float32)
+            
+        # No awaits from here on, so concurrent callers see each other's additions
+        seen = np.zeros(len(texts), dtype=bool)
+        if self._count:
+            similarity = vectors @ self._vectors[:self._count].T
+            seen = (similarity >= self.threshold).any(axis=1)
+        within = vectors @ vectors.T
+        
+        keep: List[bool] = []
+        kept: List[int] = []
+        for index in range(len(texts)):
+            self._stats["checked"] += 1
+            duplicate = bool(seen[index]) or any(within[index, other] >= self.threshold for other in kept)
+            if duplicate:
+                self._stats["duplicates"] += 1
+            elif add:
+                kept.append(index)
+            keep.append(not duplicate)
+            
+        for index in kept:
+            slot = self._claim_slot()
+            self._vectors = self._grow(self._vectors, slot)
+            self._vectors[slot] = vectors[index]
+        return keep
+        
+    def reset(self) -> None:
+        """Forget every remembered text and reset the counters."""
+        self._count = 0
+        self._next = 0
+        for table in self._buckets:
+            table.clear()
+        self._stats = {"checked": 0, "duplicates": 0, "evicted": 0}
+        
+    def __len__(self) -> int:
+        """Number of texts currently remembered."""
+        return self._count
+        
+    def get_stats(self) -> Dict[str, Any]:
+        """Get filter counters.
+        
+        Returns:
+            Dictionary with the method, threshold, number of texts checked,
+            duplicates found, entries evicted from the window, the current
+            number of entries and the duplicate rate.
+        """
+        stats = dict(self._stats)
+        stats["method"] = self.method
+        stats["threshold"] = self.threshold
+        stats["entries"] = self._count
+        stats["duplicate_rate"] = stats["duplicates"] / stats["checked"] if stats["checked"] else 0.0
+        return stats
+        
+    @classmethod
+    def from_config(cls, config: Any) -> Optional["NearDuplicateFilter"]:
+        """Build a filter from a ``dedup`` configuration value.
+        
+        Args:
+            config: An existing filter (returned as-is), a dictionary of
+                constructor arguments, True for a default MinHash filter, or
+                a falsy value to disable filtering.
+                
+        Returns:
+            The filter, or None when filtering is disabled.
+        """
+        if not config:
+            return None
+        if isinstance(config, cls):
+            return config
+        if config is True:
+            return cls()
+        return cls(**config)
+        
+    def __repr__(self) -> str:
+        """Return string representation of the filter."""
+        return (
+            f"NearDuplicateFilter(method={self.method!r}, threshold={self.threshold}, "
+            f"max_entries={self.max_entries})"
+        )
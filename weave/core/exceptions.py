@@ -1,3 +1,5 @@
+from typing import Optional
+
 class WeaveError(Exception):
     """Base exception class for all Weave-related errors."""
     pass
@@ -16,7 +18,10 @@ class GenerationError(WeaveError):
 
 class NoiserError(WeaveError):
     """Raised when data augmentation/noising fails."""
-    pass
+    def __init__(self, message: str, index: Optional[int] = None, query: Optional[str] = None):
+        self.index = index
+        self.query = query
+        super().__init__(message)
 
 class ModelError(WeaveError):
     """Raised when there's an error with model operations (API calls, etc.)."""
@@ -28,7 +33,16 @@ class ModelConnectionError(ModelError):
 
 class ModelAPIError(ModelError):
     """Raised when an API call to a model service fails."""
-    pass
+    def __init__(self, message: str, status: Optional[int] = None, retry_after: Optional[float] = None):
+        self.status = status
+        self.retry_after = retry_after
+        super().__init__(message)
+
+class CircuitOpenError(ModelError):
+    """Raised without calling a model service whose circuit breaker is open."""
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        self.retry_after = retry_after
+        super().__init__(message)
 
 class ModelTokenLimitError(ModelError):
     """Raised when a prompt exceeds the model's token limit."""
@@ -0,0 +1,192 @@
+"""Shared HTTP connection pooling for model providers."""
+
+import asyncio
+import threading
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import aiohttp
+
+# Sentinel event sent by OpenAI-compatible APIs at the end of a stream
+SSE_DONE = "[DONE]"
+
+# Pool settings recognised in provider/connector configs
+DEFAULT_POOL_CONFIG = {
+    "connection_limit": 100,          # total connections per pool
+    "connection_limit_per_host": 32,  # connections per (host, port, ssl)
+    "keepalive_timeout": 30.0,        # seconds an idle connection is kept open
+    "dns_cache_ttl": 300              # seconds resolved addresses are cached
+}
+
+class SessionRegistry:
+    """Process-wide registry of pooled aiohttp sessions.
+    
+    aiohttp sessions are bound to the event loop they were created on, so the
+    registry keeps one session per (event loop, pool settings) pair. Providers
+    that share settings share a connection pool, keep-alive connections and
+    DNS cache, instead of each opening its own pool with cold TLS handshakes.
+    Sessions are created lazily inside a running loop and closed with
+    ``close()``.
+    """
+    
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._sessions: Dict[Tuple[int, Tuple], Tuple[asyncio.AbstractEventLoop, aiohttp.ClientSession]] = {}
+        self._lock = threading.Lock()
+        
+    @staticmethod
+    def resolve_pool_config(config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Merge pool settings from a config dictionary over the defaults.
+        
+        Args:
+            config: Provider or connector configuration. Unrelated keys are ignored.
+            
+        Returns:
+            Complete pool settings.
+        """
+        config = config or {}
+        return {
+            key: config.get(key, default)
+            for key, default in DEFAULT_POOL_CONFIG.items()
+        }
+        
+    def get_session(self, config: Optional[Dict[str, Any]] = None) -> aiohttp.ClientSession:
+        """Get the pooled session for the running loop and pool settings.
+        
+        Args:
+            config: Configuration containing optional pool settings.
+            
+        Returns:
+            Shared aiohttp session.
+            
+        Raises:
+            RuntimeError: If called outside a running event loop.
+        """
+        loop = asyncio.get_running_loop()
+        settings = self.resolve_pool_config(config)
+        key = (id(loop), tuple(sorted(settings.items())))
+        
+        with self._lock:
+            self._prune()
+            
+            entry = self._sessions.get(key)
+            if entry is not None and entry[0] is loop and not entry[1].closed:
+                return entry[1]
+                
+            connector = aiohttp.TCPConnector(
+                limit=settings["connection_limit"],
+                limit_per_host=settings["connection_limit_per_host"],
+                keepalive_timeout=settings["keepalive_timeout"],
+                ttl_dns_cache=settings["dns_cache_ttl"],
+                use_dns_cache=True
+            )
+            session = aiohttp.ClientSession(connector=connector)
+            self._sessions[key] = (loop, session)
+            return session
+            
+    def _prune(self) -> None:
+        """Drop sessions whose event loop has been closed."""
+        stale = [
+            key for key, (loop, session) in self._sessions.items()
+            if loop.is_closed() or session.closed
+        ]
+        for key in stale:
+            del self._sessions[key]
+            
+    async def close(self) -> None:
+        """Close every session that belongs to the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            owned = [
+                (key, session) for key, (session_loop, session) in self._sessions.items()
+                if session_loop is loop
+            ]
+            for key, _ in owned:
+                del self._sessions[key]
+                
+        for _, session in owned:
+            await session.close()
+            
+    def __len__(self) -> int:
+        return len(self._sessions)
+        
+    def __repr__(self) -> str:
+        """Return string representation of the registry."""
+        return f"SessionRegistry(sessions={len(self._sessions)})"
+
+_registry = SessionRegistry()
+
+def get_session(config: Optional[Dict[str, Any]] = None) -> aiohttp.ClientSession:
+    """Get the process-wide pooled session for the running event loop.
+    
+    Args:
+        config: Configuration containing optional pool settings
+            (see ``DEFAULT_POOL_CONFIG``).
+            
+    Returns:
+        Shared aiohttp session.
+    """
+    return _registry.get_session(config)
+
+async def close_sessions() -> None:
+    """Close all pooled sessions belonging to the running event loop.
+    
+    Call this once at shutdown (e.g. at the end of the coroutine passed to
+    ``asyncio.run``) so connections are released cleanly.
+    """
+    await _registry.close()
+
+async def iter_sse_data(response: aiohttp.ClientResponse) -> AsyncIterator[str]:
+    """Yield the data payload of each server-sent event in a streaming response.
+    
+    Bytes are read as they arrive, so events are yielded as soon as they are
+    complete and the consumer's pace applies backpressure to the connection.
+    Events split across network chunks, multi-line ``data:`` fields, comment
+    (keep-alive) lines and the ``[DONE]`` sentinel are all handled.
+    
+    Args:
+        response: Open aiohttp response with an ``text/event-stream`` body.
+        
+    Yields:
+        The (possibly multi-line) data field of each event, without the
+        ``data:`` prefix. Iteration stops at ``[DONE]``.
+    """
+    buffer = bytearray()
+    data_lines: List[str] = []
+    
+    def dispatch() -> str:
+        data = "\n".join(data_lines)
+        data_lines.clear()
+        return data
+        
+    def parse_line(line: str) -> None:
+        # Comment lines (": keep-alive") and unknown fields are ignored
+        if line.startswith(":"):
+            return
+        field, _, value = line.partition(":")
+        if field == "data":
+            data_lines.append(value[1:] if value.startswith(" ") else value)
+            
+    async for chunk in response.content.iter_any():
+        buffer.extend(chunk)
+        while True:
+            newline = buffer.find(b"\n")
+            if newline < 0:
+                break
+            line = bytes(buffer[:newline]).rstrip(b"\r").decode("utf-8")
+            del buffer[:newline + 1]
+            
+            if line:
+                parse_line(line)
+            elif data_lines:
+                data = dispatch()
+                if data == SSE_DONE:
+                    return
+                yield data
+                
+    # Servers may close the stream without a trailing blank line
+    if buffer:
+        parse_line(bytes(buffer).rstrip(b"\r").decode("utf-8"))
+    if data_lines:
+        data = dispatch()
+        if data != SSE_DONE:
+            yield data
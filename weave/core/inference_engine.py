@@ -0,0 +1,576 @@
+"""In-process inference engines for locally hosted models."""
+
+import asyncio
+import queue
+import logging
+import itertools
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from .exceptions import (
+    ModelConnectionError,
+    ModelError,
+    ResourceExhaustedError,
+    InvalidArgumentError
+)
+
+class InferenceEngine(ABC):
+    """Base class for in-process inference backends.
+    
+    Engines accept single requests from any coroutine or thread and hand back
+    futures. Concurrent requests are batched internally so the accelerator
+    stays busy, and all blocking model work runs on the engine's own thread,
+    never on the caller's event loop.
+    """
+    
+    def __init__(self, model_name: str, config: Optional[Dict[str, Any]] = None):
+        """Initialize the engine.
+        
+        Args:
+            model_name: Model name or path to load.
+            config: Engine-specific configuration.
+        """
+        self.model_name = model_name
+        self.config = config or {}
+        self.logger = logging.getLogger(__name__)
+        
+    @abstractmethod
+    def submit(
+        self,
+        prompt: str,
+        n: int = 1,
+        max_tokens: int = 100,
+        temperature: float = 0.7,
+        **kwargs
+    ) -> Future:
+        """Queue a generation request.
+        
+        Args:
+            prompt: Input prompt.
+            n: Number of completions to sample.
+            max_tokens: Maximum number of new tokens per completion.
+            temperature: Sampling temperature (0 for greedy decoding).
+            **kwargs: Additional backend-specific sampling parameters.
+            
+        Returns:
+            Future resolving to the list of ``n`` generated texts.
+        """
+        raise NotImplementedError
+        
+    async def generate(
+        self,
+        prompt: str,
+        n: int = 1,
+        max_tokens: int = 100,
+        temperature: float = 0.7,
+        **kwargs
+    ) -> List[str]:
+        """Generate completions without blocking the running event loop.
+        
+        Args:
+            prompt: Input prompt.
+            n: Number of completions to sample.
+            max_tokens: Maximum number of new tokens per completion.
+            temperature: Sampling temperature (0 for greedy decoding).
+            **kwargs: Additional backend-specific sampling parameters.
+            
+        Returns:
+            List of ``n`` generated texts.
+        """
+        future = self.submit(prompt, n=n, max_tokens=max_tokens, temperature=temperature, **kwargs)
+        return await asyncio.wrap_future(future)
+        
+    @abstractmethod
+    def count_tokens(self, text: str) -> int:
+        """Count the tokens in a text with the model's tokenizer."""
+        raise NotImplementedError
+        
+    def count_tokens_batch(self, texts: List[str]) -> List[int]:
+        """Count the tokens in many texts.
+        
+        Args:
+            texts: Texts to count.
+            
+        Returns:
+            Token count of each text, in order.
+        """
+        return [self.count_tokens(text) for text in texts]
+        
+    def get_stats(self) -> Dict[str, Any]:
+        """Get engine metrics.
+        
+        Returns:
+            Dictionary of backend-specific counters.
+        """
+        return {}
+        
+    @abstractmethod
+    def shutdown(self) -> None:
+        """Stop the engine thread. Pending requests fail with ModelError."""
+        raise NotImplementedError
+        
+    def __repr__(self) -> str:
+        """Return string representation of the engine."""
+        return f"{self.__class__.__name__}(model={self.model_name})"
+
+class VLLMEngine(InferenceEngine):
+    """Continuous-batching engine backed by vLLM's ``AsyncLLMEngine``.
+    
+    The vLLM engine runs on a private event loop in a background thread.
+    Requests are scheduled onto that loop and vLLM interleaves them at the
+    token level, so new prompts join the running batch without waiting for
+    earlier ones to finish.
+    """
+    
+    def __init__(self, model_name: str, config: Optional[Dict[str, Any]] = None):
+        """Start the vLLM engine.
+        
+        Args:
+            model_name: Model name or path to load.
+            config: Engine configuration. ``engine_args`` is passed to
+                ``vllm.AsyncEngineArgs``.
+                
+        Raises:
+            ModelConnectionError: If vLLM is not installed.
+        """
+        super().__init__(model_name, config)
+        
+        try:
+            from vllm import AsyncEngineArgs, AsyncLLMEngine, SamplingParams
+        except ImportError:
+            raise ModelConnectionError("vLLM is required for VLLMEngine: pip install vllm")
+            
+        self._sampling_params = SamplingParams
+        self._request_ids = itertools.count()
+        self._stats = {"requests": 0, "in_flight": 0}
+        self._closed = False
+        
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever,
+            name=f"weave-vllm-{model_name}",
+            daemon=True
+        )
+        self._thread.start()
+        
+        engine_args = AsyncEngineArgs(model=model_name, **self.config.get("engine_args", {}))
+        self._engine = AsyncLLMEngine.from_engine_args(engine_args)
+        self._tokenizer = None
+        
+    def submit(
+        self,
+        prompt: str,
+        n: int = 1,
+        max_tokens: int = 100,
+        temperature: float = 0.7,
+        **kwargs
+    ) -> Future:
+        """Schedule a request on the engine loop."""
+        if self._closed:
+            future: Future = Future()
+            future.set_exception(ModelError("Inference engine has been shut down"))
+            return future
+            
+        params = self._sampling_params(n=n, max_tokens=max_tokens, temperature=temperature, **kwargs)
+        request_id = f"weave-{next(self._request_ids)}"
+        return asyncio.run_coroutine_threadsafe(self._run(prompt, params, request_id), self._loop)
+        
+    async def _run(self, prompt: str, params: Any, request_id: str) -> List[str]:
+        """Drive one request to completion on the engine loop."""
+        self._stats["requests"] += 1
+        self._stats["in_flight"] += 1
+        final = None
+        try:
+            async for output in self._engine.generate(prompt, params, request_id):
+                final = output
+        except asyncio.CancelledError:
+            if self._closed:
+                raise ModelError("Inference engine has been shut down")
+            raise
+        finally:
+            self._stats["in_flight"] -= 1
+        if final is None:
+            raise ModelError(f"vLLM returned no output for request {request_id}")
+        return [completion.text for completion in sorted(final.outputs, key=lambda c: c.index)]
+        
+    def _get_tokenizer(self) -> Any:
+        """Load the model's Hugging Face tokenizer on first use."""
+        if self._tokenizer is None:
+            from transformers import AutoTokenizer
+            self._tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+        return self._tokenizer
+        
+    def count_tokens(self, text: str) -> int:
+        """Count tokens with the model's Hugging Face tokenizer."""
+        return len(self._get_tokenizer().encode(text))
+        
+    def count_tokens_batch(self, texts: List[str]) -> List[int]:
+        """Count tokens of many texts with one (fast) tokenizer call."""
+        return [len(ids) for ids in self._get_tokenizer()(texts)["input_ids"]]
+        
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the number of submitted and in-flight requests."""
+        return dict(self._stats)
+        
+    def shutdown(self) -> None:
+        """Fail in-flight requests with ModelError, then stop and close the engine loop."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._loop.is_running():
+            asyncio.run_coroutine_threadsafe(self._cancel_pending(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+        self._loop.close()
+        
+    @staticmethod
+    async def _cancel_pending() -> None:
+        """Cancel every other task on the engine loop and wait for them to unwind."""
+        current = asyncio.current_task()
+        tasks = [task for task in asyncio.all_tasks() if task is not current]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+def _load_transformers_model(model_name: str, device: Optional[str] = None) -> Tuple[Any, Any]:
+    """Load a causal LM and a left-padding tokenizer for batched generation."""
+    from transformers import AutoTokenizer, AutoModelForCausalLM
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    # Decoder-only models continue from the right, so pad on the left
+    tokenizer.padding_side = "left"
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+        
+    model = AutoModelForCausalLM.from_pretrained(model_name)
+    if device:
+        model.to(device)
+    model.eval()
+    return tokenizer, model
+    
+def _generate_batch(
+    tokenizer: Any,
+    model: Any,
+    prompts: List[str],
+    n: int,
+    max_tokens: int,
+    temperature: float,
+    extra: Tuple
+) -> List[str]:
+    """Run one padded ``generate`` call and decode only the new tokens."""
+    import torch
+    
+    inputs = tokenizer(prompts, return_tensors="pt", padding=True)
+    inputs = inputs.to(model.device)
+    
+    generate_kwargs = dict(extra)
+    if temperature > 0:
+        generate_kwargs.update(do_sample=True, temperature=temperature)
+    else:
+        generate_kwargs["do_sample"] = False
+        
+    with torch.no_grad():
+        outputs = model.generate(
+            **inputs,
+            max_new_tokens=max_tokens,
+            num_return_sequences=n,
+            pad_token_id=tokenizer.pad_token_id,
+            **generate_kwargs
+        )
+        
+    # Keep only the newly generated tokens
+    prompt_length = inputs["input_ids"].shape[1]
+    return tokenizer.batch_decode(outputs[:, prompt_length:], skip_special_tokens=True)
+    
+# Model held by a process-executor worker (see TransformersEngine)
+_process_model: Optional[Tuple[Any, Any]] = None
+
+def _process_init(model_name: str, device: Optional[str]) -> None:
+    """Load the model once when an executor process starts."""
+    global _process_model
+    _process_model = _load_transformers_model(model_name, device)
+    
+def _process_generate(
+    prompts: List[str],
+    n: int,
+    max_tokens: int,
+    temperature: float,
+    extra: Tuple
+) -> List[str]:
+    """Generate a batch with the model loaded by ``_process_init``."""
+    tokenizer, model = _process_model
+    return _generate_batch(tokenizer, model, prompts, n, max_tokens, temperature, extra)
+    
+class TransformersEngine(InferenceEngine):
+    """Micro-batching ``transformers`` engine used when vLLM is unavailable.
+    
+    Requests go into a bounded queue. A scheduler thread takes the oldest
+    request, waits up to ``batch_wait_ms`` for more requests with the same
+    sampling parameters (up to ``max_batch_size``), and runs them through one
+    left-padded ``generate`` call on the configured executor:
+    
+    - ``"thread"`` (default): the model lives in this process and runs on the
+      scheduler thread, outside the event loop.
+    - ``"process"``: the model lives in a dedicated worker process, so
+      tokenization and decoding do not contend for the GIL with the event
+      loop. The next batch fills up while the current one runs.
+    """
+    
+    def __init__(self, model_name: str, config: Optional[Dict[str, Any]] = None):
+        """Load the model and start the scheduler thread.
+        
+        Args:
+            model_name: Model name or path to load.
+            config: Engine configuration:
+                - ``executor``: ``"thread"`` (default) or ``"process"``.
+                - ``max_batch_size``: prompts per ``generate`` call (default 16).
+                - ``batch_wait_ms``: how long to wait for a batch to fill
+                  (default 5).
+                - ``max_queue_size``: maximum number of queued requests
+                  (default 256).
+                - ``device``: device the model runs on.
+                
+        Raises:
+            InvalidArgumentError: If the executor type is unknown.
+        """
+        super().__init__(model_name, config)
+        self.executor = self.config.get("executor", "thread")
+        self.max_batch_size = self.config.get("max_batch_size", 16)
+        self.batch_wait = self.config.get("batch_wait_ms", 5) / 1000
+        self.max_queue_size = self.config.get("max_queue_size", 256)
+        device = self.config.get("device")
+        
+        if self.executor == "thread":
+            self.tokenizer, self.model = _load_transformers_model(model_name, device)
+            self._pool = None
+        elif self.executor == "process":
+            # The parent only needs the tokenizer, for token counting
+            from transformers import AutoTokenizer
+            self.tokenizer, self.model = AutoTokenizer.from_pretrained(model_name), None
+            self._pool = ProcessPoolExecutor(
+                max_workers=1,
+                initializer=_process_init,
+                initargs=(model_name, device)
+            )
+        else:
+            raise InvalidArgumentError("executor", f"unknown executor type {self.executor!r}")
+            
+        self._queue: "queue.Queue[Optional[Tuple[Tuple, str, Future]]]" = queue.Queue(
+            maxsize=self.max_queue_size
+        )
+        self._closed = False
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "requests": 0,
+            "rejected": 0,
+            "batches": 0,
+            "batched_requests": 0,
+            "last_batch_size": 0,
+            "largest_batch_size": 0
+        }
+        self._thread = threading.Thread(
+            target=self._worker,
+            name=f"weave-transformers-{model_name}",
+            daemon=True
+        )
+        self._thread.start()
+        
+    def submit(
+        self,
+        prompt: str,
+        n: int = 1,
+        max_tokens: int = 100,
+        temperature: float = 0.7,
+        **kwargs
+    ) -> Future:
+        """Queue a request for the next batch.
+        
+        Never blocks. If the queue is full the returned future fails with
+        ResourceExhaustedError; ``generate`` waits for space instead.
+        """
+        future: Future = Future()
+        if self._closed:
+            future.set_exception(ModelError("Inference engine has been shut down"))
+            return future
+            
+        params = (n, max_tokens, temperature, tuple(sorted(kwargs.items())))
+        try:
+            self._queue.put_nowait((params, prompt, future))
+        except queue.Full:
+            with self._stats_lock:
+                self._stats["rejected"] += 1
+            future.set_exception(ResourceExhaustedError(
+                f"Inference queue is full ({self.max_queue_size} requests)"
+            ))
+            return future
+            
+        with self._stats_lock:
+            self._stats["requests"] += 1
+        return future
+        
+    async def generate(
+        self,
+        prompt: str,
+        n: int = 1,
+        max_tokens: int = 100,
+        temperature: float = 0.7,
+        **kwargs
+    ) -> List[str]:
+        """Generate completions, waiting for queue space when the queue is full."""
+        while True:
+            if not self._queue.full():
+                future = self.submit(prompt, n=n, max_tokens=max_tokens, temperature=temperature, **kwargs)
+                if not (future.done() and isinstance(future.exception(), ResourceExhaustedError)):
+                    return await asyncio.wrap_future(future)
+            # Backpressure: the scheduler frees space every batch window
+            await asyncio.sleep(self.batch_wait or 0.001)
+            
+    def _worker(self) -> None:
+        """Collect queued requests into batches and run them."""
+        # Requests taken off the queue but not yet run, in arrival order. They
+        # no longer count against max_queue_size, so their number is capped
+        # to keep the queue's backpressure meaningful.
+        pending: List[Optional[Tuple[Tuple, str, Future]]] = []
+        max_pending = 2 * self.max_batch_size
+        
+        while True:
+            if not pending:
+                pending.append(self._queue.get())
+            if pending[0] is None:
+                break
+                
+            # Give requests arriving within the window a chance to join
+            params = pending[0][0]
+            matching = sum(1 for request in pending if request is not None and request[0] == params)
+            deadline = time.monotonic() + self.batch_wait
+            while matching < self.max_batch_size and len(pending) < max_pending:
+                remaining = deadline - time.monotonic()
+                try:
+                    request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                pending.append(request)
+                if request is None:
+                    break
+                if request[0] == params:
+                    matching += 1
+                    
+            # Requests with other sampling parameters wait for a later batch
+            batch = [
+                request for request in pending
+                if request is not None and request[0] == params
+            ][:self.max_batch_size]
+            batched = set(id(request) for request in batch)
+            pending = [request for request in pending if id(request) not in batched]
+            
+            self._run_batch(params, batch)
+            
+        for request in pending + self._drain():
+            if request is not None:
+                request[2].set_exception(ModelError("Inference engine has been shut down"))
+                
+    def _drain(self) -> List[Optional[Tuple[Tuple, str, Future]]]:
+        """Remove and return everything left in the queue."""
+        items = []
+        while True:
+            try:
+                items.append(self._queue.get_nowait())
+            except queue.Empty:
+                return items
+                
+    def _run_batch(self, params: Tuple, batch: List[Tuple[Tuple, str, Future]]) -> None:
+        """Run one batch on the executor and resolve its futures."""
+        n, max_tokens, temperature, extra = params
+        prompts = [prompt for _, prompt, _ in batch]
+        
+        with self._stats_lock:
+            self._stats["batches"] += 1
+            self._stats["batched_requests"] += len(batch)
+            self._stats["last_batch_size"] = len(batch)
+            self._stats["largest_batch_size"] = max(self._stats["largest_batch_size"], len(batch))
+            
+        try:
+            if self._pool is not None:
+                texts = self._pool.submit(
+                    _process_generate, prompts, n, max_tokens, temperature, extra
+                ).result()
+            else:
+                texts = _generate_batch(
+                    self.tokenizer, self.model, prompts, n, max_tokens, temperature, extra
+                )
+        except Exception as e:
+            self.logger.error(f"Batch of {len(batch)} prompts failed: {str(e)}")
+            for _, _, future in batch:
+                future.set_exception(ModelError(f"Local inference failed: {str(e)}"))
+            return
+            
+        for index, (_, _, future) in enumerate(batch):
+            future.set_result(texts[index * n:(index + 1) * n])
+            
+    def count_tokens(self, text: str) -> int:
+        """Count tokens with the model's tokenizer."""
+        return len(self.tokenizer.encode(text))
+        
+    def count_tokens_batch(self, texts: List[str]) -> List[int]:
+        """Count tokens of many texts with one (fast) tokenizer call."""
+        return [len(ids) for ids in self.tokenizer(texts)["input_ids"]]
+        
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue and batching metrics.
+        
+        Returns:
+            Dictionary with the current ``queue_depth``, request and batch
+            counters, and the mean, last and largest batch sizes.
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["queue_depth"] = self._queue.qsize()
+        stats["max_queue_size"] = self.max_queue_size
+        stats["mean_batch_size"] = (
+            stats["batched_requests"] / stats["batches"] if stats["batches"] else 0.0
+        )
+        return stats
+        
+    def shutdown(self) -> None:
+        """Stop the scheduler after the batch in progress."""
+        if not self._closed:
+            self._closed = True
+            # Blocks only while the queue is full; the scheduler keeps draining it
+            self._queue.put(None)
+            self._thread.join()
+            if self._pool is not None:
+                self._pool.shutdown()
+                
+def create_engine(model_name: str, config: Optional[Dict[str, Any]] = None) -> InferenceEngine:
+    """Create the best available in-process engine for a model.
+    
+    Args:
+        model_name: Model name or path to load.
+        config: Engine configuration. ``inference_backend`` selects
+            ``"vllm"``, ``"transformers"`` or ``"auto"`` (the default: vLLM
+            when installed, transformers otherwise).
+            
+    Returns:
+        A started inference engine.
+        
+    Raises:
+        ModelConnectionError: If the requested backend is unknown or unavailable.
+    """
+    config = config or {}
+    backend = config.get("inference_backend", "auto")
+    
+    if backend == "auto":
+        try:
+            import vllm  # noqa: F401
+            backend = "vllm"
+        except ImportError:
+            backend = "transformers"
+            
+    if backend == "vllm":
+        return VLLMEngine(model_name, config)
+    elif backend == "transformers":
+        return TransformersEngine(model_name, config)
+    else:
+        raise ModelConnectionError(f"Unknown inference backend: {backend}")
@@ -0,0 +1,169 @@
+"""Run journal for checkpointing and resuming pipeline runs."""
+
+import os
+import json
+import time
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from .exceptions import StorageError
+
+class RunJournal:
+    """Append-only, crash-safe log of per-sample pipeline progress.
+    
+    Every time a sample finishes a stage, one JSON line with the sample ID,
+    the stage and that stage's outputs is appended (and fsynced) to the
+    journal file. Replaying the file on start-up rebuilds the latest state of
+    every sample, so a restarted run can skip completed samples and resume
+    in-flight ones from the last stage they reached. A line torn by a crash
+    is discarded.
+    
+    Samples that failed are recorded as ``FAILED``: they count as in flight,
+    so a restarted run retries them from the last stage they completed.
+    """
+    
+    # Stage recorded once a sample's final result has been written out
+    DONE = "done"
+    
+    # Stage recorded when a sample failed; its earlier outputs are kept
+    FAILED = "failed"
+    
+    def __init__(self, path: Union[str, Path], fsync: bool = True):
+        """Open (and replay) a journal.
+        
+        Args:
+            path: Journal file path. Created if missing.
+            fsync: Whether to fsync after every entry. Disabling it trades
+                durability on power loss for speed.
+                
+        Raises:
+            StorageError: If the journal cannot be read or opened.
+        """
+        self.path = Path(path)
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._states: Dict[str, Dict[str, Any]] = {}
+        
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._replay()
+            self._file = open(self.path, "a", encoding="utf-8")
+        except OSError as e:
+            raise StorageError(f"Error opening run journal {self.path}: {str(e)}")
+            
+    def _replay(self) -> None:
+        """Rebuild sample states from the journal, dropping a torn last line."""
+        if not self.path.exists():
+            return
+            
+        valid_length = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                self._apply(entry)
+                valid_length += len(line)
+                
+        if valid_length < self.path.stat().st_size:
+            with open(self.path, "r+b") as f:
+                f.truncate(valid_length)
+                
+    def _apply(self, entry: Dict[str, Any]) -> None:
+        """Merge one journal entry into the sample's state.
+        
+        Nested dictionaries (such as ``metadata``) are merged one level deep so
+        that each stage can contribute its own keys.
+        """
+        state = self._states.setdefault(entry["id"], {"stage": None, "data": {}})
+        state["stage"] = entry["stage"]
+        for key, value in (entry.get("data") or {}).items():
+            current = state["data"].get(key)
+            if isinstance(value, dict) and isinstance(current, dict):
+                current.update(value)
+            else:
+                state["data"][key] = value
+                
+    def record(self, sample_id: str, stage: str, data: Optional[Dict[str, Any]] = None) -> None:
+        """Durably record that a sample completed a stage.
+        
+        Args:
+            sample_id: Stable sample identifier.
+            stage: Stage the sample just completed (``DONE`` when finished,
+                ``FAILED`` when it failed).
+            data: Outputs of the stage. Values JSON cannot encode are stored
+                as strings.
+                
+        Raises:
+            StorageError: If the entry cannot be written.
+        """
+        self.record_many([(sample_id, stage, data)])
+        
+    def record_many(self, entries: List[Tuple[str, str, Optional[Dict[str, Any]]]]) -> None:
+        """Record several ``(sample_id, stage, data)`` entries with one fsync.
+        
+        Raises:
+            StorageError: If the entries cannot be written.
+        """
+        now = time.time()
+        lines = []
+        for sample_id, stage, data in entries:
+            entry = {"id": sample_id, "stage": stage, "data": data or {}, "time": now}
+            try:
+                lines.append(json.dumps(entry, default=str) + "\n")
+            except ValueError as e:
+                raise StorageError(f"Journal entry for {sample_id} is not serializable: {str(e)}")
+                
+        with self._lock:
+            try:
+                self._file.write("".join(lines))
+                self._file.flush()
+                if self.fsync:
+                    os.fsync(self._file.fileno())
+            except OSError as e:
+                raise StorageError(f"Error writing run journal {self.path}: {str(e)}")
+            # Replay sees what was written, not the caller's objects
+            for line in lines:
+                self._apply(json.loads(line))
+                
+    def get_state(self, sample_id: str) -> Optional[Dict[str, Any]]:
+        """Get the last recorded stage and accumulated outputs of a sample.
+        
+        Returns:
+            Dictionary with ``stage`` and ``data``, or None if never recorded.
+        """
+        with self._lock:
+            state = self._states.get(sample_id)
+            return {"stage": state["stage"], "data": dict(state["data"])} if state else None
+            
+    def is_done(self, sample_id: str) -> bool:
+        """Check whether a sample has been fully processed."""
+        with self._lock:
+            state = self._states.get(sample_id)
+            return state is not None and state["stage"] == self.DONE
+            
+    def completed(self) -> List[str]:
+        """IDs of fully processed samples."""
+        with self._lock:
+            return [sample_id for sample_id, state in self._states.items() if state["stage"] == self.DONE]
+            
+    def in_flight(self) -> List[str]:
+        """IDs of samples that started but did not finish."""
+        with self._lock:
+            return [sample_id for sample_id, state in self._states.items() if state["stage"] != self.DONE]
+            
+    def close(self) -> None:
+        """Close the journal file."""
+        with self._lock:
+            self._file.close()
+            
+    def __len__(self) -> int:
+        return len(self._states)
+        
+    def __repr__(self) -> str:
+        """Return string representation of the journal."""
+        return f"RunJournal(path={self.path}, samples={len(self._states)})"
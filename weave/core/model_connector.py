@@ -1,13 +1,28 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple, Union
 import os
 import json
 import logging
+import time
 import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
 from enum import Enum
-from datetime import datetime, timedelta
+from functools import lru_cache
 import aiohttp
-from .exceptions import ModelError, ModelConnectionError, ModelAPIError, ModelTokenLimitError
+from .exceptions import (
+    ModelError,
+    ModelConnectionError,
+    ModelAPIError,
+    ModelTokenLimitError,
+    InvalidArgumentError
+)
+from .cache import ResponseCache
+from .retry import RetryPolicy, error_status, parse_retry_after
+from .resilience import ProviderGuard
+from .http import get_session, iter_sse_data
+from .inference_engine import InferenceEngine, create_engine
 
 class ModelType(Enum):
     """Supported model types/providers."""
@@ -17,35 +32,124 @@ class ModelType(Enum):
     LOCAL = "local"
 
 class RateLimiter:
-    """Rate limiter for API calls."""
+    """Token-bucket rate limiter for API calls.
     
-    def __init__(self, calls_per_minute: int = 60):
+    Enforces a requests-per-minute budget and, optionally, a tokens-per-minute
+    budget. Either budget can be disabled with None. Each bucket refills
+    continuously and holds at most one minute of budget. A caller reserves
+    capacity up front; if a bucket runs dry its balance goes negative and the
+    caller sleeps for exactly the refill time, without holding the lock, so
+    concurrent waiters are not serialized behind a single sleeper.
+    Reservations are served in arrival order.
+    """
+    
+    def __init__(
+        self,
+        calls_per_minute: Optional[int] = 60,
+        tokens_per_minute: Optional[int] = None
+    ):
+        """Initialize the rate limiter.
+        
+        Args:
+            calls_per_minute: Maximum number of requests per minute, or None
+                for no request budget.
+            tokens_per_minute: Optional maximum number of tokens per minute.
+        """
         self.calls_per_minute = calls_per_minute
-        self.calls = []
-        self._lock = asyncio.Lock()
-        
-    async def acquire(self):
-        """Acquire permission to make an API call."""
-        async with self._lock:
-            now = datetime.now()
-            # Remove calls older than 1 minute
-            self.calls = [t for t in self.calls if now - t < timedelta(minutes=1)]
-            
-            if len(self.calls) >= self.calls_per_minute:
-                # Wait until oldest call is more than 1 minute old
-                wait_time = 60 - (now - self.calls[0]).total_seconds()
-                if wait_time > 0:
-                    await asyncio.sleep(wait_time)
-                self.calls = self.calls[1:]
-            
-            self.calls.append(now)
-
+        self.tokens_per_minute = tokens_per_minute
+        self._request_balance = float(calls_per_minute or 0)
+        self._token_balance = float(tokens_per_minute or 0)
+        self._updated = time.monotonic()
+        # Critical sections never await, so a thread lock also covers limiters
+        # shared between event loops in different threads
+        self._lock = threading.Lock()
+        
+    def _refill(self, now: float) -> None:
+        """Add the budget accrued since the last update to both buckets."""
+        elapsed = now - self._updated
+        self._updated = now
+        if self.calls_per_minute:
+            self._request_balance = min(
+                float(self.calls_per_minute),
+                self._request_balance + elapsed * self.calls_per_minute / 60
+            )
+        if self.tokens_per_minute:
+            self._token_balance = min(
+                float(self.tokens_per_minute),
+                self._token_balance + elapsed * self.tokens_per_minute / 60
+            )
+            
+    def reserve(self, tokens: int = 0) -> float:
+        """Reserve one request and ``tokens`` tokens of budget.
+        
+        Args:
+            tokens: Number of tokens the call is expected to consume.
+            
+        Returns:
+            Seconds the caller must wait before using the reservation.
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            
+            wait = 0.0
+            if self.calls_per_minute:
+                self._request_balance -= 1
+                wait = max(0.0, -self._request_balance) * 60 / self.calls_per_minute
+            
+            if self.tokens_per_minute and tokens:
+                # A single oversized call waits for at most one full bucket
+                self._token_balance -= min(tokens, self.tokens_per_minute)
+                wait = max(wait, max(0.0, -self._token_balance) * 60 / self.tokens_per_minute)
+                
+            return wait
+            
+    async def acquire(self, tokens: int = 0) -> None:
+        """Acquire permission to make an API call.
+        
+        Args:
+            tokens: Number of tokens the call is expected to consume.
+        """
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+            
+    def get_headroom(self) -> Dict[str, Optional[float]]:
+        """Get the budget currently available without waiting.
+        
+        Returns:
+            Dictionary with available ``requests`` and ``tokens`` (None when the
+            corresponding budget is disabled).
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            return {
+                "requests": max(0.0, self._request_balance) if self.calls_per_minute else None,
+                "tokens": max(0.0, self._token_balance) if self.tokens_per_minute else None
+            }
+            
+@lru_cache(maxsize=None)
+def _get_tiktoken_encoding(model_name: str) -> Any:
+    """Resolve (once per model) the tiktoken encoding for a model."""
+    import tiktoken
+    try:
+        return tiktoken.encoding_for_model(model_name)
+    except KeyError:
+        # Unknown or custom model names (e.g. Azure deployments)
+        return tiktoken.get_encoding("cl100k_base")
+        
 class ModelConnector:
     """Handles interactions with various LLM APIs and model endpoints.
     
     This class provides a unified interface for making requests to different
     LLM providers (OpenAI, Azure, Hugging Face, etc.) and handles common
     functionality like API key management, rate limiting, and error handling.
+    
+    ``ModelType.LOCAL`` talks to any OpenAI-compatible server (vLLM, llama.cpp
+    server, a local stub) at ``config["api_base"]`` (default
+    ``http://localhost:8000/v1``) over the shared connection pool. It supports
+    streaming and ``n`` > 1 and has no request budget unless
+    ``calls_per_minute`` is configured; raise ``connection_limit_per_host`` to
+    keep more requests in flight against a batching server.
     """
     
     def __init__(
@@ -53,7 +157,9 @@ class ModelConnector:
         model_type: Union[ModelType, str],
         model_name: str,
         api_key: Optional[str] = None,
-        config: Optional[Dict[str, Any]] = None
+        config: Optional[Dict[str, Any]] = None,
+        cache: Optional[ResponseCache] = None,
+        retry_policy: Optional[RetryPolicy] = None
     ):
         """Initialize the model connector.
         
@@ -62,38 +168,73 @@ class ModelConnector:
             model_name: Name of the specific model to use.
             api_key: Optional API key. If not provided, will look for environment variable.
             config: Additional configuration options.
+            cache: Optional response cache shared across calls (and connectors).
+            retry_policy: Retry policy for failed requests, which may be shared
+                across connectors. Defaults to one built from the config
+                (``max_retries``, ``retry_delay``, ...).
         """
         self.model_type = ModelType(model_type) if isinstance(model_type, str) else model_type
         self.model_name = model_name
         self.config = config or {}
         
+        # Set up logging
+        self.logger = logging.getLogger(__name__)
+        
         # Set up API key
         self._api_key = api_key or self._get_api_key_from_env()
         
         # Initialize provider-specific client
         self._client = self._initialize_client()
         
-        # Set up rate limiter
+        # Set up rate limiter; local servers are only bounded by the connection
+        # pool and in-process engines by their own queue
+        local = self.model_type == ModelType.LOCAL or isinstance(self._client, InferenceEngine)
+        default_calls = None if local else 60
         self._rate_limiter = RateLimiter(
-            calls_per_minute=self.config.get("calls_per_minute", 60)
+            calls_per_minute=self.config.get("calls_per_minute", default_calls),
+            tokens_per_minute=self.config.get("tokens_per_minute")
         )
         
-        # Set up logging
-        self.logger = logging.getLogger(__name__)
+        # Set up response cache
+        self._cache = cache
+        
+        # Set up retries, circuit breaking and adaptive concurrency
+        self._retry_policy = retry_policy or RetryPolicy.from_config(self.config, name=f"{model_name} request")
+        self._guard = ProviderGuard.from_config(self.config, name=f"{self.model_type.value}/{model_name}")
+        
+        # Memoized token counts, keyed on a hash of the text
+        self._token_cache: "OrderedDict[bytes, int]" = OrderedDict()
+        self._token_cache_size = self.config.get("token_cache_size", 4096)
+        self._token_cache_lock = threading.Lock()
         
         # Set up session for API calls
         self._session = None
         
     async def __aenter__(self):
         """Async context manager entry."""
-        self._session = aiohttp.ClientSession()
+        self._session = self._get_session()
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit."""
-        if self._session:
-            await self._session.close()
-            
+        await self.close()
+        
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Get the shared connection pool for the running event loop.
+        
+        Pool settings (``connection_limit``, ``connection_limit_per_host``,
+        ``keepalive_timeout``, ``dns_cache_ttl``) are read from the config.
+        """
+        return get_session(self.config)
+        
+    async def close(self) -> None:
+        """Release this connector's session.
+        
+        The underlying pool is shared with other connectors and is closed with
+        ``weave.core.close_sessions()``.
+        """
+        self._session = None
+        
     def _get_api_key_from_env(self) -> Optional[str]:
         """Get API key from environment variables based on model type."""
         env_var_map = {
@@ -129,15 +270,19 @@ class ModelConnector:
                 return openai
                 
             elif self.model_type == ModelType.HUGGINGFACE:
-                from transformers import AutoTokenizer, AutoModelForCausalLM
-                return {
-                    "tokenizer": AutoTokenizer.from_pretrained(self.model_name),
-                    "model": AutoModelForCausalLM.from_pretrained(self.model_name)
-                }
+                # In-process engine: vLLM when installed, batched transformers otherwise
+                return create_engine(self.model_name, self.config)
                 
             elif self.model_type == ModelType.LOCAL:
-                # Implement connection to local models (e.g., via FastAPI endpoint)
-                return None
+                # Any OpenAI-compatible server (vLLM, llama.cpp server, TGI, ...)
+                headers = {"Content-Type": "application/json"}
+                if self._api_key:
+                    headers["Authorization"] = f"Bearer {self._api_key}"
+                return {
+                    "api_base": self.config.get("api_base", "http://localhost:8000/v1").rstrip("/"),
+                    "headers": headers,
+                    "timeout": self.config.get("timeout", 120.0)
+                }
                 
             else:
                 raise ValueError(f"Unsupported model type: {self.model_type}")
@@ -145,80 +290,348 @@ class ModelConnector:
         except Exception as e:
             raise ModelConnectionError(f"Failed to initialize {self.model_type} client: {str(e)}")
             
+    async def _cache_lookup(
+        self,
+        use_cache: bool,
+        temperature: Optional[float],
+        **params
+    ) -> Tuple[Optional[str], Optional[Any]]:
+        """Look up a response in the cache.
+        
+        Args:
+            use_cache: Whether the caller allows caching for this call.
+            temperature: Sampling temperature of the call.
+            **params: Remaining request parameters that influence the response.
+            
+        Returns:
+            Tuple of (cache key, cached response). The key is None when the call
+            must not be cached; the response is None on a miss.
+        """
+        if not use_cache or self._cache is None or not self._cache.should_cache(temperature):
+            return None, None
+            
+        key = self._cache.make_key(
+            provider=self.model_type.value,
+            model=self.model_name,
+            temperature=temperature,
+            **params
+        )
+        return key, await self._cache.aget(key)
+        
+    async def _cache_store(self, key: Optional[str], response: Any) -> None:
+        """Store a response under a key returned by ``_cache_lookup``."""
+        if key is not None and response is not None:
+            await self._cache.aset(key, response)
+            
     async def generate(
         self,
         prompt: str,
         max_tokens: int = 100,
         temperature: float = 0.7,
+        use_cache: bool = True,
+        stream: bool = False,
         **kwargs
-    ) -> str:
+    ) -> Union[str, AsyncGenerator[str, None]]:
         """Generate text from the model.
         
         Args:
             prompt: Input prompt/context.
             max_tokens: Maximum number of tokens to generate.
             temperature: Sampling temperature (0.0 = deterministic, 1.0 = creative).
+            use_cache: Whether to serve from and store into the response cache.
+            stream: Whether to stream the response (local models only).
+                Streaming calls are never cached.
             **kwargs: Additional model-specific parameters.
             
         Returns:
-            Generated text response.
+            Generated text response, or an async generator of text deltas when
+            streaming.
             
         Raises:
             ModelError: If generation fails.
             ModelTokenLimitError: If prompt exceeds token limit.
             ModelAPIError: If API call fails.
         """
+        if stream:
+            if self.model_type != ModelType.LOCAL:
+                raise ModelError(f"Streaming is not supported for {self.model_type.value} models")
+            self._guard.check()
+            await self._reserve_capacity(prompt, max_tokens)
+            payload = self._local_payload(prompt, 1, max_tokens, temperature, **kwargs)
+            payload["stream"] = True
+            return self._local_stream(payload)
+            
+        cache_key, cached = await self._cache_lookup(
+            use_cache, temperature, prompt=prompt, max_tokens=max_tokens, **kwargs
+        )
+        if cached is not None:
+            return cached
+            
         try:
-            # Check token limit
-            token_count = self.get_token_count(prompt)
-            model_token_limit = self.config.get("max_tokens", 4096)  # Default to 4096
-            if token_count + max_tokens > model_token_limit:
-                raise ModelTokenLimitError(
-                    f"Total tokens ({token_count + max_tokens}) would exceed "
-                    f"model limit ({model_token_limit})"
-                )
-                
-            # Apply rate limiting
-            await self._rate_limiter.acquire()
+            texts = await self._retry_policy.run(
+                lambda: self._complete(prompt, 1, max_tokens, temperature, **kwargs)
+            )
+            text = texts[0]
+            await self._cache_store(cache_key, text)
+            return text
             
-            if self.model_type == ModelType.OPENAI:
-                response = await self._client.ChatCompletion.acreate(
-                    model=self.model_name,
-                    messages=[{"role": "user", "content": prompt}],
-                    max_tokens=max_tokens,
-                    temperature=temperature,
-                    **kwargs
-                )
-                return response.choices[0].message.content
-                
-            elif self.model_type == ModelType.AZURE:
-                response = await self._client.ChatCompletion.acreate(
-                    deployment_id=self.model_name,
-                    messages=[{"role": "user", "content": prompt}],
-                    max_tokens=max_tokens,
-                    temperature=temperature,
-                    **kwargs
-                )
-                return response.choices[0].message.content
-                
-            elif self.model_type == ModelType.HUGGINGFACE:
-                inputs = self._client["tokenizer"](prompt, return_tensors="pt")
-                outputs = self._client["model"].generate(
-                    inputs["input_ids"],
-                    max_length=max_tokens,
-                    temperature=temperature,
-                    **kwargs
-                )
-                return self._client["tokenizer"].decode(outputs[0], skip_special_tokens=True)
-                
-            elif self.model_type == ModelType.LOCAL:
-                raise NotImplementedError("Local model inference not yet implemented")
-                
         except ModelError:
             raise
         except Exception as e:
             self.logger.error(f"Error generating text: {str(e)}")
-            raise ModelAPIError(f"Generation failed: {str(e)}")
+            raise ModelAPIError(f"Generation failed: {str(e)}", status=error_status(e))
+            
+    async def generate_many(
+        self,
+        prompt: str,
+        n: int,
+        max_tokens: int = 100,
+        temperature: float = 0.7,
+        use_cache: bool = True,
+        **kwargs
+    ) -> List[str]:
+        """Sample several completions of the same prompt in a single call.
+        
+        The prompt is sent (and billed) once rather than ``n`` times, which is
+        considerably cheaper than ``n`` separate ``generate`` calls when many
+        samples share a prompt template.
+        
+        Args:
+            prompt: Input prompt/context.
+            n: Number of completions to sample.
+            max_tokens: Maximum number of tokens to generate per completion.
+            temperature: Sampling temperature (0.0 = deterministic, 1.0 = creative).
+            use_cache: Whether to serve from and store into the response cache.
+            **kwargs: Additional model-specific parameters.
+            
+        Returns:
+            List of ``n`` generated texts.
+            
+        Raises:
+            InvalidArgumentError: If n is less than 1.
+            ModelError: If generation fails.
+            ModelTokenLimitError: If prompt exceeds token limit.
+            ModelAPIError: If API call fails.
+        """
+        if n < 1:
+            raise InvalidArgumentError("n", "must be at least 1")
+            
+        cache_key, cached = await self._cache_lookup(
+            use_cache, temperature, prompt=prompt, n=n, max_tokens=max_tokens, **kwargs
+        )
+        if cached is not None:
+            return cached
+            
+        try:
+            texts = await self._retry_policy.run(
+                lambda: self._complete(prompt, n, max_tokens, temperature, **kwargs)
+            )
+            await self._cache_store(cache_key, texts)
+            return texts
+            
+        except ModelError:
+            raise
+        except Exception as e:
+            self.logger.error(f"Error generating text: {str(e)}")
+            raise ModelAPIError(f"Generation failed: {str(e)}", status=error_status(e))
+            
+    async def _complete(
+        self,
+        prompt: str,
+        n: int,
+        max_tokens: int,
+        temperature: float,
+        **kwargs
+    ) -> List[str]:
+        """Run ``n`` completions of a prompt against the configured backend.
+        
+        Args:
+            prompt: Input prompt/context.
+            n: Number of completions to sample.
+            max_tokens: Maximum number of tokens to generate per completion.
+            temperature: Sampling temperature.
+            **kwargs: Additional model-specific parameters.
+            
+        Returns:
+            List of generated texts.
+            
+        Raises:
+            ModelTokenLimitError: If prompt exceeds token limit.
+            CircuitOpenError: If the backend's circuit breaker is open.
+        """
+        await self._reserve_capacity(prompt, max_tokens, n)
+        
+        if isinstance(self._client, InferenceEngine):
+            # In-process engines batch concurrent calls themselves
+            return await self._call_backend(prompt, n, max_tokens, temperature, **kwargs)
+        return await self._guard.call(
+            lambda: self._call_backend(prompt, n, max_tokens, temperature, **kwargs)
+        )
+        
+    async def _call_backend(
+        self,
+        prompt: str,
+        n: int,
+        max_tokens: int,
+        temperature: float,
+        **kwargs
+    ) -> List[str]:
+        """Send one completion request to the configured backend."""
+        if self.model_type == ModelType.OPENAI:
+            response = await self._client.ChatCompletion.acreate(
+                model=self.model_name,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=max_tokens,
+                temperature=temperature,
+                n=n,
+                **kwargs
+            )
+            return [choice.message.content for choice in response.choices]
+            
+        elif self.model_type == ModelType.AZURE:
+            response = await self._client.ChatCompletion.acreate(
+                deployment_id=self.model_name,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=max_tokens,
+                temperature=temperature,
+                n=n,
+                **kwargs
+            )
+            return [choice.message.content for choice in response.choices]
+            
+        elif self.model_type == ModelType.HUGGINGFACE:
+            return await self._client.generate(
+                prompt,
+                n=n,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                **kwargs
+            )
+            
+        elif self.model_type == ModelType.LOCAL:
+            payload = self._local_payload(prompt, n, max_tokens, temperature, **kwargs)
+            data = await self._local_request("/chat/completions", payload)
+            choices = sorted(data["choices"], key=lambda choice: choice.get("index", 0))
+            return [choice["message"]["content"] for choice in choices]
+            
+        raise ModelError(f"Unsupported model type: {self.model_type}")
+        
+    async def _reserve_capacity(self, prompt: str, max_tokens: int, n: int = 1) -> None:
+        """Check the token limit and wait for rate-limit budget.
+        
+        Args:
+            prompt: Input prompt/context.
+            max_tokens: Maximum number of tokens to generate per completion.
+            n: Number of completions requested.
+            
+        Raises:
+            ModelTokenLimitError: If prompt exceeds token limit.
+        """
+        # Check token limit
+        token_count = self.get_token_count(prompt)
+        model_token_limit = self.config.get("max_tokens", 4096)  # Default to 4096
+        if token_count + max_tokens > model_token_limit:
+            raise ModelTokenLimitError(
+                f"Total tokens ({token_count + max_tokens}) would exceed "
+                f"model limit ({model_token_limit})"
+            )
+            
+        # Apply rate limiting; the prompt is only counted once for n samples
+        await self._rate_limiter.acquire(tokens=token_count + max_tokens * n)
+        
+    def _local_payload(
+        self,
+        prompt: str,
+        n: int,
+        max_tokens: int,
+        temperature: float,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """Build a chat completions request body for a local server."""
+        payload = {
+            "model": self.model_name,
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            **kwargs
+        }
+        if n > 1:
+            payload["n"] = n
+        return payload
+        
+    async def _local_request(self, endpoint: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a request to the local OpenAI-compatible server.
+        
+        Args:
+            endpoint: API endpoint relative to ``config["api_base"]``.
+            payload: JSON request body.
+            
+        Returns:
+            Decoded JSON response.
+            
+        Raises:
+            ModelAPIError: If the server returns an error status.
+            ModelConnectionError: If the server cannot be reached.
+        """
+        session = self._get_session()
+        url = f"{self._client['api_base']}{endpoint}"
+        timeout = aiohttp.ClientTimeout(total=self._client["timeout"])
+        
+        try:
+            async with session.post(url, json=payload, headers=self._client["headers"], timeout=timeout) as response:
+                if response.status != 200:
+                    raise ModelAPIError(
+                        f"Local model server error ({response.status}): {(await response.text())[:200]}",
+                        status=response.status,
+                        retry_after=parse_retry_after(response.headers)
+                    )
+                return await response.json()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise ModelConnectionError(f"Local model server request failed: {str(e)}")
+            
+    async def _local_stream(self, payload: Dict[str, Any]) -> AsyncGenerator[str, None]:
+        """Stream text deltas from the local OpenAI-compatible server.
+        
+        Args:
+            payload: Chat completions request body with ``stream`` set.
+            
+        Yields:
+            Generated text deltas in arrival order.
+            
+        Raises:
+            ModelAPIError: If the server returns an error status or a
+                malformed chunk.
+            ModelConnectionError: If the server cannot be reached.
+        """
+        session = self._get_session()
+        url = f"{self._client['api_base']}/chat/completions"
+        # Streams can legitimately outlive the total timeout; bound the gaps instead
+        timeout = aiohttp.ClientTimeout(
+            total=None,
+            sock_connect=self._client["timeout"],
+            sock_read=self._client["timeout"]
+        )
+        
+        try:
+            async with session.post(url, json=payload, headers=self._client["headers"], timeout=timeout) as response:
+                if response.status != 200:
+                    raise ModelAPIError(
+                        f"Local model server error ({response.status}): {(await response.text())[:200]}"
+                    )
+                    
+                async for data in iter_sse_data(response):
+                    try:
+                        chunk = json.loads(data)
+                    except json.JSONDecodeError:
+                        raise ModelAPIError(f"Malformed stream chunk from local model server: {data[:100]}")
+                        
+                    for choice in chunk.get("choices", []):
+                        content = (choice.get("delta") or {}).get("content")
+                        if content:
+                            yield content
+                            
+        except aiohttp.ClientError as e:
+            raise ModelConnectionError(f"Local model server stream failed: {str(e)}")
             
     async def batch_generate(
         self,
@@ -240,6 +653,10 @@ class ModelConnector:
         Returns:
             List of generated text responses.
         """
+        # In-process engines batch internally, so hand them every prompt at once
+        if self.model_type == ModelType.HUGGINGFACE:
+            batch_size = max(len(prompts), 1)
+            
         results = []
         for i in range(0, len(prompts), batch_size):
             batch = prompts[i:i + batch_size]
@@ -273,24 +690,83 @@ class ModelConnector:
         Returns:
             Estimated number of tokens.
         """
+        return self.count_tokens_batch([text])[0]
+        
+    def count_tokens_batch(self, texts: List[str]) -> List[int]:
+        """Count the tokens of many texts in one pass.
+        
+        Counts are memoized in an LRU cache keyed on a hash of the text
+        (``config["token_cache_size"]`` entries, default 4096), so repeated
+        prompts and templates are only encoded once. Texts missing from the
+        cache are encoded together with the tokenizer's batch API.
+        
+        Args:
+            texts: Input texts to count tokens for.
+            
+        Returns:
+            Estimated number of tokens for each text, in order.
+        """
+        keys = [hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest() for text in texts]
+        counts: List[Optional[int]] = [None] * len(texts)
+        
+        with self._token_cache_lock:
+            for index, key in enumerate(keys):
+                count = self._token_cache.get(key)
+                if count is not None:
+                    self._token_cache.move_to_end(key)
+                    counts[index] = count
+                    
+        missing = [index for index, count in enumerate(counts) if count is None]
+        if not missing:
+            return counts
+            
+        encoded = self._encode_token_counts([texts[index] for index in missing])
+        
+        with self._token_cache_lock:
+            for index, count in zip(missing, encoded):
+                counts[index] = count
+                self._token_cache[keys[index]] = count
+            while len(self._token_cache) > self._token_cache_size:
+                self._token_cache.popitem(last=False)
+                
+        return counts
+        
+    def _encode_token_counts(self, texts: List[str]) -> List[int]:
+        """Count tokens with the model's tokenizer, without caching."""
         try:
             if self.model_type in [ModelType.OPENAI, ModelType.AZURE]:
-                import tiktoken
-                encoding = tiktoken.encoding_for_model(self.model_name)
-                return len(encoding.encode(text))
+                encoding = _get_tiktoken_encoding(self.model_name)
+                return [len(tokens) for tokens in encoding.encode_batch(texts)]
                 
-            elif self.model_type == ModelType.HUGGINGFACE:
-                return len(self._client["tokenizer"].encode(text))
+            elif self.model_type == ModelType.HUGGINGFACE and self._client is not None:
+                return self._client.count_tokens_batch(texts)
                 
             else:
-                # Rough estimate: words / 0.75 (typical tokens per word ratio)
-                return int(len(text.split()) / 0.75)
+                # Rough estimate: words / 0.75 (typical tokens per word ratio),
+                # also used by connectors without a tokenizer client
+                return [int(len(text.split()) / 0.75) for text in texts]
                 
         except Exception as e:
             self.logger.warning(f"Error counting tokens: {str(e)}")
             # Fallback to rough estimate
-            return int(len(text.split()) / 0.75)
+            return [int(len(text.split()) / 0.75) for text in texts]
             
+    def get_rate_limit_headroom(self) -> Dict[str, Optional[float]]:
+        """Get the request and token budget available without waiting.
+        
+        Returns:
+            Dictionary with available ``requests`` and ``tokens``.
+        """
+        return self._rate_limiter.get_headroom()
+        
+    def get_health(self) -> Dict[str, Any]:
+        """Get the provider's circuit state and adaptive concurrency limit.
+        
+        Returns:
+            Dictionary with ``concurrency`` and ``circuit`` statistics.
+        """
+        return self._guard.get_stats()
+        
     def get_model_info(self) -> Dict[str, Any]:
         """Get information about the current model configuration.
         
@@ -301,7 +777,12 @@ class ModelConnector:
             "model_type": self.model_type.value,
             "model_name": self.model_name,
             "config": self.config,
-            "rate_limit": self._rate_limiter.calls_per_minute
+            "rate_limit": self._rate_limiter.calls_per_minute,
+            "token_rate_limit": self._rate_limiter.tokens_per_minute,
+            "cache": self._cache.get_stats() if self._cache else None,
+            "retry": self._retry_policy.get_stats(),
+            "health": self._guard.get_stats(),
+            "engine": self._client.get_stats() if isinstance(self._client, InferenceEngine) else None
         }
         
     def __repr__(self) -> str:
@@ -0,0 +1,472 @@
+"""Adaptive concurrency and circuit breaking for model providers."""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Optional, Tuple, TypeVar
+
+from .exceptions import CircuitOpenError, InvalidArgumentError
+from .retry import classify_error, error_status
+
+T = TypeVar("T")
+
+def is_overload(error: BaseException) -> bool:
+    """Whether an error signals an overloaded provider (429, 5xx, timeouts, connection failures)."""
+    return classify_error(error) is True
+
+def is_outage(error: BaseException) -> bool:
+    """Whether an error signals an unavailable provider.
+    
+    Like ``is_overload``, but rate limiting (429) does not count: the provider
+    is up, just asking for less traffic.
+    """
+    return is_overload(error) and error_status(error) != 429
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD limit on the number of requests in flight.
+    
+    The limit starts at ``initial_limit`` and doubles every round trip
+    (slow start) until the first sign of congestion. After that it grows by
+    one request per round trip while requests succeed (additive increase)
+    and is multiplied by ``backoff_ratio`` when a request fails with a
+    429/5xx/timeout (multiplicative decrease). With ``latency_tolerance``
+    set, recent latency above that multiple of the long-run latency also
+    counts as congestion; only enable it for requests of similar size, since
+    a mix of short and long completions looks like congestion. At most one
+    decrease is applied per round trip, so a burst of failures from
+    requests that were already in flight counts as one congestion signal.
+    
+    Requests beyond the limit wait in arrival order. The limiter can be used
+    from several event loops (threads) at once.
+    """
+    
+    def __init__(
+        self,
+        initial_limit: int = 8,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        backoff_ratio: float = 0.5,
+        latency_tolerance: Optional[float] = None
+    ):
+        """Initialize the limiter.
+        
+        Args:
+            initial_limit: Requests allowed in flight at the start.
+            min_limit: Lowest the limit can shrink to.
+            max_limit: Highest the limit can grow to.
+            backoff_ratio: Factor applied to the limit on congestion.
+            latency_tolerance: How much slower than the long-run average
+                recent requests may be before counting as congestion (e.g.
+                2.0). None (the default) ignores latency and reacts to errors
+                only.
+                
+        Raises:
+            InvalidArgumentError: If the limits are inconsistent.
+        """
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise InvalidArgumentError("initial_limit", "need 1 <= min_limit <= initial_limit <= max_limit")
+        if not 0 < backoff_ratio < 1:
+            raise InvalidArgumentError("backoff_ratio", "must be between 0 and 1")
+            
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_ratio = backoff_ratio
+        self.latency_tolerance = latency_tolerance
+        
+        self._limit = float(initial_limit)
+        self._in_flight = 0
+        self._slow_start = True
+        self._last_decrease = 0.0
+        # Short- and long-run latency averages
+        self._latency: Optional[float] = None
+        self._baseline_latency: Optional[float] = None
+        self._waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+        # Critical sections never await, so a thread lock also covers limiters
+        # shared between event loops in different threads
+        self._lock = threading.Lock()
+        self._stats = {
+            "requests": 0,
+            "waits": 0,
+            "increases": 0,
+            "decreases": 0
+        }
+        
+    @property
+    def limit(self) -> int:
+        """Current number of requests allowed in flight."""
+        return int(self._limit)
+        
+    async def acquire(self) -> None:
+        """Wait for a slot; every ``acquire`` must be paired with ``release``."""
+        with self._lock:
+            self._stats["requests"] += 1
+            if self._in_flight < int(self._limit) and not self._waiters:
+                self._in_flight += 1
+                return
+            self._stats["waits"] += 1
+            waiter = (asyncio.get_running_loop(), asyncio.get_running_loop().create_future())
+            self._waiters.append(waiter)
+            
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with self._lock:
+                try:
+                    self._waiters.remove(waiter)
+                    granted = False
+                except ValueError:
+                    # A slot was handed over just before the cancellation
+                    granted = True
+            if granted:
+                self._finish(None, None)
+            raise
+            
+    def release(self, latency: Optional[float] = None, error: Optional[BaseException] = None) -> None:
+        """Return a slot and adapt the limit to the request's outcome.
+        
+        Args:
+            latency: Seconds the request took, or None if unknown.
+            error: Exception the request failed with, if any.
+        """
+        self._finish(latency, error)
+        
+    def _finish(self, latency: Optional[float], error: Optional[BaseException]) -> None:
+        now = time.monotonic()
+        with self._lock:
+            utilized = self._in_flight >= int(self._limit)
+            self._in_flight -= 1
+            
+            if error is not None and is_overload(error):
+                self._decrease(now)
+            elif latency is not None and error is None:
+                congested = self._observe_latency(latency)
+                if congested:
+                    self._decrease(now)
+                elif utilized:
+                    self._increase()
+                    
+            self._wake()
+            
+    def _observe_latency(self, latency: float) -> bool:
+        """Update latency averages; True if recent latency signals congestion."""
+        if self._latency is None:
+            self._latency = self._baseline_latency = latency
+            return False
+        self._latency += 0.2 * (latency - self._latency)
+        self._baseline_latency += 0.02 * (latency - self._baseline_latency)
+        if self.latency_tolerance is None:
+            return False
+        return self._latency > self.latency_tolerance * self._baseline_latency
+        
+    def _increase(self) -> None:
+        if self._limit >= self.max_limit:
+            return
+        step = 1.0 if self._slow_start else 1.0 / self._limit
+        self._limit = min(float(self.max_limit), self._limit + step)
+        self._stats["increases"] += 1
+        
+    def _decrease(self, now: float) -> None:
+        # One decrease per round trip
+        if now - self._last_decrease < (self._latency or 0.0):
+            return
+        self._slow_start = False
+        self._last_decrease = now
+        self._limit = max(float(self.min_limit), self._limit * self.backoff_ratio)
+        self._stats["decreases"] += 1
+        
+    def _wake(self) -> None:
+        """Hand free slots to waiters in arrival order (lock held)."""
+        while self._waiters and self._in_flight < int(self._limit):
+            loop, future = self._waiters.popleft()
+            self._in_flight += 1
+            loop.call_soon_threadsafe(self._grant, future)
+            
+    @staticmethod
+    def _grant(future: asyncio.Future) -> None:
+        if not future.done():
+            future.set_result(None)
+            
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the current limit, load and adjustment counters.
+        
+        Returns:
+            Dictionary of limiter statistics.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                "limit": int(self._limit),
+                "in_flight": self._in_flight,
+                "waiting": len(self._waiters),
+                "slow_start": self._slow_start,
+                "latency": self._latency,
+                "baseline_latency": self._baseline_latency
+            })
+            return stats
+
+class CircuitBreaker:
+    """Fail fast while a provider is down.
+    
+    After ``failure_threshold`` consecutive outage errors (5xx, timeouts,
+    connection failures; see ``is_outage``) the circuit opens and calls are
+    rejected immediately with ``CircuitOpenError`` instead of each waiting
+    for its own timeout. After ``reset_timeout`` seconds the circuit is
+    half-open and lets ``half_open_calls`` probe requests through: a success
+    closes it, a failure opens it again. Other errors (bad requests, rate
+    limits) do not affect the circuit.
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        half_open_calls: int = 1,
+        name: Optional[str] = None
+    ):
+        """Initialize the circuit breaker.
+        
+        Args:
+            failure_threshold: Consecutive outage errors that open the circuit.
+            reset_timeout: Seconds the circuit stays open before probing.
+            half_open_calls: Probe requests allowed while half-open.
+            name: Provider name used in error messages.
+            
+        Raises:
+            InvalidArgumentError: If a limit is not positive.
+        """
+        if failure_threshold < 1:
+            raise InvalidArgumentError("failure_threshold", "must be at least 1")
+        if half_open_calls < 1:
+            raise InvalidArgumentError("half_open_calls", "must be at least 1")
+            
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_calls = half_open_calls
+        self.name = name or "provider"
+        
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            "opened": 0,
+            "rejected": 0
+        }
+        
+    @property
+    def state(self) -> str:
+        """Current state: ``closed``, ``open`` or ``half_open``."""
+        with self._lock:
+            self._update(time.monotonic())
+            return self._state
+            
+    def _update(self, now: float) -> None:
+        if self._state == self.OPEN and now - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._probes = 0
+            
+    def check(self, probe: bool = True) -> None:
+        """Admit a call or reject it.
+        
+        Args:
+            probe: Whether the call may take a half-open probe slot. A caller
+                that admits a probe must report its outcome with
+                ``record_success``, ``record_failure`` or ``record_cancelled``;
+                callers that never report one pass False and are only
+                admitted while the circuit is closed.
+                
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with all
+                probes already in flight (or ``probe`` is False).
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._update(now)
+            if self._state == self.CLOSED:
+                return
+            if probe and self._state == self.HALF_OPEN and self._probes < self.half_open_calls:
+                self._probes += 1
+                return
+            self._stats["rejected"] += 1
+            retry_after = max(0.0, self.reset_timeout - (now - self._opened_at))
+            
+        raise CircuitOpenError(
+            f"Circuit for {self.name} is open after repeated failures; retry in {retry_after:.1f}s",
+            retry_after=retry_after
+        )
+        
+    def record_success(self) -> None:
+        """Record a call that reached the provider and was served."""
+        with self._lock:
+            self._failures = 0
+            self._state = self.CLOSED
+            
+    def record_failure(self, error: BaseException) -> None:
+        """Record a failed call; only outage errors count."""
+        if not is_outage(error):
+            self.record_success()
+            return
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self._stats["opened"] += 1
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                
+    def record_cancelled(self) -> None:
+        """Record a call abandoned before it finished, freeing its probe slot."""
+        with self._lock:
+            if self._state == self.HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+                
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the circuit state and counters.
+        
+        Returns:
+            Dictionary of circuit breaker statistics.
+        """
+        with self._lock:
+            self._update(time.monotonic())
+            stats = dict(self._stats)
+            stats["state"] = self._state
+            stats["consecutive_failures"] = self._failures
+            return stats
+
+class ProviderGuard:
+    """Circuit breaker plus adaptive concurrency limit around provider calls.
+    
+    ``call`` runs one request attempt: it fails fast if the circuit is open,
+    waits for a concurrency slot, times the request and feeds the outcome
+    back to both. Connectors wrap each attempt of their retry policy with it,
+    so a retry also re-enters the breaker and the limiter.
+    """
+    
+    def __init__(
+        self,
+        limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+        breaker: Optional[CircuitBreaker] = None
+    ):
+        """Initialize the guard.
+        
+        Args:
+            limiter: Concurrency limiter, or None for no limit.
+            breaker: Circuit breaker, or None to never fail fast.
+        """
+        self.limiter = limiter
+        self.breaker = breaker
+        
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]] = None, name: Optional[str] = None) -> "ProviderGuard":
+        """Build a guard from connector configuration.
+        
+        Recognised keys: ``adaptive_concurrency`` (default True),
+        ``initial_in_flight`` (8), ``min_in_flight`` (1), ``max_in_flight``
+        (64), ``latency_tolerance`` (None, i.e. errors only),
+        ``circuit_breaker`` (default True), ``circuit_failure_threshold`` (5)
+        and ``circuit_reset_timeout`` (30 seconds).
+        
+        Args:
+            config: Connector configuration. Unrelated keys are ignored.
+            name: Provider name used in error messages.
+            
+        Returns:
+            New provider guard.
+        """
+        config = config or {}
+        limiter = None
+        if config.get("adaptive_concurrency", True):
+            max_limit = config.get("max_in_flight", 64)
+            limiter = AdaptiveConcurrencyLimiter(
+                initial_limit=min(config.get("initial_in_flight", 8), max_limit),
+                min_limit=config.get("min_in_flight", 1),
+                max_limit=max_limit,
+                latency_tolerance=config.get("latency_tolerance")
+            )
+        breaker = None
+        if config.get("circuit_breaker", True):
+            breaker = CircuitBreaker(
+                failure_threshold=config.get("circuit_failure_threshold", 5),
+                reset_timeout=config.get("circuit_reset_timeout", 30.0),
+                name=name
+            )
+        return cls(limiter, breaker)
+        
+    def check(self) -> None:
+        """Fail fast unless the circuit is closed, without taking a slot.
+        
+        Used for streams, whose duration says nothing about provider health.
+        Streams do not report an outcome, so they never take a half-open probe
+        slot: while the circuit is half-open they are rejected and the probe
+        is left to a regular call.
+        
+        Raises:
+            CircuitOpenError: If the circuit is open or half-open.
+        """
+        if self.breaker is not None:
+            self.breaker.check(probe=False)
+            
+    async def call(self, func: Callable[[], Awaitable[T]]) -> T:
+        """Run one request attempt under the breaker and the limiter.
+        
+        Args:
+            func: Zero-argument coroutine function making the request.
+            
+        Returns:
+            The request's result.
+            
+        Raises:
+            CircuitOpenError: If the circuit is open.
+            Exception: Whatever the request raised.
+        """
+        async with self.slot():
+            return await func()
+            
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Context manager form of ``call`` for requests that are not a single coroutine."""
+        if self.breaker is not None:
+            self.breaker.check()
+        if self.limiter is not None:
+            await self.limiter.acquire()
+            
+        started = time.monotonic()
+        try:
+            yield
+        except asyncio.CancelledError:
+            # The outcome is unknown: free the slot and probe without judging the provider
+            if self.limiter is not None:
+                self.limiter.release()
+            if self.breaker is not None:
+                self.breaker.record_cancelled()
+            raise
+        except Exception as e:
+            if self.limiter is not None:
+                self.limiter.release(time.monotonic() - started, e)
+            if self.breaker is not None:
+                self.breaker.record_failure(e)
+            raise
+        else:
+            if self.limiter is not None:
+                self.limiter.release(time.monotonic() - started)
+            if self.breaker is not None:
+                self.breaker.record_success()
+                
+    def get_stats(self) -> Dict[str, Any]:
+        """Get limiter and breaker statistics.
+        
+        Returns:
+            Dictionary with ``concurrency`` and ``circuit`` entries (None when
+            the corresponding mechanism is disabled).
+        """
+        return {
+            "concurrency": self.limiter.get_stats() if self.limiter else None,
+            "circuit": self.breaker.get_stats() if self.breaker else None
+        }
@@ -0,0 +1,351 @@
+"""Shared retry policy for model provider requests."""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from functools import wraps
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional, Tuple, TypeVar
+
+import aiohttp
+
+from .exceptions import (
+    CircuitOpenError,
+    InvalidArgumentError,
+    ModelConnectionError,
+    ModelTokenLimitError,
+    ResourceExhaustedError
+)
+
+T = TypeVar("T")
+
+# HTTP statuses worth retrying: timeouts, conflicts, rate limits, server errors
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 425, 429, 500, 502, 503, 504})
+
+def parse_retry_after(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    """Read the server's requested retry delay from response headers.
+    
+    Understands ``retry-after-ms`` (OpenAI) and ``Retry-After`` given either
+    in seconds or as an HTTP date.
+    
+    Args:
+        headers: Response headers (case-insensitive mappings such as aiohttp's
+            are looked up as-is).
+            
+    Returns:
+        Delay in seconds, or None if the headers do not specify one.
+    """
+    if not headers:
+        return None
+        
+    value = headers.get("retry-after-ms")
+    if value is not None:
+        try:
+            return max(0.0, float(value) / 1000)
+        except ValueError:
+            pass
+            
+    value = headers.get("Retry-After") or headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def error_status(error: BaseException) -> Optional[int]:
+    """HTTP status attached to an error, if any.
+    
+    Covers ``ModelAPIError.status`` as well as the ``status_code`` /
+    ``http_status`` attributes used by SDK exceptions.
+    """
+    for attribute in ("status", "status_code", "http_status"):
+        status = getattr(error, attribute, None)
+        if isinstance(status, int):
+            return status
+    return None
+
+def classify_error(error: BaseException) -> Optional[bool]:
+    """Decide whether an error is worth retrying.
+    
+    Args:
+        error: Exception raised by an attempt.
+        
+    Returns:
+        True for transient errors (connection failures, timeouts, HTTP 429 and
+        5xx), False for errors a retry cannot fix (bad requests, auth, token
+        limits, open circuits), None when the error carries no signal either way.
+    """
+    if isinstance(error, (ModelTokenLimitError, InvalidArgumentError, ResourceExhaustedError, CircuitOpenError)):
+        return False
+        
+    status = error_status(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES
+        
+    if isinstance(error, (ModelConnectionError, asyncio.TimeoutError, aiohttp.ClientError, ConnectionError)):
+        return True
+    return None
+
+class RetryPolicy:
+    """Asynchronous retry policy with full jitter and a retry budget.
+    
+    An attempt that fails with a retryable error (see ``classify_error``) is
+    retried after sleeping with ``asyncio.sleep``, so other requests on the
+    event loop keep running during the backoff. Delays use full jitter: a
+    uniform draw between zero and ``initial_delay * exponential_base **
+    attempt``, capped at ``max_delay``. A ``retry_after`` hint on the error
+    (from a ``Retry-After`` header) takes precedence as the minimum delay.
+    
+    A policy can be shared by several connectors. Its retry budget bounds the
+    retries across all of them: every call deposits ``budget_ratio`` retry
+    tokens (up to ``budget_burst``) and every retry spends one, so during an
+    outage retries add at most ``budget_ratio`` extra load instead of
+    multiplying it. Counters are available from ``get_stats``.
+    """
+    
+    def __init__(
+        self,
+        max_retries: int = 3,
+        initial_delay: float = 1.0,
+        max_delay: float = 60.0,
+        exponential_base: float = 2.0,
+        jitter: bool = True,
+        budget_ratio: Optional[float] = 0.2,
+        budget_burst: float = 10.0,
+        retry_on: Tuple[type, ...] = (),
+        retry_only_on: bool = False,
+        name: Optional[str] = None
+    ):
+        """Initialize the retry policy.
+        
+        Args:
+            max_retries: Maximum number of retries per call (attempts are
+                ``max_retries + 1``).
+            initial_delay: Base delay before the first retry, in seconds.
+            max_delay: Maximum delay between attempts, in seconds. A
+                ``Retry-After`` longer than this fails the call instead of
+                waiting.
+            exponential_base: Growth factor of the backoff.
+            jitter: Draw delays uniformly from [0, backoff] (full jitter).
+            budget_ratio: Retry tokens earned per call, i.e. the long-run
+                fraction of calls that may be retried. None disables the budget.
+            budget_burst: Maximum retry tokens saved up (and the starting
+                balance).
+            retry_on: Exception types retried when ``classify_error`` has no
+                opinion about them. Errors classified as fatal are never retried.
+            retry_only_on: Retry nothing outside ``retry_on``, even errors
+                ``classify_error`` deems transient.
+            name: Name used in log messages.
+            
+        Raises:
+            InvalidArgumentError: If a limit is negative.
+        """
+        if max_retries < 0:
+            raise InvalidArgumentError("max_retries", "must not be negative")
+        if initial_delay < 0 or max_delay < 0:
+            raise InvalidArgumentError("initial_delay", "delays must not be negative")
+        if budget_ratio is not None and budget_ratio < 0:
+            raise InvalidArgumentError("budget_ratio", "must not be negative")
+            
+        self.max_retries = max_retries
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.exponential_base = exponential_base
+        self.jitter = jitter
+        self.budget_ratio = budget_ratio
+        self.budget_burst = budget_burst
+        self.retry_on = tuple(retry_on)
+        self.retry_only_on = retry_only_on
+        self.name = name or "request"
+        self.logger = logging.getLogger(__name__)
+        
+        self._budget = float(budget_burst)
+        # Counters are updated from any loop or thread sharing the policy
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Any] = {
+            "calls": 0,
+            "attempts": 0,
+            "retries": 0,
+            "successes": 0,
+            "failures": 0,
+            "fatal_errors": 0,
+            "exhausted": 0,
+            "budget_exhausted": 0,
+            "backoff_seconds": 0.0,
+            "retry_reasons": {}
+        }
+        
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]] = None, **defaults: Any) -> "RetryPolicy":
+        """Build a policy from ``max_retries``, ``retry_delay``, ``max_retry_delay``,
+        ``retry_budget_ratio`` and ``retry_budget_burst`` config keys.
+        
+        Args:
+            config: Connector configuration. Unrelated keys are ignored.
+            **defaults: Constructor arguments used when a key is absent.
+            
+        Returns:
+            New retry policy.
+        """
+        config = config or {}
+        keys = {
+            "max_retries": "max_retries",
+            "retry_delay": "initial_delay",
+            "max_retry_delay": "max_delay",
+            "retry_budget_ratio": "budget_ratio",
+            "retry_budget_burst": "budget_burst"
+        }
+        kwargs = dict(defaults)
+        for key, argument in keys.items():
+            if key in config:
+                kwargs[argument] = config[key]
+        return cls(**kwargs)
+        
+    def should_retry(self, error: BaseException) -> bool:
+        """Check whether an error is retryable under this policy."""
+        if self.retry_only_on and not isinstance(error, self.retry_on):
+            return False
+        retryable = classify_error(error)
+        if retryable is None:
+            return isinstance(error, self.retry_on)
+        return retryable
+        
+    def backoff(self, retry: int, retry_after: Optional[float] = None) -> float:
+        """Delay before a retry.
+        
+        Args:
+            retry: Zero-based retry number.
+            retry_after: Server-requested minimum delay, if any.
+            
+        Returns:
+            Seconds to sleep.
+        """
+        ceiling = min(self.max_delay, self.initial_delay * self.exponential_base ** retry)
+        delay = random.uniform(0, ceiling) if self.jitter else ceiling
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+        
+    def _record_call(self) -> None:
+        with self._lock:
+            self._stats["calls"] += 1
+            if self.budget_ratio is not None:
+                self._budget = min(self.budget_burst, self._budget + self.budget_ratio)
+                
+    def _spend_budget(self) -> bool:
+        """Take one retry token; False if the budget is exhausted."""
+        with self._lock:
+            if self.budget_ratio is None:
+                return True
+            if self._budget < 1:
+                self._stats["budget_exhausted"] += 1
+                return False
+            self._budget -= 1
+            return True
+            
+    def _count(self, key: str, amount: float = 1) -> None:
+        with self._lock:
+            self._stats[key] += amount
+            
+    async def run(self, func: Callable[[], Awaitable[T]], description: Optional[str] = None) -> T:
+        """Call ``func`` until it succeeds or the policy gives up.
+        
+        Args:
+            func: Zero-argument coroutine function making one attempt. It is
+                called again for every retry, so it must rebuild any
+                single-use request state (e.g. form data).
+            description: What is being attempted, for log messages.
+            
+        Returns:
+            Result of the first successful attempt.
+            
+        Raises:
+            Exception: The last attempt's error, when it is fatal, the retries
+                or the retry budget run out, or its ``Retry-After`` exceeds
+                ``max_delay``.
+        """
+        description = description or self.name
+        self._record_call()
+        
+        retry = 0
+        while True:
+            self._count("attempts")
+            try:
+                result = await func()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if not self.should_retry(e):
+                    self._count("fatal_errors")
+                    self._count("failures")
+                    raise
+                if retry >= self.max_retries:
+                    self._count("exhausted")
+                    self._count("failures")
+                    raise
+                    
+                retry_after = getattr(e, "retry_after", None)
+                if retry_after is not None and retry_after > self.max_delay:
+                    self.logger.warning(
+                        f"{description} failed and the server asked to wait {retry_after:.1f}s, "
+                        f"longer than the {self.max_delay:.1f}s limit: {str(e)}"
+                    )
+                    self._count("failures")
+                    raise
+                if not self._spend_budget():
+                    self.logger.warning(f"{description} failed and the retry budget is exhausted: {str(e)}")
+                    self._count("failures")
+                    raise
+                    
+                delay = self.backoff(retry, retry_after)
+                reason = str(error_status(e) or type(e).__name__)
+                with self._lock:
+                    self._stats["retries"] += 1
+                    self._stats["backoff_seconds"] += delay
+                    self._stats["retry_reasons"][reason] = self._stats["retry_reasons"].get(reason, 0) + 1
+                    
+                self.logger.warning(
+                    f"{description} attempt {retry + 1}/{self.max_retries + 1} failed: {str(e)}. "
+                    f"Retrying in {delay:.1f} seconds..."
+                )
+                await asyncio.sleep(delay)
+                retry += 1
+            else:
+                self._count("successes")
+                return result
+                
+    def __call__(self, func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        """Use the policy as a decorator for coroutine functions."""
+        @wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            return await self.run(lambda: func(*args, **kwargs), description=func.__qualname__)
+        return wrapper
+        
+    def get_stats(self) -> Dict[str, Any]:
+        """Get retry counters.
+        
+        Returns:
+            Dictionary with call, attempt, retry, success and failure counts,
+            total backoff time, retries per reason (HTTP status or exception
+            type) and the remaining retry budget.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["retry_reasons"] = dict(self._stats["retry_reasons"])
+            stats["retry_rate"] = stats["retries"] / stats["calls"] if stats["calls"] else 0.0
+            stats["budget"] = self._budget if self.budget_ratio is not None else None
+            return stats
+            
+    def __repr__(self) -> str:
+        """Return string representation of the policy."""
+        return (
+            f"RetryPolicy(max_retries={self.max_retries}, initial_delay={self.initial_delay}, "
+            f"max_delay={self.max_delay}, budget_ratio={self.budget_ratio})"
+        )
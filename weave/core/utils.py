@@ -1,13 +1,20 @@
 import os
 import json
 import yaml
+import asyncio
 import logging
-from typing import Any, Dict, List, Optional, Union
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, TypeVar, Union
 from pathlib import Path
-import time
-from functools import wraps
 
-from .exceptions import ConfigurationError, StorageError
+from .exceptions import ConfigurationError, StorageError, InvalidArgumentError
+from .retry import RetryPolicy
+
+T = TypeVar("T")
+
+# Background event loop that runs coroutines for synchronous callers
+_shared_loop: Optional[asyncio.AbstractEventLoop] = None
+_shared_loop_lock = threading.Lock()
 
 def setup_logging(
     log_level: str = "INFO",
@@ -77,14 +84,24 @@ def load_config(config_path: Union[str, Path]) -> Dict[str, Any]:
 def save_results(
     results: Union[Dict[str, Any], List[Dict[str, Any]]],
     output_path: Union[str, Path],
-    format: str = "jsonl"
+    format: str = "jsonl",
+    append: bool = False,
+    unique_key: Optional[str] = None
 ) -> None:
     """Save generation results to file.
     
+    Whole-file writes go to a temporary file that atomically replaces the
+    target, so readers never see a half-written file. Appends (jsonl only)
+    are written with a single ``write`` on an append-mode descriptor and
+    fsynced; a trailing line torn by an earlier crash is removed first.
+    
     Args:
         results: Results dictionary or list of dictionaries to save.
         output_path: Path to save results to.
         format: Output format ("json", "jsonl", or "yaml").
+        append: Append to an existing jsonl file instead of replacing it.
+        unique_key: When appending, skip results whose value for this key is
+            already present in the file (or earlier in ``results``).
         
     Raises:
         StorageError: If results cannot be saved.
@@ -95,37 +112,129 @@ def save_results(
         
         if format == "jsonl":
             # Save as JSON Lines (one JSON object per line)
-            with open(output_path, "w") as f:
-                if isinstance(results, dict):
-                    f.write(json.dumps(results) + "\n")
-                else:
-                    for result in results:
-                        f.write(json.dumps(result) + "\n")
-                        
+            records = [results] if isinstance(results, dict) else results
+            if append:
+                _append_jsonl(output_path, records, unique_key)
+            else:
+                _atomic_write(output_path, "".join(json.dumps(result) + "\n" for result in records))
+                
+        elif append:
+            raise StorageError(f"Appending is only supported for jsonl, not {format}")
+            
         elif format == "json":
             # Save as regular JSON
-            with open(output_path, "w") as f:
-                json.dump(results, f, indent=2)
-                
+            _atomic_write(output_path, json.dumps(results, indent=2))
+            
         elif format == "yaml":
             # Save as YAML
-            with open(output_path, "w") as f:
-                yaml.dump(results, f)
-                
+            _atomic_write(output_path, yaml.dump(results))
+            
         else:
             raise StorageError(f"Unsupported output format: {format}")
             
+    except StorageError:
+        raise
     except Exception as e:
         raise StorageError(f"Error saving results: {str(e)}")
-
+        
+def _atomic_write(path: Path, text: str) -> None:
+    """Replace ``path`` with ``text`` via a fsynced temporary file."""
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(temp_path, "w") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    finally:
+        if temp_path.exists():
+            temp_path.unlink()
+            
+def _append_jsonl(path: Path, records: List[Dict[str, Any]], unique_key: Optional[str]) -> None:
+    """Append records to a jsonl file in one fsynced write."""
+    fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_APPEND)
+    try:
+        _truncate_torn_line(fd)
+        
+        seen = load_jsonl_keys(path, unique_key) if unique_key else set()
+        lines = []
+        for record in records:
+            if unique_key:
+                key = record.get(unique_key)
+                if key in seen:
+                    continue
+                seen.add(key)
+            lines.append(json.dumps(record) + "\n")
+            
+        data = "".join(lines).encode("utf-8")
+        view = memoryview(data)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+        
+def _truncate_torn_line(fd: int, chunk_size: int = 65536) -> None:
+    """Drop a trailing partial line left by an interrupted append."""
+    end = os.lseek(fd, 0, os.SEEK_END)
+    position = end
+    while position > 0:
+        start = max(0, position - chunk_size)
+        os.lseek(fd, start, os.SEEK_SET)
+        chunk = os.read(fd, position - start)
+        newline = chunk.rfind(b"\n")
+        if newline >= 0:
+            position = start + newline + 1
+            break
+        position = start
+        
+    if position < end:
+        os.ftruncate(fd, position)
+        
+def load_jsonl_keys(path: Union[str, Path], key: str) -> set:
+    """Collect the values of ``key`` from every complete line of a jsonl file.
+    
+    Args:
+        path: jsonl file to scan. A missing file yields an empty set.
+        key: Field to collect.
+        
+    Returns:
+        Set of values found.
+    """
+    keys = set()
+    path = Path(path)
+    if not path.exists():
+        return keys
+        
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(record, dict) and key in record:
+                keys.add(record[key])
+    return keys
+    
 def retry_with_exponential_backoff(
     max_retries: int = 3,
     initial_delay: float = 1.0,
     max_delay: float = 60.0,
     exponential_base: float = 2.0,
-    errors: tuple = (Exception,)
+    errors: tuple = (Exception,),
+    jitter: bool = True
 ):
-    """Decorator for retrying functions with exponential backoff.
+    """Decorator for retrying coroutine functions with exponential backoff.
+    
+    Backoff sleeps with ``asyncio.sleep`` (the event loop keeps serving other
+    requests), honours ``Retry-After`` hints and retries only ``errors``,
+    never those that ``classify_error`` deems fatal, such as HTTP 4xx other
+    than 429. See
+    ``RetryPolicy``; each decorated function gets a policy of its own, with
+    no retry budget.
     
     Args:
         max_retries: Maximum number of retry attempts.
@@ -133,40 +242,122 @@ def retry_with_exponential_backoff(
         max_delay: Maximum delay between retries in seconds.
         exponential_base: Base for exponential backoff calculation.
         errors: Tuple of exceptions to catch and retry on.
+        jitter: Whether to randomize delays (full jitter).
         
     Returns:
         Decorated function that implements retry logic.
     """
     def decorator(func):
-        @wraps(func)
-        async def wrapper(*args, **kwargs):
-            delay = initial_delay
-            last_exception = None
-            
-            for attempt in range(max_retries + 1):
-                try:
-                    return await func(*args, **kwargs)
-                except errors as e:
-                    last_exception = e
-                    
-                    if attempt == max_retries:
-                        raise last_exception
-                        
-                    # Calculate next delay with exponential backoff
-                    delay = min(delay * exponential_base, max_delay)
-                    
-                    # Log retry attempt
-                    logging.warning(
-                        f"Attempt {attempt + 1}/{max_retries} failed: {str(e)}. "
-                        f"Retrying in {delay:.1f} seconds..."
-                    )
-                    
-                    # Wait before next attempt
-                    time.sleep(delay)
-                    
+        policy = RetryPolicy(
+            max_retries=max_retries,
+            initial_delay=initial_delay,
+            max_delay=max_delay,
+            exponential_base=exponential_base,
+            jitter=jitter,
+            budget_ratio=None,
+            retry_on=errors,
+            retry_only_on=True
+        )
+        wrapper = policy(func)
+        wrapper.retry_policy = policy
         return wrapper
     return decorator
 
+async def gather_with_concurrency(
+    factories: Sequence[Callable[[], Awaitable[Any]]],
+    max_concurrency: int,
+    return_exceptions: bool = False
+) -> List[Any]:
+    """Run coroutine factories with a bounded number in flight.
+    
+    A fixed pool of ``max_concurrency`` workers pulls factories in order, so
+    only that many coroutines exist at any time regardless of the input size.
+    Results are returned in input order.
+    
+    Args:
+        factories: Zero-argument callables returning awaitables.
+        max_concurrency: Maximum number of awaitables running at once.
+        return_exceptions: If True, exceptions are placed in the result list at
+            the failing item's position instead of aborting the whole run.
+            
+    Returns:
+        List of results (or exceptions) in the same order as ``factories``.
+        
+    Raises:
+        InvalidArgumentError: If ``max_concurrency`` is less than 1.
+    """
+    if max_concurrency < 1:
+        raise InvalidArgumentError("max_concurrency", "must be at least 1")
+        
+    results: List[Any] = [None] * len(factories)
+    pending = iter(range(len(factories)))
+    
+    async def worker() -> None:
+        # Workers share one index iterator; next() never straddles an await
+        for index in pending:
+            try:
+                results[index] = await factories[index]()
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                results[index] = e
+                
+    workers = [
+        asyncio.ensure_future(worker())
+        for _ in range(min(max_concurrency, len(factories)))
+    ]
+    try:
+        await asyncio.gather(*workers)
+    except BaseException:
+        for task in workers:
+            task.cancel()
+        raise
+        
+    return results
+
+def _get_shared_loop() -> asyncio.AbstractEventLoop:
+    """Start (once) and return the background loop used by ``run_sync``."""
+    global _shared_loop
+    with _shared_loop_lock:
+        if _shared_loop is None or _shared_loop.is_closed():
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="weave-sync-loop", daemon=True)
+            thread.start()
+            _shared_loop = loop
+        return _shared_loop
+        
+async def _await(awaitable: Awaitable[T]) -> T:
+    return await awaitable
+    
+def run_sync(awaitable: Awaitable[T], timeout: Optional[float] = None) -> T:
+    """Run an awaitable to completion from synchronous code.
+    
+    All synchronous callers share one background event loop, so pooled
+    sessions and other loop-bound state are reused across calls instead of
+    being rebuilt by a fresh ``asyncio.run`` each time. Works from threads
+    that are themselves running an event loop (which blocks that loop until
+    the call finishes), but not from inside the shared loop.
+    
+    Args:
+        awaitable: Coroutine or other awaitable to run.
+        timeout: Maximum seconds to wait (None waits forever).
+        
+    Returns:
+        The awaitable's result.
+        
+    Raises:
+        RuntimeError: If called from a coroutine running on the shared loop.
+    """
+    loop = _get_shared_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        raise RuntimeError("run_sync() would deadlock the shared loop; await the coroutine instead")
+        
+    return asyncio.run_coroutine_threadsafe(_await(awaitable), loop).result(timeout)
+    
 def validate_config_schema(config: Dict[str, Any], schema: Dict[str, Any]) -> bool:
     """Validate configuration against a schema.
     
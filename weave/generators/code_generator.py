@@ -12,6 +12,7 @@ from ..core import (
     GenerationError
 )
 from ..llms import OpenAILLM, HuggingFaceLLM
+from ..noisers.noiser_chain import NoiserChain
 
 class CodeGenerator(BaseGenerator):
     """Generator for coding problems and their solutions.
@@ -31,6 +32,8 @@ class CodeGenerator(BaseGenerator):
     - ${format_instructions}: Output format instructions
     """
     
+    noiser_chain_factory = NoiserChain
+    
     PROBLEM_TYPES = [
         "algorithm",
         "data_structure",
@@ -121,6 +124,14 @@ ${format_instructions}"""
 - debugging_steps: steps to identify the bug"""
     }
     
+    # Required response fields and token budget for each problem type
+    RESPONSE_SPECS = {
+        "algorithm": ({"problem", "solution", "explanation", "test_cases"}, 1000),
+        "data_structure": ({"problem", "solution", "explanation", "test_cases"}, 1000),
+        "system_design": ({"problem", "solution", "explanation", "implementation"}, 1500),
+        "bug_fixing": ({"problem", "solution", "explanation", "test_cases"}, 1000)
+    }
+    
     def __init__(
         self,
         problem_type: str = "algorithm",
@@ -178,63 +189,110 @@ ${format_instructions}"""
         """
         try:
             # Generate base problem and solution
-            if self.problem_type == "algorithm":
-                problem, solution = await self._generate_algorithm()
-            elif self.problem_type == "data_structure":
-                problem, solution = await self._generate_data_structure()
-            elif self.problem_type == "system_design":
-                problem, solution = await self._generate_system_design()
-            elif self.problem_type == "bug_fixing":
-                problem, solution = await self._generate_bug_fixing()
-            else:
-                raise GenerationError(f"Unsupported problem type: {self.problem_type}")
-                
+            prompt = self._build_prompt()
+            params = self._generation_params()
+            try:
+                response = await self.model.generate(prompt=prompt, **params)
+            except Exception as e:
+                raise GenerationError(f"{self._error_label()}: {str(e)}")
+            problem, solution = self._parse_response(response)
+            
             # Apply noisers to the problem text if any are configured
-            if self.noisers:
-                # Keep track of noise transformations
-                noise_metadata = []
-                
-                # Apply each noiser in sequence
-                noised_problem = problem
-                for noiser in self.noisers:
-                    try:
-                        noised_problem = await noiser.augment(noised_problem)
-                        noise_metadata.append(noiser.get_augmentation_metadata())
-                    except Exception as e:
-                        self.logger.warning(f"Noiser {noiser} failed: {str(e)}")
-                        
-                # Add noise metadata to solution
-                solution["noise_metadata"] = noise_metadata
-                return noised_problem, solution
-                
-            return problem, solution
+            return await self._apply_noisers(problem, solution)
             
         except Exception as e:
             raise GenerationError(f"Failed to generate coding problem: {str(e)}")
             
     async def batch_generate(
         self,
-        batch_size: int
-    ) -> List[Tuple[str, Dict[str, Any]]]:
-        """Generate multiple coding problems.
+        batch_size: int,
+        max_concurrency: Optional[int] = None,
+        return_exceptions: bool = True,
+        use_batch_api: Optional[bool] = None
+    ) -> List[Union[Tuple[str, Dict[str, Any]], GenerationError]]:
+        """Generate multiple coding problems concurrently.
+        
+        Up to ``max_concurrency`` model calls are kept in flight at once and
+        problems that render the same prompt are sampled together (see
+        ``BaseGenerator._run_batch``). The output order always matches the
+        order in which samples were scheduled.
         
         Args:
             batch_size: Number of problems to generate.
+            max_concurrency: Maximum number of concurrent generations. Defaults
+                to ``config["max_concurrency"]`` (8 if unset).
+            return_exceptions: If True, a failed sample is returned as a
+                GenerationError at its position instead of aborting the batch.
+            use_batch_api: Submit the batch as an offline batch job, trading
+                latency for lower cost. Defaults to ``config["use_batch_api"]``.
             
         Returns:
-            List of (problem, solution) tuples.
+            List of (problem, solution) tuples, with GenerationError entries for
+            failed samples when ``return_exceptions`` is True.
             
         Raises:
-            GenerationError: If generation fails.
+            GenerationError: If a sample fails and ``return_exceptions`` is False.
         """
-        problems = []
-        for _ in range(batch_size):
-            problem = await self.generate()
-            problems.append(problem)
-        return problems
+        return await self._run_batch(
+            batch_size,
+            max_concurrency=max_concurrency,
+            return_exceptions=return_exceptions,
+            use_batch_api=use_batch_api
+        )
+        
+    def _build_prompt(self) -> str:
+        """Render the prompt for the configured problem type."""
+        if self.problem_type == "algorithm":
+            return self._build_algorithm_prompt()
+        elif self.problem_type == "data_structure":
+            return self._build_data_structure_prompt()
+        elif self.problem_type == "system_design":
+            return self._build_system_design_prompt()
+        elif self.problem_type == "bug_fixing":
+            return self._build_bug_fixing_prompt()
+        else:
+            raise GenerationError(f"Unsupported problem type: {self.problem_type}")
+            
+    def _generation_params(self) -> Dict[str, Any]:
+        """Sampling parameters for the configured problem type."""
+        _, max_tokens = self.RESPONSE_SPECS[self.problem_type]
+        return {"temperature": 0.7, "max_tokens": max_tokens}
         
-    async def _generate_algorithm(self) -> Tuple[str, Dict[str, Any]]:
-        """Generate algorithm problems."""
+    def _error_label(self) -> str:
+        """Prefix for errors raised while generating the configured problem type."""
+        return f"{self.problem_type.replace('_', ' ').capitalize()} generation failed"
+        
+    def _parse_response(self, response: str) -> Tuple[str, Dict[str, Any]]:
+        """Parse and validate the JSON problem returned by the LLM.
+        
+        Args:
+            response: Raw model output.
+            
+        Returns:
+            Tuple of (problem statement, full parsed solution).
+            
+        Raises:
+            GenerationError: If the response is not valid JSON or lacks
+                required fields.
+        """
+        try:
+            # Parse response as JSON
+            result = json.loads(response)
+            
+            # Validate response format
+            required_fields, _ = self.RESPONSE_SPECS[self.problem_type]
+            if not all(field in result for field in required_fields):
+                raise GenerationError("Invalid response format from LLM")
+                
+            return result["problem"], result
+            
+        except json.JSONDecodeError:
+            raise GenerationError("Failed to parse LLM response as JSON")
+        except Exception as e:
+            raise GenerationError(f"{self._error_label()}: {str(e)}")
+            
+    def _build_algorithm_prompt(self) -> str:
+        """Render the prompt for algorithm problems."""
         algorithms = {
             "easy": [
                 "binary search", "bubble sort", "fibonacci",
@@ -266,33 +324,10 @@ ${format_instructions}"""
         }
         
         # Generate prompt from template
-        prompt = self.templates[self.problem_type].substitute(template_vars)
+        return self.templates[self.problem_type].substitute(template_vars)
         
-        try:
-            # Generate problem using LLM
-            response = await self.model.generate(
-                prompt=prompt,
-                temperature=0.7,
-                max_tokens=1000
-            )
-            
-            # Parse response as JSON
-            result = json.loads(response)
-            
-            # Validate response format
-            required_fields = {"problem", "solution", "explanation", "test_cases"}
-            if not all(field in result for field in required_fields):
-                raise GenerationError("Invalid response format from LLM")
-                
-            return result["problem"], result
-            
-        except json.JSONDecodeError:
-            raise GenerationError("Failed to parse LLM response as JSON")
-        except Exception as e:
-            raise GenerationError(f"Algorithm generation failed: {str(e)}")
-            
-    async def _generate_data_structure(self) -> Tuple[str, Dict[str, Any]]:
-        """Generate data structure problems."""
+    def _build_data_structure_prompt(self) -> str:
+        """Render the prompt for data structure problems."""
         structures = {
             "easy": [
                 "stack", "queue", "linked list",
@@ -322,30 +357,10 @@ ${format_instructions}"""
             "format_instructions": self.format_instructions[self.problem_type]
         }
         
-        prompt = self.templates[self.problem_type].substitute(template_vars)
+        return self.templates[self.problem_type].substitute(template_vars)
         
-        try:
-            response = await self.model.generate(
-                prompt=prompt,
-                temperature=0.7,
-                max_tokens=1000
-            )
-            
-            result = json.loads(response)
-            
-            required_fields = {"problem", "solution", "explanation", "test_cases"}
-            if not all(field in result for field in required_fields):
-                raise GenerationError("Invalid response format from LLM")
-                
-            return result["problem"], result
-            
-        except json.JSONDecodeError:
-            raise GenerationError("Failed to parse LLM response as JSON")
-        except Exception as e:
-            raise GenerationError(f"Data structure generation failed: {str(e)}")
-            
-    async def _generate_system_design(self) -> Tuple[str, Dict[str, Any]]:
-        """Generate system design problems."""
+    def _build_system_design_prompt(self) -> str:
+        """Render the prompt for system design problems."""
         systems = {
             "easy": [
                 "key-value store", "rate limiter", "url shortener",
@@ -375,30 +390,10 @@ ${format_instructions}"""
             "format_instructions": self.format_instructions[self.problem_type]
         }
         
-        prompt = self.templates[self.problem_type].substitute(template_vars)
+        return self.templates[self.problem_type].substitute(template_vars)
         
-        try:
-            response = await self.model.generate(
-                prompt=prompt,
-                temperature=0.7,
-                max_tokens=1500
-            )
-            
-            result = json.loads(response)
-            
-            required_fields = {"problem", "solution", "explanation", "implementation"}
-            if not all(field in result for field in required_fields):
-                raise GenerationError("Invalid response format from LLM")
-                
-            return result["problem"], result
-            
-        except json.JSONDecodeError:
-            raise GenerationError("Failed to parse LLM response as JSON")
-        except Exception as e:
-            raise GenerationError(f"System design generation failed: {str(e)}")
-            
-    async def _generate_bug_fixing(self) -> Tuple[str, Dict[str, Any]]:
-        """Generate bug fixing problems."""
+    def _build_bug_fixing_prompt(self) -> str:
+        """Render the prompt for bug fixing problems."""
         bug_types = {
             "easy": [
                 "off-by-one errors", "null pointer exceptions", "type errors",
@@ -428,28 +423,8 @@ ${format_instructions}"""
             "format_instructions": self.format_instructions[self.problem_type]
         }
         
-        prompt = self.templates[self.problem_type].substitute(template_vars)
+        return self.templates[self.problem_type].substitute(template_vars)
         
-        try:
-            response = await self.model.generate(
-                prompt=prompt,
-                temperature=0.7,
-                max_tokens=1000
-            )
-            
-            result = json.loads(response)
-            
-            required_fields = {"problem", "solution", "explanation", "test_cases"}
-            if not all(field in result for field in required_fields):
-                raise GenerationError("Invalid response format from LLM")
-                
-            return result["problem"], result
-            
-        except json.JSONDecodeError:
-            raise GenerationError("Failed to parse LLM response as JSON")
-        except Exception as e:
-            raise GenerationError(f"Bug fixing generation failed: {str(e)}")
-            
     def __repr__(self) -> str:
         """Return string representation of the generator."""
         return (
@@ -14,6 +14,7 @@ from ..core import (
     GenerationError
 )
 from ..llms import OpenAILLM, HuggingFaceLLM
+from ..noisers.noiser_chain import NoiserChain
 
 class MathGenerator(BaseGenerator):
     """Generator for mathematical problems and their solutions.
@@ -32,6 +33,8 @@ class MathGenerator(BaseGenerator):
     - ${format_instructions}: Output format instructions
     """
     
+    noiser_chain_factory = NoiserChain
+    
     PROBLEM_TYPES = [
         "arithmetic",
         "algebra",
@@ -116,50 +119,47 @@ ${format_instructions}"""
                 raise GenerationError(f"Unsupported problem type: {self.problem_type}")
                 
             # Apply noisers to the problem text if any are configured
-            if self.noisers:
-                # Keep track of noise transformations
-                noise_metadata = []
-                
-                # Apply each noiser in sequence
-                noised_problem = problem
-                for noiser in self.noisers:
-                    try:
-                        noised_problem = await noiser.augment(noised_problem)
-                        noise_metadata.append(noiser.get_augmentation_metadata())
-                    except Exception as e:
-                        self.logger.warning(f"Noiser {noiser} failed: {str(e)}")
-                        
-                # If solution is a dict, add noise metadata
-                if isinstance(solution, dict):
-                    solution["noise_metadata"] = noise_metadata
-                    
-                return noised_problem, solution
-                
-            return problem, solution
+            return await self._apply_noisers(problem, solution)
             
         except Exception as e:
             raise GenerationError(f"Failed to generate math problem: {str(e)}")
             
     async def batch_generate(
         self,
-        batch_size: int
-    ) -> List[Tuple[str, Union[str, Dict[str, Any]]]]:
-        """Generate multiple math problems.
+        batch_size: int,
+        max_concurrency: Optional[int] = None,
+        return_exceptions: bool = True,
+        use_batch_api: Optional[bool] = None
+    ) -> List[Union[Tuple[str, Union[str, Dict[str, Any]]], GenerationError]]:
+        """Generate multiple math problems concurrently.
+        
+        Up to ``max_concurrency`` generations are kept in flight at once. Word
+        problems that render the same prompt are sampled together (see
+        ``BaseGenerator._run_batch``). The output order always matches the
+        order in which samples were scheduled.
         
         Args:
             batch_size: Number of problems to generate.
+            max_concurrency: Maximum number of concurrent generations. Defaults
+                to ``config["max_concurrency"]`` (8 if unset).
+            return_exceptions: If True, a failed sample is returned as a
+                GenerationError at its position instead of aborting the batch.
+            use_batch_api: Submit the batch as an offline batch job, trading
+                latency for lower cost. Defaults to ``config["use_batch_api"]``.
             
         Returns:
-            List of (problem, solution) tuples.
+            List of (problem, solution) tuples, with GenerationError entries for
+            failed samples when ``return_exceptions`` is True.
             
         Raises:
-            GenerationError: If generation fails.
+            GenerationError: If a sample fails and ``return_exceptions`` is False.
         """
-        problems = []
-        for _ in range(batch_size):
-            problem = await self.generate()
-            problems.append(problem)
-        return problems
+        return await self._run_batch(
+            batch_size,
+            max_concurrency=max_concurrency,
+            return_exceptions=return_exceptions,
+            use_batch_api=use_batch_api
+        )
         
     def _generate_arithmetic(self) -> Tuple[str, str]:
         """Generate arithmetic problems (basic operations)."""
@@ -268,8 +268,34 @@ ${format_instructions}"""
                 }
             )
             
+    def _build_prompt(self) -> Optional[str]:
+        """Render the LLM prompt for word problems.
+        
+        Returns:
+            The word problem prompt, or None for symbolically generated types.
+        """
+        if self.problem_type == "word":
+            return self._build_word_problem_prompt()
+        return None
+        
+    def _generation_params(self) -> Dict[str, Any]:
+        """Sampling parameters for word problems."""
+        return {"temperature": 0.7, "max_tokens": 500}
+        
     async def _generate_word_problem(self) -> Tuple[str, Dict[str, Any]]:
         """Generate word problems using LLM."""
+        prompt = self._build_word_problem_prompt()
+        
+        try:
+            # Generate problem using LLM
+            response = await self.model.generate(prompt=prompt, **self._generation_params())
+        except Exception as e:
+            raise GenerationError(f"Word problem generation failed: {str(e)}")
+            
+        return self._parse_response(response)
+        
+    def _build_word_problem_prompt(self) -> str:
+        """Render the prompt for word problems."""
         # Select random topic and operations based on difficulty
         topics = {
             "easy": ["shopping", "distance", "time", "basic geometry"],
@@ -284,10 +310,11 @@ ${format_instructions}"""
         }
         
         topic = random.choice(topics[self.difficulty])
-        required_ops = random.sample(operations[self.difficulty], 2)
+        # Sorted so equivalent draws render identical prompts that batches can share
+        required_ops = sorted(random.sample(operations[self.difficulty], 2))
         
         # Build prompt from template
-        prompt = self.word_problem_template.substitute(
+        return self.word_problem_template.substitute(
             difficulty=self.difficulty,
             topic=topic,
             operations=", ".join(required_ops),
@@ -295,14 +322,20 @@ ${format_instructions}"""
             format_instructions=self.format_instructions
         )
         
-        try:
-            # Generate problem using LLM
-            response = await self.model.generate(
-                prompt=prompt,
-                temperature=0.7,
-                max_tokens=500
-            )
+    def _parse_response(self, response: str) -> Tuple[str, Dict[str, Any]]:
+        """Parse and validate a word problem returned by the LLM.
+        
+        Args:
+            response: Raw model output.
+            
+        Returns:
+            Tuple of (problem statement, solution with explanation).
             
+        Raises:
+            GenerationError: If the response is not valid JSON or lacks
+                required fields.
+        """
+        try:
             # Parse response as JSON
             result = json.loads(response)
             
@@ -12,6 +12,7 @@ from ..core import (
     GenerationError
 )
 from ..llms import OpenAILLM, HuggingFaceLLM
+from ..noisers.noiser_chain import NoiserChain
 
 class NLUGenerator(BaseGenerator):
     """Generator for natural language understanding tasks.
@@ -33,6 +34,8 @@ class NLUGenerator(BaseGenerator):
     - ${format_instructions}: Output format instructions
     """
     
+    noiser_chain_factory = NoiserChain
+    
     TASK_TYPES = [
         "classification",
         "question_answering",
@@ -176,6 +179,17 @@ ${format_instructions}"""
 - idioms: idiomatic expressions used"""
     }
     
+    # Required response fields, task text field and token budget for each task type
+    RESPONSE_SPECS = {
+        "classification": ({"task", "label", "explanation"}, "task", 1000),
+        "question_answering": ({"context", "question", "answer", "explanation"}, "question", 1500),
+        "summarization": ({"text", "summary", "key_points"}, "text", 2000),
+        "entity_recognition": ({"text", "entities", "labels"}, "text", 1500),
+        "paraphrasing": ({"source", "paraphrase", "similarity"}, "source", 1000),
+        "text_generation": ({"prompt", "text", "constraints"}, "prompt", 1500),
+        "translation": ({"source", "translation", "notes"}, "source", 1500)
+    }
+    
     def __init__(
         self,
         task_type: str = "classification",
@@ -227,69 +241,114 @@ ${format_instructions}"""
         """
         try:
             # Generate base task and solution
-            if self.task_type == "classification":
-                task, solution = await self._generate_classification()
-            elif self.task_type == "question_answering":
-                task, solution = await self._generate_question_answering()
-            elif self.task_type == "summarization":
-                task, solution = await self._generate_summarization()
-            elif self.task_type == "entity_recognition":
-                task, solution = await self._generate_entity_recognition()
-            elif self.task_type == "paraphrasing":
-                task, solution = await self._generate_paraphrasing()
-            elif self.task_type == "text_generation":
-                task, solution = await self._generate_text_generation()
-            elif self.task_type == "translation":
-                task, solution = await self._generate_translation()
-            else:
-                raise GenerationError(f"Unsupported task type: {self.task_type}")
-                
+            prompt = self._build_prompt()
+            params = self._generation_params()
+            try:
+                response = await self.model.generate(prompt=prompt, **params)
+            except Exception as e:
+                raise GenerationError(f"{self._error_label()}: {str(e)}")
+            task, solution = self._parse_response(response)
+            
             # Apply noisers to the task text if any are configured
-            if self.noisers:
-                # Keep track of noise transformations
-                noise_metadata = []
-                
-                # Apply each noiser in sequence
-                noised_task = task
-                for noiser in self.noisers:
-                    try:
-                        noised_task = await noiser.augment(noised_task)
-                        noise_metadata.append(noiser.get_augmentation_metadata())
-                    except Exception as e:
-                        self.logger.warning(f"Noiser {noiser} failed: {str(e)}")
-                        
-                # Add noise metadata to solution
-                solution["noise_metadata"] = noise_metadata
-                return noised_task, solution
-                
-            return task, solution
+            return await self._apply_noisers(task, solution)
             
         except Exception as e:
             raise GenerationError(f"Failed to generate NLU task: {str(e)}")
             
     async def batch_generate(
         self,
-        batch_size: int
-    ) -> List[Tuple[str, Dict[str, Any]]]:
-        """Generate multiple NLU tasks.
+        batch_size: int,
+        max_concurrency: Optional[int] = None,
+        return_exceptions: bool = True,
+        use_batch_api: Optional[bool] = None
+    ) -> List[Union[Tuple[str, Dict[str, Any]], GenerationError]]:
+        """Generate multiple NLU tasks concurrently.
+        
+        Up to ``max_concurrency`` model calls are kept in flight at once and
+        tasks that render the same prompt are sampled together (see
+        ``BaseGenerator._run_batch``). The output order always matches the
+        order in which samples were scheduled.
         
         Args:
             batch_size: Number of tasks to generate.
+            max_concurrency: Maximum number of concurrent generations. Defaults
+                to ``config["max_concurrency"]`` (8 if unset).
+            return_exceptions: If True, a failed sample is returned as a
+                GenerationError at its position instead of aborting the batch.
+            use_batch_api: Submit the batch as an offline batch job, trading
+                latency for lower cost. Defaults to ``config["use_batch_api"]``.
             
         Returns:
-            List of (task, solution) tuples.
+            List of (task, solution) tuples, with GenerationError entries for
+            failed samples when ``return_exceptions`` is True.
             
         Raises:
-            GenerationError: If generation fails.
+            GenerationError: If a sample fails and ``return_exceptions`` is False.
+        """
+        return await self._run_batch(
+            batch_size,
+            max_concurrency=max_concurrency,
+            return_exceptions=return_exceptions,
+            use_batch_api=use_batch_api
+        )
+        
+    def _build_prompt(self) -> str:
+        """Render the prompt for the configured task type."""
+        if self.task_type == "classification":
+            return self._build_classification_prompt()
+        elif self.task_type == "question_answering":
+            return self._build_question_answering_prompt()
+        elif self.task_type == "summarization":
+            return self._build_summarization_prompt()
+        elif self.task_type == "entity_recognition":
+            return self._build_entity_recognition_prompt()
+        elif self.task_type == "paraphrasing":
+            return self._build_paraphrasing_prompt()
+        elif self.task_type == "text_generation":
+            return self._build_text_generation_prompt()
+        elif self.task_type == "translation":
+            return self._build_translation_prompt()
+        else:
+            raise GenerationError(f"Unsupported task type: {self.task_type}")
+            
+    def _generation_params(self) -> Dict[str, Any]:
+        """Sampling parameters for the configured task type."""
+        _, _, max_tokens = self.RESPONSE_SPECS[self.task_type]
+        return {"temperature": 0.7, "max_tokens": max_tokens}
+        
+    def _error_label(self) -> str:
+        """Prefix for errors raised while generating the configured task type."""
+        return f"{self.task_type.replace('_', ' ').capitalize()} task generation failed"
+        
+    def _parse_response(self, response: str) -> Tuple[str, Dict[str, Any]]:
+        """Parse and validate the JSON task returned by the LLM.
+        
+        Args:
+            response: Raw model output.
+            
+        Returns:
+            Tuple of (task text, full parsed solution).
+            
+        Raises:
+            GenerationError: If the response is not valid JSON or lacks
+                required fields.
         """
-        tasks = []
-        for _ in range(batch_size):
-            task = await self.generate()
-            tasks.append(task)
-        return tasks
-        
-    async def _generate_classification(self) -> Tuple[str, Dict[str, Any]]:
-        """Generate classification tasks."""
+        try:
+            result = json.loads(response)
+            
+            required_fields, text_field, _ = self.RESPONSE_SPECS[self.task_type]
+            if not all(field in result for field in required_fields):
+                raise GenerationError("Invalid response format from LLM")
+                
+            return result[text_field], result
+            
+        except json.JSONDecodeError:
+            raise GenerationError("Failed to parse LLM response as JSON")
+        except Exception as e:
+            raise GenerationError(f"{self._error_label()}: {str(e)}")
+            
+    def _build_classification_prompt(self) -> str:
+        """Render the prompt for classification tasks."""
         categories = {
             "easy": [
                 "sentiment", "spam", "language",
@@ -318,30 +377,10 @@ ${format_instructions}"""
             "format_instructions": self.format_instructions[self.task_type]
         }
         
-        prompt = self.templates[self.task_type].substitute(template_vars)
+        return self.templates[self.task_type].substitute(template_vars)
         
-        try:
-            response = await self.model.generate(
-                prompt=prompt,
-                temperature=0.7,
-                max_tokens=1000
-            )
-            
-            result = json.loads(response)
-            
-            required_fields = {"task", "label", "explanation"}
-            if not all(field in result for field in required_fields):
-                raise GenerationError("Invalid response format from LLM")
-                
-            return result["task"], result
-            
-        except json.JSONDecodeError:
-            raise GenerationError("Failed to parse LLM response as JSON")
-        except Exception as e:
-            raise GenerationError(f"Classification task generation failed: {str(e)}")
-            
-    async def _generate_question_answering(self) -> Tuple[str, Dict[str, Any]]:
-        """Generate question answering tasks."""
+    def _build_question_answering_prompt(self) -> str:
+        """Render the prompt for question answering tasks."""
         categories = {
             "easy": [
                 "factual", "definition", "yes/no",
@@ -370,30 +409,10 @@ ${format_instructions}"""
             "format_instructions": self.format_instructions[self.task_type]
         }
         
-        prompt = self.templates[self.task_type].substitute(template_vars)
+        return self.templates[self.task_type].substitute(template_vars)
         
-        try:
-            response = await self.model.generate(
-                prompt=prompt,
-                temperature=0.7,
-                max_tokens=1500
-            )
-            
-            result = json.loads(response)
-            
-            required_fields = {"context", "question", "answer", "explanation"}
-            if not all(field in result for field in required_fields):
-                raise GenerationError("Invalid response format from LLM")
-                
-            return result["question"], result
-            
-        except json.JSONDecodeError:
-            raise GenerationError("Failed to parse LLM response as JSON")
-        except Exception as e:
-            raise GenerationError(f"Question answering task generation failed: {str(e)}")
-            
-    async def _generate_summarization(self) -> Tuple[str, Dict[str, Any]]:
-        """Generate summarization tasks."""
+    def _build_summarization_prompt(self) -> str:
+        """Render the prompt for summarization tasks."""
         categories = {
             "easy": [
                 "news articles", "product descriptions",
@@ -422,30 +441,10 @@ ${format_instructions}"""
             "format_instructions": self.format_instructions[self.task_type]
         }
         
-        prompt = self.templates[self.task_type].substitute(template_vars)
+        return self.templates[self.task_type].substitute(template_vars)
         
-        try:
-            response = await self.model.generate(
-                prompt=prompt,
-                temperature=0.7,
-                max_tokens=2000
-            )
-            
-            result = json.loads(response)
-            
-            required_fields = {"text", "summary", "key_points"}
-            if not all(field in result for field in required_fields):
-                raise GenerationError("Invalid response format from LLM")
-                
-            return result["text"], result
-            
-        except json.JSONDecodeError:
-            raise GenerationError("Failed to parse LLM response as JSON")
-        except Exception as e:
-            raise GenerationError(f"Summarization task generation failed: {str(e)}")
-            
-    async def _generate_entity_recognition(self) -> Tuple[str, Dict[str, Any]]:
-        """Generate entity recognition tasks."""
+    def _build_entity_recognition_prompt(self) -> str:
+        """Render the prompt for entity recognition tasks."""
         categories = {
             "easy": [
                 "person names", "locations", "organizations",
@@ -474,30 +473,10 @@ ${format_instructions}"""
             "format_instructions": self.format_instructions[self.task_type]
         }
         
-        prompt = self.templates[self.task_type].substitute(template_vars)
+        return self.templates[self.task_type].substitute(template_vars)
         
-        try:
-            response = await self.model.generate(
-                prompt=prompt,
-                temperature=0.7,
-                max_tokens=1500
-            )
-            
-            result = json.loads(response)
-            
-            required_fields = {"text", "entities", "labels"}
-            if not all(field in result for field in required_fields):
-                raise GenerationError("Invalid response format from LLM")
-                
-            return result["text"], result
-            
-        except json.JSONDecodeError:
-            raise GenerationError("Failed to parse LLM response as JSON")
-        except Exception as e:
-            raise GenerationError(f"Entity recognition task generation failed: {str(e)}")
-            
-    async def _generate_paraphrasing(self) -> Tuple[str, Dict[str, Any]]:
-        """Generate paraphrasing tasks."""
+    def _build_paraphrasing_prompt(self) -> str:
+        """Render the prompt for paraphrasing tasks."""
         categories = {
             "easy": [
                 "simple sentences", "common phrases",
@@ -526,30 +505,10 @@ ${format_instructions}"""
             "format_instructions": self.format_instructions[self.task_type]
         }
         
-        prompt = self.templates[self.task_type].substitute(template_vars)
+        return self.templates[self.task_type].substitute(template_vars)
         
-        try:
-            response = await self.model.generate(
-                prompt=prompt,
-                temperature=0.7,
-                max_tokens=1000
-            )
-            
-            result = json.loads(response)
-            
-            required_fields = {"source", "paraphrase", "similarity"}
-            if not all(field in result for field in required_fields):
-                raise GenerationError("Invalid response format from LLM")
-                
-            return result["source"], result
-            
-        except json.JSONDecodeError:
-            raise GenerationError("Failed to parse LLM response as JSON")
-        except Exception as e:
-            raise GenerationError(f"Paraphrasing task generation failed: {str(e)}")
-            
-    async def _generate_text_generation(self) -> Tuple[str, Dict[str, Any]]:
-        """Generate text generation tasks."""
+    def _build_text_generation_prompt(self) -> str:
+        """Render the prompt for text generation tasks."""
         categories = {
             "easy": [
                 "short stories", "product descriptions",
@@ -578,30 +537,10 @@ ${format_instructions}"""
             "format_instructions": self.format_instructions[self.task_type]
         }
         
-        prompt = self.templates[self.task_type].substitute(template_vars)
+        return self.templates[self.task_type].substitute(template_vars)
         
-        try:
-            response = await self.model.generate(
-                prompt=prompt,
-                temperature=0.7,
-                max_tokens=1500
-            )
-            
-            result = json.loads(response)
-            
-            required_fields = {"prompt", "text", "constraints"}
-            if not all(field in result for field in required_fields):
-                raise GenerationError("Invalid response format from LLM")
-                
-            return result["prompt"], result
-            
-        except json.JSONDecodeError:
-            raise GenerationError("Failed to parse LLM response as JSON")
-        except Exception as e:
-            raise GenerationError(f"Text generation task generation failed: {str(e)}")
-            
-    async def _generate_translation(self) -> Tuple[str, Dict[str, Any]]:
-        """Generate translation tasks."""
+    def _build_translation_prompt(self) -> str:
+        """Render the prompt for translation tasks."""
         categories = {
             "easy": [
                 "everyday conversation", "simple instructions",
@@ -630,28 +569,8 @@ ${format_instructions}"""
             "format_instructions": self.format_instructions[self.task_type]
         }
         
-        prompt = self.templates[self.task_type].substitute(template_vars)
+        return self.templates[self.task_type].substitute(template_vars)
         
-        try:
-            response = await self.model.generate(
-                prompt=prompt,
-                temperature=0.7,
-                max_tokens=1500
-            )
-            
-            result = json.loads(response)
-            
-            required_fields = {"source", "translation", "notes"}
-            if not all(field in result for field in required_fields):
-                raise GenerationError("Invalid response format from LLM")
-                
-            return result["source"], result
-            
-        except json.JSONDecodeError:
-            raise GenerationError("Failed to parse LLM response as JSON")
-        except Exception as e:
-            raise GenerationError(f"Translation task generation failed: {str(e)}")
-            
     def __repr__(self) -> str:
         """Return string representation of the generator."""
         return (
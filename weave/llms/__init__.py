@@ -6,8 +6,14 @@ with the ModelConnector interface for text generation tasks.
 
 from .openai_llm import OpenAILLM
 from .huggingface_llm import HuggingFaceLLM
+from .routing_connector import RoutingConnector, RouteBackend
+from .embedding_service import EmbeddingService, EmbeddingCache
 
 __all__ = [
     "OpenAILLM",
     "HuggingFaceLLM",
+    "RoutingConnector",
+    "RouteBackend",
+    "EmbeddingService",
+    "EmbeddingCache",
 ] 
\ No newline at end of file
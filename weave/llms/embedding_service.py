@@ -0,0 +1,384 @@
+"""Batched, cached embedding generation for the Weave framework."""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from ..core import InvalidArgumentError, ModelError, StorageError, gather_with_concurrency, run_sync
+
+class EmbeddingCache:
+    """Embedding vectors keyed by a hash of model and text.
+    
+    Vectors are stored as raw float32 bytes in an in-memory LRU tier and,
+    optionally, a SQLite file that survives restarts, so texts embedded once
+    are never sent again.
+    """
+    
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = None,
+        max_memory_entries: int = 10000
+    ):
+        """Initialize the cache.
+        
+        Args:
+            path: Optional SQLite database path for the persistent tier.
+            max_memory_entries: Maximum number of vectors held in memory. Each
+                takes ``4 * dim`` bytes, about 6 KB for 1536-d vectors.
+        """
+        self.path = Path(path) if path else None
+        self.max_memory_entries = max_memory_entries
+        
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "memory_hits": 0,
+            "disk_hits": 0
+        }
+        
+        self._db = None
+        if self.path:
+            self._open_db()
+            
+    def _open_db(self) -> None:
+        """Open (and create if needed) the SQLite tier."""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "key TEXT PRIMARY KEY, dim INTEGER NOT NULL, vector BLOB NOT NULL)"
+            )
+            self._db.commit()
+        except sqlite3.Error as e:
+            raise StorageError(f"Error opening embedding cache at {self.path}: {str(e)}")
+            
+    @staticmethod
+    def make_key(model: str, text: str) -> str:
+        """Build the cache key of a text embedded by a model.
+        
+        Args:
+            model: Embedding model identifier.
+            text: Embedded text.
+            
+        Returns:
+            Hex digest identifying the vector.
+        """
+        return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+        
+    def get_many(self, keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        """Look up several vectors.
+        
+        Args:
+            keys: Keys from ``make_key``.
+            
+        Returns:
+            Mapping of found keys to float32 vectors.
+        """
+        found: Dict[str, np.ndarray] = {}
+        missing: List[str] = []
+        with self._lock:
+            for key in keys:
+                blob = self._memory.get(key)
+                if blob is None:
+                    missing.append(key)
+                    continue
+                self._memory.move_to_end(key)
+                found[key] = np.frombuffer(blob, dtype=np.float32)
+                self._stats["memory_hits"] += 1
+                
+            if missing and self._db is not None:
+                # SQLite limits the number of bound parameters per statement
+                for start in range(0, len(missing), 500):
+                    chunk = missing[start:start + 500]
+                    rows = self._db.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})",
+                        chunk
+                    ).fetchall()
+                    for key, blob in rows:
+                        found[key] = np.frombuffer(blob, dtype=np.float32)
+                        self._set_memory(key, blob)
+                        self._stats["disk_hits"] += 1
+                        
+            self._stats["hits"] += len(found)
+            self._stats["misses"] += len(keys) - len(found)
+        return found
+        
+    def set_many(self, vectors: Dict[str, np.ndarray]) -> None:
+        """Store several vectors.
+        
+        Args:
+            vectors: Mapping of keys from ``make_key`` to vectors.
+        """
+        blobs = {key: np.ascontiguousarray(vector, dtype=np.float32).tobytes() for key, vector in vectors.items()}
+        with self._lock:
+            for key, blob in blobs.items():
+                self._set_memory(key, blob)
+            if self._db is not None:
+                try:
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO embeddings (key, dim, vector) VALUES (?, ?, ?)",
+                        [(key, len(blob) // 4, blob) for key, blob in blobs.items()]
+                    )
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    raise StorageError(f"Error writing embedding cache at {self.path}: {str(e)}")
+                    
+    def _set_memory(self, key: str, blob: bytes) -> None:
+        self._memory[key] = blob
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache hit/miss counters and sizes.
+        
+        Returns:
+            Dictionary of cache statistics.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            lookups = stats["hits"] + stats["misses"]
+            stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+            stats["memory_size"] = len(self._memory)
+            if self._db is not None:
+                stats["disk_size"] = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            return stats
+            
+    def close(self) -> None:
+        """Close the disk tier."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+class EmbeddingService:
+    """Embeds texts through a connector's ``get_embeddings`` efficiently.
+    
+    For each call the service:
+    
+    - Deduplicates identical texts, so each distinct text is embedded once.
+    - Serves texts embedded before from an ``EmbeddingCache``.
+    - Packs the remaining texts, in order, into requests that respect the
+      provider's limits on inputs and tokens per request
+      (``EMBEDDING_BATCH_SIZE`` / ``EMBEDDING_BATCH_TOKENS`` on the connector,
+      overridable here).
+    - Sends the requests concurrently, at most ``max_concurrency`` at once.
+    
+    Results come back as one contiguous ``(len(texts), dim)`` float32 NumPy
+    matrix, row ``i`` holding the embedding of ``texts[i]``.
+    
+    Example:
+        service = EmbeddingService(OpenAILLM(), cache=EmbeddingCache("embeddings.db"))
+        matrix = await service.aembed(queries)
+        similarities = matrix @ matrix.T
+    """
+    
+    # Fallback per-request limits for connectors that do not declare them
+    DEFAULT_BATCH_SIZE = 32
+    
+    def __init__(
+        self,
+        connector: Any,
+        model: Optional[str] = None,
+        cache: Optional[EmbeddingCache] = None,
+        batch_size: Optional[int] = None,
+        max_batch_tokens: Optional[int] = None,
+        max_concurrency: int = 4,
+        normalize: bool = False
+    ):
+        """Initialize the service.
+        
+        Args:
+            connector: Connector with ``get_embeddings`` (``OpenAILLM``,
+                ``HuggingFaceLLM``).
+            model: Embedding model passed to ``get_embeddings``; None uses the
+                connector's default.
+            cache: Optional vector cache, which may be shared between services.
+            batch_size: Maximum texts per request (default: the connector's
+                ``EMBEDDING_BATCH_SIZE``).
+            max_batch_tokens: Maximum tokens per request (default: the
+                connector's ``EMBEDDING_BATCH_TOKENS``, if any).
+            max_concurrency: Maximum requests in flight.
+            normalize: Scale every row to unit length, so dot products are
+                cosine similarities.
+                
+        Raises:
+            InvalidArgumentError: If the connector cannot embed or a limit is invalid.
+        """
+        if not hasattr(connector, "get_embeddings"):
+            raise InvalidArgumentError("connector", f"{connector.__class__.__name__} has no get_embeddings")
+            
+        self.connector = connector
+        self.model = model
+        self.cache = cache
+        self.batch_size = batch_size or getattr(connector, "EMBEDDING_BATCH_SIZE", self.DEFAULT_BATCH_SIZE)
+        self.max_batch_tokens = max_batch_tokens or getattr(connector, "EMBEDDING_BATCH_TOKENS", None)
+        self.max_concurrency = max_concurrency
+        self.normalize = normalize
+        if self.batch_size < 1:
+            raise InvalidArgumentError("batch_size", "must be at least 1")
+            
+        # Cache keys are scoped to the provider and model that produced the vectors
+        self._model_key = (
+            f"{connector.__class__.__name__}:"
+            f"{model or getattr(connector, 'model_id', None) or 'default'}"
+        )
+        self.logger = logging.getLogger(__name__)
+        self._stats = {
+            "texts": 0,
+            "unique_texts": 0,
+            "cached_texts": 0,
+            "requests": 0
+        }
+        
+    def _count_tokens(self, texts: List[str]) -> List[int]:
+        """Count tokens with the connector's tokenizer, or estimate them."""
+        count_tokens_batch = getattr(self.connector, "count_tokens_batch", None)
+        if count_tokens_batch is not None:
+            return count_tokens_batch(texts)
+        return [len(text) // 4 + 1 for text in texts]
+        
+    def _plan_batches(self, texts: List[str]) -> List[List[int]]:
+        """Group text indices into requests within the size and token limits."""
+        if self.max_batch_tokens is None:
+            return [
+                list(range(start, min(start + self.batch_size, len(texts))))
+                for start in range(0, len(texts), self.batch_size)
+            ]
+            
+        batches: List[List[int]] = []
+        current: List[int] = []
+        used = 0
+        for index, tokens in enumerate(self._count_tokens(texts)):
+            if current and (used + tokens > self.max_batch_tokens or len(current) >= self.batch_size):
+                batches.append(current)
+                current, used = [], 0
+            current.append(index)
+            used += tokens
+        if current:
+            batches.append(current)
+        return batches
+        
+    async def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        """Embed one request's texts into a ``(len(texts), dim)`` float32 matrix."""
+        kwargs = {"model": self.model} if self.model else {}
+        response = await self.connector.get_embeddings(texts, **kwargs)
+        self._stats["requests"] += 1
+        
+        # Connectors unwrap single-text responses
+        items = [response] if len(texts) == 1 else response
+        if len(items) != len(texts):
+            raise ModelError(f"Expected {len(texts)} embeddings, got {len(items)}")
+        try:
+            # Token-level features have a different length per text, so each
+            # item is mean-pooled into one vector on its own
+            vectors = []
+            for item in items:
+                vector = np.asarray(item, dtype=np.float32)
+                vectors.append(vector.reshape(-1, vector.shape[-1]).mean(axis=0))
+            return np.stack(vectors)
+        except (ValueError, IndexError) as e:
+            raise ModelError(f"Unexpected embedding response shape: {str(e)}")
+        
+    async def aembed(self, texts: Union[str, Sequence[str]]) -> np.ndarray:
+        """Embed texts.
+        
+        Args:
+            texts: A text or sequence of texts.
+            
+        Returns:
+            Contiguous float32 matrix of shape ``(len(texts), dim)``; a single
+            text still yields one row.
+            
+        Raises:
+            ModelError: If a request fails or returns the wrong number of vectors.
+            StorageError: If the cache cannot be written.
+        """
+        if isinstance(texts, str):
+            texts = [texts]
+        texts = list(texts)
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+            
+        # Deduplicate: ``inverse[i]`` is the row of texts[i] among the unique texts
+        positions: Dict[str, int] = {}
+        inverse = np.fromiter(
+            (positions.setdefault(text, len(positions)) for text in texts),
+            dtype=np.int64,
+            count=len(texts)
+        )
+        unique = list(positions)
+        self._stats["texts"] += len(texts)
+        self._stats["unique_texts"] += len(unique)
+        
+        keys = [EmbeddingCache.make_key(self._model_key, text) for text in unique]
+        cached = self.cache.get_many(keys) if self.cache is not None else {}
+        self._stats["cached_texts"] += len(cached)
+        missing = [index for index, key in enumerate(keys) if key not in cached]
+        
+        fresh: Dict[int, np.ndarray] = {}
+        if missing:
+            missing_texts = [unique[index] for index in missing]
+            batches = self._plan_batches(missing_texts)
+            results = await gather_with_concurrency(
+                [
+                    lambda batch=batch: self._embed_batch([missing_texts[i] for i in batch])
+                    for batch in batches
+                ],
+                max_concurrency=self.max_concurrency
+            )
+            for batch, matrix in zip(batches, results):
+                for row, i in enumerate(batch):
+                    fresh[missing[i]] = matrix[row]
+            if self.cache is not None:
+                self.cache.set_many({keys[index]: vector for index, vector in fresh.items()})
+                
+        dim = len(next(iter(fresh.values()))) if fresh else len(next(iter(cached.values())))
+        unique_matrix = np.empty((len(unique), dim), dtype=np.float32)
+        for index, key in enumerate(keys):
+            vector = fresh[index] if index in fresh else cached[key]
+            if len(vector) != dim:
+                raise ModelError(f"Embedding dimension mismatch: expected {dim}, got {len(vector)}")
+            unique_matrix[index] = vector
+            
+        if self.normalize:
+            norms = np.linalg.norm(unique_matrix, axis=1, keepdims=True)
+            np.divide(unique_matrix, norms, out=unique_matrix, where=norms > 0)
+            
+        # Fancy indexing copies into a new C-contiguous matrix
+        return unique_matrix[inverse]
+        
+    def embed(self, texts: Union[str, Sequence[str]]) -> np.ndarray:
+        """Synchronous wrapper around ``aembed``.
+        
+        Runs on the shared background loop (see ``run_sync``); use
+        ``aembed`` from async code.
+        """
+        return run_sync(self.aembed(texts))
+        
+    def get_stats(self) -> Dict[str, Any]:
+        """Get text, deduplication, cache and request counters.
+        
+        Returns:
+            Dictionary of service statistics.
+        """
+        stats = dict(self._stats)
+        stats["cache"] = self.cache.get_stats() if self.cache is not None else None
+        return stats
+        
+    def __repr__(self) -> str:
+        """Return string representation of the service."""
+        return (
+            f"EmbeddingService(model={self._model_key}, batch_size={self.batch_size}, "
+            f"max_batch_tokens={self.max_batch_tokens})"
+        )
@@ -1,11 +1,21 @@
 """Hugging Face LLM provider for the Weave framework."""
 
 import os
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, AsyncGenerator, Dict, List, Optional, Union
 import json
 import aiohttp
 import asyncio
-from ..core import ModelConnector, ModelType, ModelError
+from ..core import (
+    ModelConnector,
+    ModelType,
+    ModelAPIError,
+    ModelConnectionError,
+    InvalidArgumentError,
+    RetryPolicy,
+    parse_retry_after
+)
+from ..core.http import iter_sse_data
+from ..core.cache import ResponseCache
 
 class HuggingFaceLLM(ModelConnector):
     """Hugging Face LLM provider using their Inference API.
@@ -20,6 +30,9 @@ class HuggingFaceLLM(ModelConnector):
     # Default API endpoints
     INFERENCE_ENDPOINT = "https://api-inference.huggingface.co/models"
     
+    # Texts per feature-extraction request (see EmbeddingService)
+    EMBEDDING_BATCH_SIZE = 32
+    
     def __init__(
         self,
         model_id: str,
@@ -29,7 +42,9 @@ class HuggingFaceLLM(ModelConnector):
         timeout: float = 30.0,
         max_retries: int = 3,
         retry_delay: float = 1.0,
-        config: Optional[Dict[str, Any]] = None
+        config: Optional[Dict[str, Any]] = None,
+        cache: Optional[ResponseCache] = None,
+        retry_policy: Optional[RetryPolicy] = None
     ):
         """Initialize the Hugging Face LLM provider.
         
@@ -40,15 +55,24 @@ class HuggingFaceLLM(ModelConnector):
             base_url: Optional custom API endpoint.
             timeout: Timeout for API requests in seconds.
             max_retries: Maximum number of retries for failed requests.
-            retry_delay: Delay between retries in seconds.
+            retry_delay: Initial delay between retries in seconds.
             config: Additional configuration options.
+            cache: Optional response cache for non-streaming generations.
+            retry_policy: Retry policy shared with other connectors. Overrides
+                ``max_retries`` and ``retry_delay``.
         """
-        super().__init__(config)
-        
         self.api_key = api_key or os.getenv("HF_API_TOKEN")
         if not self.api_key:
             raise ValueError("Hugging Face API token is required")
             
+        retry_policy = retry_policy or RetryPolicy.from_config(
+            config, max_retries=max_retries, initial_delay=retry_delay, name=f"Hugging Face {model_id} request"
+        )
+        super().__init__(
+            ModelType.HUGGINGFACE, model_id, api_key=self.api_key, config=config, cache=cache,
+            retry_policy=retry_policy
+        )
+        
         self.model_id = model_id
         self.task = task
         self.base_url = base_url or self.INFERENCE_ENDPOINT
@@ -56,54 +80,54 @@ class HuggingFaceLLM(ModelConnector):
         self.max_retries = max_retries
         self.retry_delay = retry_delay
         
-        # Set up aiohttp session
-        self.session = None
-        self._setup_session()
+        # Request headers; connections come from the shared pool
+        self._headers = self._build_headers()
         
         # Track request usage
         self._request_count = 0
         self._total_generated_tokens = 0
         
-    def _setup_session(self) -> None:
-        """Set up the aiohttp session with headers."""
-        headers = {
+    def _initialize_client(self) -> Any:
+        """Requests are sent over HTTP directly, so no SDK client is loaded."""
+        return None
+        
+    def _build_headers(self) -> Dict[str, str]:
+        """Build the headers sent with every request."""
+        return {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
         
-        self.session = aiohttp.ClientSession(
-            headers=headers,
-            timeout=aiohttp.ClientTimeout(total=self.timeout)
-        )
-        
     async def _make_request(
         self,
-        payload: Dict[str, Any],
-        stream: bool = False
+        payload: Dict[str, Any]
     ) -> Dict[str, Any]:
-        """Make an API request with retries.
+        """Make an API request, retried according to the retry policy.
+        
+        Rate limits (429), server errors (5xx, including 503 while a model is
+        loading), timeouts and connection failures are retried with jittered
+        backoff, honouring ``Retry-After``; other errors fail immediately.
+        Each attempt passes the circuit breaker and the adaptive concurrency
+        limit (see ``ProviderGuard``).
         
         Args:
             payload: Request payload.
-            stream: Whether to stream the response.
             
         Returns:
             API response data.
             
         Raises:
-            ModelError: If the request fails after retries.
+            ModelAPIError: If the API returns an error status.
+            ModelConnectionError: If the API cannot be reached.
+            CircuitOpenError: If the API is failing and requests are paused.
         """
-        if not self.session:
-            self._setup_session()
-            
+        session = self._get_session()
         url = f"{self.base_url}/{self.model_id}"
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
         
-        for attempt in range(self.max_retries):
+        async def attempt() -> Dict[str, Any]:
             try:
-                async with self.session.post(url, json=payload) as response:
-                    if stream:
-                        return response  # Return response object for streaming
-                        
+                async with session.post(url, json=payload, headers=self._headers, timeout=timeout) as response:
                     if response.status == 200:
                         data = await response.json()
                         self._request_count += 1
@@ -113,16 +137,34 @@ class HuggingFaceLLM(ModelConnector):
                             self._total_generated_tokens += len(text.split())
                         return data
                         
-                    error_data = await response.json()
-                    raise ModelError(
-                        f"Hugging Face API error: {error_data.get('error', 'Unknown error')}"
-                    )
-                    
-            except aiohttp.ClientError as e:
-                if attempt == self.max_retries - 1:
-                    raise ModelError(f"Hugging Face API request failed: {str(e)}")
+                    raise await self._api_error(response)
                     
-                await asyncio.sleep(self.retry_delay * (2 ** attempt))
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                raise ModelConnectionError(f"Hugging Face API request failed: {str(e) or type(e).__name__}")
+                
+        return await self._retry_policy.run(
+            lambda: self._guard.call(attempt), description=f"Hugging Face {self.model_id} request"
+        )
+        
+    @staticmethod
+    async def _api_error(response: aiohttp.ClientResponse) -> ModelAPIError:
+        """Build the error for a non-200 response, keeping its status and Retry-After."""
+        error_data = None
+        message = "Unknown error"
+        try:
+            error_data = await response.json(content_type=None)
+            message = error_data.get("error", message)
+        except (ValueError, AttributeError, aiohttp.ClientError):
+            pass
+        retry_after = parse_retry_after(response.headers)
+        if retry_after is None and isinstance(error_data, dict):
+            # Models that are still loading report how long that will take
+            retry_after = error_data.get("estimated_time")
+        return ModelAPIError(
+            f"Hugging Face API error ({response.status}): {message}",
+            status=response.status,
+            retry_after=retry_after
+        )
                 
     async def generate(
         self,
@@ -133,7 +175,8 @@ class HuggingFaceLLM(ModelConnector):
         top_k: int = 50,
         num_return_sequences: int = 1,
         stop: Optional[Union[str, List[str]]] = None,
-        stream: bool = False
+        stream: bool = False,
+        use_cache: bool = True
     ) -> Union[str, AsyncGenerator[str, None]]:
         """Generate text using the Hugging Face model.
         
@@ -146,6 +189,8 @@ class HuggingFaceLLM(ModelConnector):
             num_return_sequences: Number of sequences to return.
             stop: Stop sequences to end generation.
             stream: Whether to stream the response.
+            use_cache: Whether to serve from and store into the response cache.
+                Streaming calls are never cached.
             
         Returns:
             Generated text or async generator for streaming.
@@ -170,35 +215,130 @@ class HuggingFaceLLM(ModelConnector):
         if stop:
             payload["parameters"]["stop_sequence"] = stop if isinstance(stop, str) else stop[0]
             
+        # Inference API limits are per request; local token counts are not
+        # available without downloading the tokenizer
         if stream:
-            response = await self._make_request(payload, stream=True)
-            return self._stream_response(response)
-        else:
-            response = await self._make_request(payload)
-            if isinstance(response, list) and response:
-                return response[0]["generated_text"]
-            return ""
+            self._guard.check()
+            await self._rate_limiter.acquire()
+            payload["stream"] = True
+            return self._stream_response(payload)
             
-    async def _stream_response(self, response: aiohttp.ClientResponse) -> AsyncGenerator[str, None]:
-        """Stream response chunks from the API.
+        cache_key, cached = await self._cache_lookup(use_cache, temperature, payload=payload)
+        if cached is not None:
+            return cached
+            
+        await self._rate_limiter.acquire()
+        response = await self._make_request(payload)
+        if isinstance(response, list) and response:
+            text = response[0]["generated_text"]
+            await self._cache_store(cache_key, text)
+            return text
+        return ""
+        
+    async def generate_many(
+        self,
+        prompt: str,
+        n: int,
+        max_tokens: Optional[int] = None,
+        temperature: float = 0.7,
+        top_p: float = 1.0,
+        top_k: int = 50,
+        stop: Optional[Union[str, List[str]]] = None,
+        use_cache: bool = True
+    ) -> List[str]:
+        """Sample several completions of the same prompt in one request.
         
         Args:
-            response: aiohttp response object.
+            prompt: Input text to generate from.
+            n: Number of completions to sample.
+            max_tokens: Maximum tokens to generate per completion.
+            temperature: Sampling temperature (0.0 to 2.0).
+            top_p: Nucleus sampling parameter.
+            top_k: Top-k sampling parameter.
+            stop: Stop sequences to end generation.
+            use_cache: Whether to serve from and store into the response cache.
+            
+        Returns:
+            List of generated texts (at most ``n``).
+            
+        Raises:
+            InvalidArgumentError: If n is less than 1.
+            ModelError: If generation fails.
+        """
+        if n < 1:
+            raise InvalidArgumentError("n", "must be at least 1")
+            
+        payload = {
+            "inputs": prompt,
+            "parameters": {
+                "temperature": temperature,
+                "top_p": top_p,
+                "top_k": top_k,
+                "num_return_sequences": n,
+                "do_sample": True,
+                "return_full_text": False
+            }
+        }
+        
+        if max_tokens:
+            payload["parameters"]["max_new_tokens"] = max_tokens
+            
+        if stop:
+            payload["parameters"]["stop_sequence"] = stop if isinstance(stop, str) else stop[0]
+            
+        cache_key, cached = await self._cache_lookup(use_cache, temperature, payload=payload)
+        if cached is not None:
+            return cached
+            
+        await self._rate_limiter.acquire()
+        response = await self._make_request(payload)
+        if not isinstance(response, list):
+            return []
+        texts = [item["generated_text"] for item in response if "generated_text" in item]
+        await self._cache_store(cache_key, texts)
+        return texts
+            
+    async def _stream_response(self, payload: Dict[str, Any]) -> AsyncGenerator[str, None]:
+        """Stream generated tokens from the API as they arrive.
+        
+        The connection stays open for as long as the generator is being
+        consumed and is released when it finishes or is closed early.
+        
+        Args:
+            payload: Request payload with ``stream`` set.
             
         Yields:
             Text chunks as they arrive.
+            
+        Raises:
+            ModelError: If the request fails.
         """
-        async for line in response.content:
-            if line:
-                try:
-                    chunk = json.loads(line)
-                    if isinstance(chunk, list) and chunk:
-                        text = chunk[0].get("token", {}).get("text", "")
-                        if text:
-                            yield text
-                except json.JSONDecodeError:
-                    continue
+        session = self._get_session()
+        url = f"{self.base_url}/{self.model_id}"
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=self.timeout, sock_read=self.timeout)
+        
+        try:
+            async with session.post(url, json=payload, headers=self._headers, timeout=timeout) as response:
+                if response.status != 200:
+                    raise await self._api_error(response)
                     
+                self._request_count += 1
+                async for data in iter_sse_data(response):
+                    try:
+                        chunk = json.loads(data)
+                    except json.JSONDecodeError:
+                        continue
+                    token = chunk.get("token", {})
+                    if token.get("special"):
+                        continue
+                    text = token.get("text", "")
+                    if text:
+                        self._total_generated_tokens += 1
+                        yield text
+                        
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise ModelConnectionError(f"Hugging Face API stream failed: {str(e) or type(e).__name__}")
+            
     async def get_embeddings(
         self,
         texts: Union[str, List[str]]
@@ -224,6 +364,7 @@ class HuggingFaceLLM(ModelConnector):
             }
         }
         
+        await self._rate_limiter.acquire()
         response = await self._make_request(payload)
         
         if isinstance(response, list):
@@ -241,12 +382,6 @@ class HuggingFaceLLM(ModelConnector):
             "estimated_tokens": self._total_generated_tokens
         }
         
-    async def close(self) -> None:
-        """Close the aiohttp session."""
-        if self.session:
-            await self.session.close()
-            self.session = None
-            
     def __repr__(self) -> str:
         """Return string representation of the provider."""
         return (
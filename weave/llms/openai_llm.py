@@ -1,11 +1,23 @@
 """OpenAI LLM provider for the Weave framework."""
 
 import os
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple, Union
 import json
+import time
 import aiohttp
 import asyncio
-from ..core import ModelConnector, ModelType, ModelError
+from ..core import (
+    ModelConnector,
+    ModelType,
+    ModelError,
+    ModelAPIError,
+    ModelConnectionError,
+    InvalidArgumentError,
+    RetryPolicy,
+    parse_retry_after
+)
+from ..core.http import iter_sse_data
+from ..core.cache import ResponseCache
 
 class OpenAILLM(ModelConnector):
     """OpenAI LLM provider using their API.
@@ -15,8 +27,17 @@ class OpenAILLM(ModelConnector):
     - GPT-3.5 models
     - Text embeddings
     - Function calling
+    - Offline batch jobs
     """
     
+    # Batch jobs run against the chat completions endpoint
+    BATCH_ENDPOINT = "/v1/chat/completions"
+    BATCH_TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+    
+    # Per-request limits of the embeddings endpoint (see EmbeddingService)
+    EMBEDDING_BATCH_SIZE = 2048
+    EMBEDDING_BATCH_TOKENS = 300000
+    
     # Available models and their properties
     MODELS = {
         "gpt-4": {
@@ -54,7 +75,9 @@ class OpenAILLM(ModelConnector):
         timeout: float = 30.0,
         max_retries: int = 3,
         retry_delay: float = 1.0,
-        config: Optional[Dict[str, Any]] = None
+        config: Optional[Dict[str, Any]] = None,
+        cache: Optional[ResponseCache] = None,
+        retry_policy: Optional[RetryPolicy] = None
     ):
         """Initialize the OpenAI LLM provider.
         
@@ -65,11 +88,12 @@ class OpenAILLM(ModelConnector):
             base_url: Base URL for API requests.
             timeout: Timeout for API requests in seconds.
             max_retries: Maximum number of retries for failed requests.
-            retry_delay: Delay between retries in seconds.
+            retry_delay: Initial delay between retries in seconds.
             config: Additional configuration options.
+            cache: Optional response cache for non-streaming generations.
+            retry_policy: Retry policy shared with other connectors. Overrides
+                ``max_retries`` and ``retry_delay``.
         """
-        super().__init__(config)
-        
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         if not self.api_key:
             raise ValueError("OpenAI API key is required")
@@ -78,15 +102,21 @@ class OpenAILLM(ModelConnector):
             raise ValueError(f"Unsupported model: {model}")
         self.model = model
         
+        retry_policy = retry_policy or RetryPolicy.from_config(
+            config, max_retries=max_retries, initial_delay=retry_delay, name=f"OpenAI {model} request"
+        )
+        super().__init__(
+            ModelType.OPENAI, model, api_key=self.api_key, config=config, cache=cache, retry_policy=retry_policy
+        )
+        
         self.organization = organization
         self.base_url = base_url
         self.timeout = timeout
         self.max_retries = max_retries
         self.retry_delay = retry_delay
         
-        # Set up aiohttp session
-        self.session = None
-        self._setup_session()
+        # Request headers; connections come from the shared pool
+        self._headers = self._build_headers()
         
         # Track usage for cost estimation
         self._token_usage = {
@@ -95,70 +125,170 @@ class OpenAILLM(ModelConnector):
             "total_tokens": 0
         }
         
-    def _setup_session(self) -> None:
-        """Set up the aiohttp session with headers."""
+        # Track streaming latency
+        self._stream_stats = {
+            "streams": 0,
+            "last_time_to_first_token": None,
+            "total_time_to_first_token": 0.0
+        }
+        
+    def _initialize_client(self) -> Any:
+        """Requests are sent over HTTP directly, so no SDK client is loaded."""
+        return None
+        
+    def _build_headers(self) -> Dict[str, str]:
+        """Build the headers sent with every request."""
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
         if self.organization:
             headers["OpenAI-Organization"] = self.organization
-            
-        self.session = aiohttp.ClientSession(
-            base_url=self.base_url,
-            headers=headers,
-            timeout=aiohttp.ClientTimeout(total=self.timeout)
-        )
+        return headers
+        
+    def _record_usage(self, usage: Dict[str, int]) -> None:
+        """Add a response's token usage to the running totals."""
+        self._token_usage["prompt_tokens"] += usage.get("prompt_tokens", 0)
+        self._token_usage["completion_tokens"] += usage.get("completion_tokens", 0)
+        self._token_usage["total_tokens"] += usage.get("total_tokens", 0)
         
     async def _make_request(
         self,
         endpoint: str,
-        payload: Dict[str, Any],
-        stream: bool = False
-    ) -> Dict[str, Any]:
-        """Make an API request with retries.
+        payload: Optional[Dict[str, Any]] = None,
+        method: str = "POST",
+        files: Optional[Dict[str, Tuple[str, bytes]]] = None,
+        fields: Optional[Dict[str, str]] = None,
+        raw: bool = False,
+        guarded: bool = True,
+        retry: bool = True
+    ) -> Union[Dict[str, Any], str]:
+        """Make an API request, retried according to the retry policy.
+        
+        Rate limits (429), server errors (5xx), timeouts and connection
+        failures are retried with jittered backoff, honouring ``Retry-After``;
+        other errors fail immediately. Unless ``guarded`` is False, each
+        attempt passes the circuit breaker and the adaptive concurrency limit
+        (see ``ProviderGuard``).
         
         Args:
             endpoint: API endpoint to call.
-            payload: Request payload.
-            stream: Whether to stream the response.
+            payload: Request payload sent as JSON.
+            method: HTTP method.
+            files: Optional files to upload as multipart form data, as a mapping
+                of field name to (filename, content).
+            fields: Additional form fields sent with ``files``.
+            raw: Return the response body as text instead of decoded JSON.
+            guarded: Run attempts under the provider guard. Batch and file
+                endpoints pass False: they do not load the model, and their
+                latency would skew the concurrency limit.
+            retry: Retry failed attempts. Requests that create something on
+                the server and are not idempotent pass False, since a
+                timed-out attempt may still have succeeded.
             
         Returns:
             API response data.
             
         Raises:
-            ModelError: If the request fails after retries.
+            ModelAPIError: If the API returns an error status.
+            ModelConnectionError: If the API cannot be reached.
+            CircuitOpenError: If the API is failing and requests are paused.
         """
-        if not self.session:
-            self._setup_session()
+        session = self._get_session()
+        url = f"{self.base_url}{endpoint}"
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        headers = self._headers
+        if files:
+            # Let aiohttp set the multipart boundary
+            headers = {k: v for k, v in headers.items() if k != "Content-Type"}
             
-        for attempt in range(self.max_retries):
+        async def attempt() -> Union[Dict[str, Any], str]:
+            request_kwargs = {"headers": headers, "timeout": timeout}
+            if files:
+                # Form data cannot be re-sent, so it is rebuilt for every attempt
+                form = aiohttp.FormData()
+                for name, value in (fields or {}).items():
+                    form.add_field(name, value)
+                for name, (filename, content) in files.items():
+                    form.add_field(name, content, filename=filename)
+                request_kwargs["data"] = form
+            elif payload is not None:
+                request_kwargs["json"] = payload
+                
             try:
-                async with self.session.post(endpoint, json=payload) as response:
-                    if stream:
-                        return response  # Return response object for streaming
-                        
+                async with session.request(method, url, **request_kwargs) as response:
                     if response.status == 200:
+                        if raw:
+                            return await response.text()
                         data = await response.json()
                         # Update token usage
                         if "usage" in data:
-                            usage = data["usage"]
-                            self._token_usage["prompt_tokens"] += usage.get("prompt_tokens", 0)
-                            self._token_usage["completion_tokens"] += usage.get("completion_tokens", 0)
-                            self._token_usage["total_tokens"] += usage.get("total_tokens", 0)
+                            self._record_usage(data["usage"])
                         return data
                         
-                    error_data = await response.json()
-                    raise ModelError(
-                        f"OpenAI API error: {error_data.get('error', {}).get('message', 'Unknown error')}"
-                    )
-                    
-            except aiohttp.ClientError as e:
-                if attempt == self.max_retries - 1:
-                    raise ModelError(f"OpenAI API request failed: {str(e)}")
+                    raise await self._api_error(response)
                     
-                await asyncio.sleep(self.retry_delay * (2 ** attempt))
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                raise ModelConnectionError(f"OpenAI API request failed: {str(e) or type(e).__name__}")
+                
+        run = (lambda: self._guard.call(attempt)) if guarded else attempt
+        if not retry:
+            return await run()
+        return await self._retry_policy.run(run, description=f"OpenAI {method} {endpoint}")
+        
+    @staticmethod
+    async def _api_error(response: aiohttp.ClientResponse) -> ModelAPIError:
+        """Build the error for a non-200 response, keeping its status and Retry-After."""
+        try:
+            error_data = await response.json(content_type=None)
+            message = (error_data.get("error") or {}).get("message", "Unknown error")
+        except (ValueError, AttributeError, aiohttp.ClientError):
+            message = "Unknown error"
+        return ModelAPIError(
+            f"OpenAI API error ({response.status}): {message}",
+            status=response.status,
+            retry_after=parse_retry_after(response.headers)
+        )
                 
+    async def _stream_request(
+        self,
+        endpoint: str,
+        payload: Dict[str, Any]
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """Make a streaming API request and yield server-sent event chunks.
+        
+        The connection stays open for as long as the generator is being
+        consumed and is released when it finishes or is closed early.
+        
+        Args:
+            endpoint: API endpoint to call.
+            payload: Request payload with ``stream`` set.
+            
+        Yields:
+            Decoded JSON chunks, in arrival order.
+            
+        Raises:
+            ModelError: If the request fails or a chunk cannot be decoded.
+        """
+        session = self._get_session()
+        url = f"{self.base_url}{endpoint}"
+        # Streams can legitimately outlive the total timeout; bound the gaps instead
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=self.timeout, sock_read=self.timeout)
+        
+        try:
+            async with session.post(url, json=payload, headers=self._headers, timeout=timeout) as response:
+                if response.status != 200:
+                    raise await self._api_error(response)
+                    
+                async for data in iter_sse_data(response):
+                    try:
+                        yield json.loads(data)
+                    except json.JSONDecodeError:
+                        raise ModelError(f"Malformed stream chunk from OpenAI API: {data[:100]}")
+                        
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise ModelConnectionError(f"OpenAI API stream failed: {str(e) or type(e).__name__}")
+            
     async def generate(
         self,
         prompt: str,
@@ -170,7 +300,8 @@ class OpenAILLM(ModelConnector):
         stop: Optional[Union[str, List[str]]] = None,
         functions: Optional[List[Dict[str, Any]]] = None,
         function_call: Optional[Union[str, Dict[str, str]]] = None,
-        stream: bool = False
+        stream: bool = False,
+        use_cache: bool = True
     ) -> Union[str, AsyncGenerator[str, None]]:
         """Generate text using the OpenAI API.
         
@@ -185,6 +316,8 @@ class OpenAILLM(ModelConnector):
             functions: Optional function definitions for function calling.
             function_call: Optional function to call.
             stream: Whether to stream the response.
+            use_cache: Whether to serve from and store into the response cache.
+                Streaming calls are never cached.
             
         Returns:
             Generated text or async generator for streaming.
@@ -192,6 +325,112 @@ class OpenAILLM(ModelConnector):
         Raises:
             ModelError: If generation fails.
         """
+        payload = self._build_payload(
+            prompt,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            top_p=top_p,
+            frequency_penalty=frequency_penalty,
+            presence_penalty=presence_penalty,
+            stop=stop,
+            functions=functions,
+            function_call=function_call,
+            stream=stream
+        )
+        max_tokens = payload["max_tokens"]
+        
+        if stream:
+            payload["stream_options"] = {"include_usage": True}
+            self._guard.check()
+            await self._rate_limiter.acquire(tokens=self.get_token_count(prompt) + max_tokens)
+            return self._stream_response("/chat/completions", payload)
+            
+        cache_key, cached = await self._cache_lookup(use_cache, temperature, payload=payload)
+        if cached is not None:
+            return cached
+            
+        await self._rate_limiter.acquire(tokens=self.get_token_count(prompt) + max_tokens)
+        response = await self._make_request("/chat/completions", payload)
+        text = response["choices"][0]["message"]["content"]
+        await self._cache_store(cache_key, text)
+        return text
+        
+    async def generate_many(
+        self,
+        prompt: str,
+        n: int,
+        max_tokens: Optional[int] = None,
+        temperature: float = 0.7,
+        top_p: float = 1.0,
+        frequency_penalty: float = 0.0,
+        presence_penalty: float = 0.0,
+        stop: Optional[Union[str, List[str]]] = None,
+        use_cache: bool = True
+    ) -> List[str]:
+        """Sample several completions of the same prompt in one request.
+        
+        Uses the ``n`` parameter of the chat completions API, so the prompt
+        tokens are billed once for all samples.
+        
+        Args:
+            prompt: Input text to generate from.
+            n: Number of completions to sample.
+            max_tokens: Maximum tokens to generate per completion.
+            temperature: Sampling temperature (0.0 to 2.0).
+            top_p: Nucleus sampling parameter.
+            frequency_penalty: Frequency penalty (-2.0 to 2.0).
+            presence_penalty: Presence penalty (-2.0 to 2.0).
+            stop: Stop sequences to end generation.
+            use_cache: Whether to serve from and store into the response cache.
+            
+        Returns:
+            List of ``n`` generated texts in choice order.
+            
+        Raises:
+            InvalidArgumentError: If n is less than 1.
+            ModelError: If generation fails.
+        """
+        if n < 1:
+            raise InvalidArgumentError("n", "must be at least 1")
+            
+        payload = self._build_payload(
+            prompt,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            top_p=top_p,
+            frequency_penalty=frequency_penalty,
+            presence_penalty=presence_penalty,
+            stop=stop
+        )
+        payload["n"] = n
+        
+        cache_key, cached = await self._cache_lookup(use_cache, temperature, payload=payload)
+        if cached is not None:
+            return cached
+            
+        await self._rate_limiter.acquire(
+            tokens=self.get_token_count(prompt) + payload["max_tokens"] * n
+        )
+        response = await self._make_request("/chat/completions", payload)
+        choices = sorted(response["choices"], key=lambda choice: choice.get("index", 0))
+        texts = [choice["message"]["content"] for choice in choices]
+        await self._cache_store(cache_key, texts)
+        return texts
+        
+    def _build_payload(
+        self,
+        prompt: str,
+        max_tokens: Optional[int] = None,
+        temperature: float = 0.7,
+        top_p: float = 1.0,
+        frequency_penalty: float = 0.0,
+        presence_penalty: float = 0.0,
+        stop: Optional[Union[str, List[str]]] = None,
+        functions: Optional[List[Dict[str, Any]]] = None,
+        function_call: Optional[Union[str, Dict[str, str]]] = None,
+        stream: bool = False
+    ) -> Dict[str, Any]:
+        """Build a chat completions request body."""
         if not max_tokens:
             max_tokens = self.MODELS[self.model]["max_tokens"] - 100  # Leave room for prompt
             
@@ -214,30 +453,289 @@ class OpenAILLM(ModelConnector):
             if function_call:
                 payload["function_call"] = function_call
                 
-        if stream:
-            response = await self._make_request("/chat/completions", payload, stream=True)
-            return self._stream_response(response)
-        else:
-            response = await self._make_request("/chat/completions", payload)
-            return response["choices"][0]["message"]["content"]
+        return payload
             
-    async def _stream_response(self, response: aiohttp.ClientResponse) -> AsyncGenerator[str, None]:
-        """Stream response chunks from the API.
+    async def _stream_response(
+        self,
+        endpoint: str,
+        payload: Dict[str, Any]
+    ) -> AsyncGenerator[str, None]:
+        """Stream text deltas from the API as they arrive.
+        
+        Records time-to-first-token for the stream and token usage from the
+        final usage chunk.
         
         Args:
-            response: aiohttp response object.
+            endpoint: API endpoint to call.
+            payload: Request payload with ``stream`` set.
             
         Yields:
             Text chunks as they arrive.
         """
-        async for line in response.content:
-            if line:
-                chunk = json.loads(line.decode("utf-8").strip("data: "))
-                if chunk and "choices" in chunk and chunk["choices"]:
-                    delta = chunk["choices"][0].get("delta", {})
-                    if "content" in delta:
-                        yield delta["content"]
-                        
+        started = time.monotonic()
+        first_token = True
+        
+        async for chunk in self._stream_request(endpoint, payload):
+            if chunk.get("usage"):
+                self._record_usage(chunk["usage"])
+                
+            if not chunk.get("choices"):
+                continue
+                
+            content = chunk["choices"][0].get("delta", {}).get("content")
+            if content:
+                if first_token:
+                    first_token = False
+                    ttft = time.monotonic() - started
+                    self._stream_stats["streams"] += 1
+                    self._stream_stats["last_time_to_first_token"] = ttft
+                    self._stream_stats["total_time_to_first_token"] += ttft
+                yield content
+                
+    def build_batch_request(
+        self,
+        custom_id: str,
+        prompt: str,
+        n: int = 1,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """Build one line of a batch job input file.
+        
+        Args:
+            custom_id: Identifier used to map the result back to this request.
+            prompt: Input text to generate from.
+            n: Number of completions to sample.
+            **kwargs: Generation parameters accepted by ``generate`` (except
+                ``stream`` and ``use_cache``).
+                
+        Returns:
+            Batch request object for the chat completions endpoint.
+        """
+        payload = self._build_payload(prompt, **kwargs)
+        del payload["stream"]
+        if n > 1:
+            payload["n"] = n
+            
+        return {
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": self.BATCH_ENDPOINT,
+            "body": payload
+        }
+        
+    async def submit_batch(
+        self,
+        requests: List[Dict[str, Any]],
+        completion_window: str = "24h",
+        metadata: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """Upload requests as a JSONL file and create a batch job.
+        
+        Batch jobs trade latency for price: they complete within the
+        completion window at a discount and do not count against the
+        synchronous rate limits.
+        
+        The upload is retried like any request, but creating the job is not:
+        a failed create may still have started a job, so check the account's
+        batches before submitting again.
+        
+        Args:
+            requests: Requests built with ``build_batch_request``.
+            completion_window: Time frame within which the batch is processed.
+            metadata: Optional metadata attached to the batch.
+            
+        Returns:
+            The created batch object.
+            
+        Raises:
+            InvalidArgumentError: If there are no requests or custom IDs repeat.
+            ModelError: If the upload or batch creation fails.
+        """
+        if not requests:
+            raise InvalidArgumentError("requests", "a batch needs at least one request")
+            
+        custom_ids = [request["custom_id"] for request in requests]
+        if len(set(custom_ids)) != len(custom_ids):
+            raise InvalidArgumentError("requests", "custom_id values must be unique")
+            
+        content = "\n".join(json.dumps(request) for request in requests).encode("utf-8")
+        input_file = await self._make_request(
+            "/files",
+            files={"file": ("batch.jsonl", content)},
+            fields={"purpose": "batch"},
+            guarded=False
+        )
+        
+        payload = {
+            "input_file_id": input_file["id"],
+            "endpoint": self.BATCH_ENDPOINT,
+            "completion_window": completion_window
+        }
+        if metadata:
+            payload["metadata"] = metadata
+            
+        # A retry after a timeout could create a second batch job for the same file
+        batch = await self._make_request("/batches", payload, guarded=False, retry=False)
+        self.logger.info(f"Submitted batch {batch['id']} with {len(requests)} requests")
+        return batch
+        
+    async def get_batch(self, batch_id: str) -> Dict[str, Any]:
+        """Retrieve the current state of a batch job.
+        
+        Args:
+            batch_id: ID returned by ``submit_batch``.
+            
+        Returns:
+            The batch object.
+        """
+        return await self._make_request(f"/batches/{batch_id}", method="GET", guarded=False)
+        
+    async def cancel_batch(self, batch_id: str) -> Dict[str, Any]:
+        """Cancel a batch job, so it stops processing (and billing) requests.
+        
+        Requests that already completed are still billed and remain available
+        from the batch's output file.
+        
+        Args:
+            batch_id: ID returned by ``submit_batch``.
+            
+        Returns:
+            The batch object, usually with status ``cancelling``.
+        """
+        return await self._make_request(f"/batches/{batch_id}/cancel", guarded=False)
+        
+    async def wait_for_batch(
+        self,
+        batch_id: str,
+        poll_interval: Optional[float] = None,
+        timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Poll a batch job until it reaches a terminal status.
+        
+        Args:
+            batch_id: ID returned by ``submit_batch``.
+            poll_interval: Seconds between polls. Defaults to
+                ``config["batch_poll_interval"]`` (30 if unset).
+            timeout: Optional maximum number of seconds to wait.
+            
+        Returns:
+            The final batch object.
+            
+        Raises:
+            ModelError: If the batch does not finish within ``timeout``.
+        """
+        if poll_interval is None:
+            poll_interval = self.config.get("batch_poll_interval", 30.0)
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        
+        while True:
+            batch = await self.get_batch(batch_id)
+            if batch["status"] in self.BATCH_TERMINAL_STATUSES:
+                return batch
+                
+            if deadline is not None and time.monotonic() + poll_interval > deadline:
+                raise ModelError(
+                    f"Batch {batch_id} did not finish within {timeout}s "
+                    f"(status: {batch['status']})"
+                )
+                
+            counts = batch.get("request_counts") or {}
+            self.logger.debug(
+                f"Batch {batch_id} {batch['status']}: "
+                f"{counts.get('completed', 0)}/{counts.get('total', '?')} completed"
+            )
+            await asyncio.sleep(poll_interval)
+            
+    async def fetch_batch_results(
+        self,
+        batch: Dict[str, Any]
+    ) -> Dict[str, Union[List[str], ModelError]]:
+        """Download the output of a finished batch job.
+        
+        Args:
+            batch: Batch object returned by ``wait_for_batch``.
+            
+        Returns:
+            Mapping of custom ID to the generated texts of that request (one per
+            sampled completion), or a ModelError for requests that failed.
+            Requests without any result line are absent.
+        """
+        results: Dict[str, Union[List[str], ModelError]] = {}
+        
+        for file_key in ("output_file_id", "error_file_id"):
+            file_id = batch.get(file_key)
+            if not file_id:
+                continue
+                
+            content = await self._make_request(
+                f"/files/{file_id}/content", method="GET", raw=True, guarded=False
+            )
+            for line in content.splitlines():
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                custom_id = record["custom_id"]
+                response = record.get("response") or {}
+                body = response.get("body") or {}
+                
+                if response.get("status_code") == 200:
+                    if "usage" in body:
+                        self._record_usage(body["usage"])
+                    choices = sorted(body["choices"], key=lambda choice: choice.get("index", 0))
+                    results[custom_id] = [choice["message"]["content"] for choice in choices]
+                else:
+                    error = record.get("error") or body.get("error") or {}
+                    results[custom_id] = ModelError(
+                        f"Batch request {custom_id} failed: {error.get('message', 'Unknown error')}"
+                    )
+                    
+        return results
+        
+    async def run_batch_job(
+        self,
+        requests: List[Dict[str, Any]],
+        poll_interval: Optional[float] = None,
+        timeout: Optional[float] = None,
+        completion_window: str = "24h"
+    ) -> Dict[str, Union[List[str], ModelError]]:
+        """Submit requests as a batch job, wait for it and collect the results.
+        
+        Args:
+            requests: Requests built with ``build_batch_request``.
+            poll_interval: Seconds between status polls.
+            timeout: Optional maximum number of seconds to wait.
+            completion_window: Time frame within which the batch is processed.
+            
+        Returns:
+            Mapping of every request's custom ID to its generated texts, or to a
+            ModelError if the request failed or produced no result.
+            
+        Raises:
+            ModelError: If the batch fails to submit or does not finish within
+                ``timeout``. A batch that is abandoned, by a timeout or by
+                cancelling the caller, is cancelled remotely.
+        """
+        batch = await self.submit_batch(requests, completion_window=completion_window)
+        try:
+            batch = await self.wait_for_batch(batch["id"], poll_interval=poll_interval, timeout=timeout)
+        except (Exception, asyncio.CancelledError):
+            try:
+                await self.cancel_batch(batch["id"])
+                self.logger.warning(f"Cancelled unfinished batch {batch['id']}")
+            except Exception as e:
+                self.logger.error(f"Error cancelling batch {batch['id']}: {str(e)}")
+            raise
+        results = await self.fetch_batch_results(batch)
+        
+        for request in requests:
+            custom_id = request["custom_id"]
+            if custom_id not in results:
+                results[custom_id] = ModelError(
+                    f"No result for batch request {custom_id} (batch status: {batch['status']})"
+                )
+                
+        return results
+        
     async def get_embeddings(
         self,
         texts: Union[str, List[str]],
@@ -250,7 +748,8 @@ class OpenAILLM(ModelConnector):
             model: Embedding model to use.
             
         Returns:
-            Single embedding vector or list of vectors.
+            Single embedding vector or list of vectors. Use
+            ``EmbeddingService`` for large, repeated or cached workloads.
             
         Raises:
             ModelError: If embedding generation fails.
@@ -266,8 +765,10 @@ class OpenAILLM(ModelConnector):
             "input": texts
         }
         
+        await self._rate_limiter.acquire(tokens=sum(self.count_tokens_batch(texts)))
         response = await self._make_request("/embeddings", payload)
-        embeddings = [data["embedding"] for data in response["data"]]
+        data = sorted(response["data"], key=lambda item: item.get("index", 0))
+        embeddings = [item["embedding"] for item in data]
         
         return embeddings[0] if len(embeddings) == 1 else embeddings
         
@@ -279,6 +780,20 @@ class OpenAILLM(ModelConnector):
         """
         return self._token_usage.copy()
         
+    def get_stream_stats(self) -> Dict[str, Any]:
+        """Get streaming latency statistics.
+        
+        Returns:
+            Dictionary with the number of streams that produced a token and the
+            last and mean time-to-first-token in seconds.
+        """
+        stats = self._stream_stats.copy()
+        stats["mean_time_to_first_token"] = (
+            stats["total_time_to_first_token"] / stats["streams"]
+            if stats["streams"] else None
+        )
+        return stats
+        
     def estimate_cost(self) -> float:
         """Estimate cost based on token usage.
         
@@ -296,12 +811,6 @@ class OpenAILLM(ModelConnector):
         )
         return prompt_cost + completion_cost
         
-    async def close(self) -> None:
-        """Close the aiohttp session."""
-        if self.session:
-            await self.session.close()
-            self.session = None
-            
     def __repr__(self) -> str:
         """Return string representation of the provider."""
         return (
@@ -0,0 +1,508 @@
+"""Routing over several model connectors for the Weave framework."""
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import Any, AsyncGenerator, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from ..core import CircuitOpenError, InvalidArgumentError, ModelError, gather_with_concurrency
+from ..core.resilience import is_overload
+
+class RouteBackend:
+    """A connector in a ``RoutingConnector`` pool, with its routing state."""
+    
+    def __init__(
+        self,
+        connector: Any,
+        weight: float = 1.0,
+        cost_per_1k_tokens: Optional[float] = None,
+        output_cost_per_1k_tokens: Optional[float] = None,
+        name: Optional[str] = None,
+        latency_window: int = 200
+    ):
+        """Initialize the backend.
+        
+        Args:
+            connector: Model connector (``OpenAILLM``, ``HuggingFaceLLM``,
+                ``ModelConnector``, ...).
+            weight: Relative share of traffic (weighted routing) or capacity
+                (least-outstanding routing).
+            cost_per_1k_tokens: Input token price. Defaults to the connector's
+                ``MODELS`` entry when it has one, else 0.
+            output_cost_per_1k_tokens: Output token price, defaulting likewise.
+            name: Name used in stats and logs.
+            latency_window: Number of recent latencies kept for percentiles.
+            
+        Raises:
+            InvalidArgumentError: If the weight is not positive.
+        """
+        if weight <= 0:
+            raise InvalidArgumentError("weight", "must be positive")
+            
+        model_info = getattr(connector, "MODELS", {}).get(getattr(connector, "model", None), {})
+        self.connector = connector
+        self.weight = weight
+        self.cost_per_1k_tokens = (
+            cost_per_1k_tokens if cost_per_1k_tokens is not None
+            else model_info.get("cost_per_1k_tokens", 0.0)
+        )
+        self.output_cost_per_1k_tokens = (
+            output_cost_per_1k_tokens if output_cost_per_1k_tokens is not None
+            else model_info.get("output_cost_per_1k_tokens", 0.0)
+        )
+        self.name = name or (
+            f"{connector.__class__.__name__}:"
+            f"{getattr(connector, 'model', None) or getattr(connector, 'model_name', None) or id(connector)}"
+        )
+        
+        self.outstanding = 0
+        self.cooldown_until = 0.0
+        self.latencies: deque = deque(maxlen=latency_window)
+        self.stats = {
+            "requests": 0,
+            "successes": 0,
+            "failures": 0,
+            "cancelled": 0
+        }
+        
+    def estimate_cost(self, prompt_tokens: int, output_tokens: int) -> float:
+        """Estimated price of a request in USD."""
+        return (
+            prompt_tokens * self.cost_per_1k_tokens
+            + output_tokens * self.output_cost_per_1k_tokens
+        ) / 1000
+        
+    def latency_quantile(self, quantile: float) -> Optional[float]:
+        """Quantile of recent latencies, or None without data."""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(quantile * len(ordered)))]
+        
+    def is_available(self, now: float) -> bool:
+        """Whether the backend is neither cooling down nor circuit-broken."""
+        if now < self.cooldown_until:
+            return False
+        get_health = getattr(self.connector, "get_health", None)
+        if get_health is not None:
+            circuit = get_health().get("circuit")
+            if circuit and circuit["state"] == "open":
+                return False
+        return True
+        
+    def capacity(self) -> Optional[int]:
+        """Current adaptive concurrency limit of the connector, if it has one."""
+        get_health = getattr(self.connector, "get_health", None)
+        if get_health is None:
+            return None
+        concurrency = get_health().get("concurrency")
+        return concurrency["limit"] if concurrency else None
+        
+    def get_stats(self) -> Dict[str, Any]:
+        """Get request counters and latency percentiles of the backend."""
+        return {
+            **self.stats,
+            "outstanding": self.outstanding,
+            "p50_latency": self.latency_quantile(0.5),
+            "p95_latency": self.latency_quantile(0.95)
+        }
+        
+    def __repr__(self) -> str:
+        """Return string representation of the backend."""
+        return f"RouteBackend(name={self.name}, weight={self.weight})"
+
+class RoutingConnector:
+    """Routes ``generate`` calls over a pool of model connectors.
+    
+    Presents the connector surface used by generators and noisers
+    (``generate``, ``generate_many``, ``batch_generate``, token counting), so
+    it can be passed wherever a ``model_connector`` is expected.
+    
+    Routing strategies:
+    
+    - ``"weighted"``: random choice in proportion to backend weights.
+    - ``"least_outstanding"``: the backend with the fewest requests in flight
+      relative to its weight, ties broken by median latency.
+    - ``"cost"``: the cheapest backend for the request's estimated tokens,
+      spilling over to the next cheapest while a backend is saturated (its
+      in-flight requests reach its adaptive concurrency limit or
+      ``max_outstanding``).
+      
+    A failed request fails over to the next backend in the ranking (up to
+    ``max_failovers`` times). A backend that failed with a 429, 5xx or
+    timeout is skipped for ``cooldown`` seconds; backends whose circuit
+    breaker is open are skipped too. With ``hedge``, a request still running
+    after the primary backend's p95 latency fires a backup request on the
+    next backend; the first success wins and the other call is cancelled, so
+    one slow backend does not set the tail latency of a job.
+    
+    Example:
+        router = RoutingConnector(
+            [OpenAILLM(model="gpt-4"), RouteBackend(OpenAILLM(model="gpt-3.5-turbo"), weight=3)],
+            strategy="cost",
+            hedge=True
+        )
+        text = await router.generate("Write a haiku about caching")
+    """
+    
+    STRATEGIES = ("weighted", "least_outstanding", "cost")
+    
+    def __init__(
+        self,
+        backends: Sequence[Union[RouteBackend, Any]],
+        strategy: str = "least_outstanding",
+        max_failovers: Optional[int] = None,
+        cooldown: float = 5.0,
+        hedge: bool = False,
+        hedge_quantile: float = 0.95,
+        hedge_min_samples: int = 20,
+        max_outstanding: Optional[int] = None,
+        seed: Optional[int] = None,
+        config: Optional[Dict[str, Any]] = None
+    ):
+        """Initialize the router.
+        
+        Args:
+            backends: Connectors or ``RouteBackend`` entries to route over.
+            strategy: One of ``STRATEGIES``.
+            max_failovers: Maximum backends tried after the first fails
+                (default: every other backend).
+            cooldown: Seconds a backend is skipped after an overload error.
+            hedge: Fire a backup request when the primary is slower than its
+                latency quantile.
+            hedge_quantile: Latency quantile after which to hedge.
+            hedge_min_samples: Latencies a backend needs before it is hedged.
+            max_outstanding: Per-backend in-flight cap used by cost routing
+                for backends without an adaptive concurrency limit.
+            seed: Seed for weighted routing and tie-breaking.
+            config: Additional configuration options. ``max_tokens`` defaults
+                to the smallest context limit of the backends.
+                
+        Raises:
+            InvalidArgumentError: If there are no backends or the strategy is unknown.
+        """
+        if not backends:
+            raise InvalidArgumentError("backends", "at least one backend is required")
+        if strategy not in self.STRATEGIES:
+            raise InvalidArgumentError("strategy", f"must be one of {self.STRATEGIES}")
+            
+        self.backends = [
+            backend if isinstance(backend, RouteBackend) else RouteBackend(backend)
+            for backend in backends
+        ]
+        self.strategy = strategy
+        self.max_failovers = len(self.backends) - 1 if max_failovers is None else max_failovers
+        self.cooldown = cooldown
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_samples = hedge_min_samples
+        self.max_outstanding = max_outstanding
+        
+        self.config = dict(config or {})
+        self.config.setdefault("max_tokens", min(
+            getattr(backend.connector, "config", {}).get("max_tokens", 4096)
+            for backend in self.backends
+        ))
+        
+        self.logger = logging.getLogger(__name__)
+        self._rng = random.Random(seed)
+        self._stats = {
+            "requests": 0,
+            "failovers": 0,
+            "hedges": 0,
+            "hedge_wins": 0,
+            "failures": 0
+        }
+        
+    def _estimate_tokens(self, prompt: str, max_tokens: Optional[int], n: int = 1) -> Tuple[int, int]:
+        """Estimated (prompt tokens, output tokens) of a request."""
+        return len(prompt) // 4 + 1, (max_tokens or 256) * n
+        
+    def _rank(self, prompt_tokens: int, output_tokens: int) -> List[RouteBackend]:
+        """Order backends by preference for a request under the strategy.
+        
+        Unavailable backends (cooling down or circuit open) go last, so they
+        are only tried when nothing else is left.
+        """
+        now = time.monotonic()
+        available = [backend for backend in self.backends if backend.is_available(now)]
+        unavailable = [backend for backend in self.backends if backend not in available]
+        # Ties are broken randomly so equal backends share load
+        self._rng.shuffle(available)
+        
+        if self.strategy == "weighted":
+            ranked = []
+            pool = list(available)
+            while pool:
+                choice = self._rng.choices(pool, weights=[backend.weight for backend in pool])[0]
+                ranked.append(choice)
+                pool.remove(choice)
+        elif self.strategy == "least_outstanding":
+            ranked = sorted(available, key=lambda backend: (
+                backend.outstanding / backend.weight,
+                backend.latency_quantile(0.5) or 0.0
+            ))
+        else:
+            def saturated(backend: RouteBackend) -> bool:
+                limit = backend.capacity() or self.max_outstanding
+                return limit is not None and backend.outstanding >= limit
+                
+            ranked = sorted(available, key=lambda backend: (
+                saturated(backend),
+                backend.estimate_cost(prompt_tokens, output_tokens),
+                backend.outstanding / backend.weight
+            ))
+            
+        return ranked + unavailable
+        
+    def _hedge_delay(self, backend: RouteBackend) -> Optional[float]:
+        """Seconds to wait on a backend before hedging, or None not to hedge."""
+        if not self.hedge or len(backend.latencies) < self.hedge_min_samples:
+            return None
+        return backend.latency_quantile(self.hedge_quantile)
+        
+    async def _call(self, backend: RouteBackend, request: Callable[[Any], Awaitable[Any]]) -> Any:
+        """Send a request to one backend, tracking latency and failures."""
+        backend.stats["requests"] += 1
+        started = time.monotonic()
+        try:
+            result = await request(backend.connector)
+        except asyncio.CancelledError:
+            backend.stats["cancelled"] += 1
+            raise
+        except Exception as e:
+            backend.stats["failures"] += 1
+            if is_overload(e):
+                backend.cooldown_until = time.monotonic() + self.cooldown
+            raise
+            
+        backend.stats["successes"] += 1
+        backend.latencies.append(time.monotonic() - started)
+        return result
+        
+    async def _route(
+        self,
+        request: Callable[[Any], Awaitable[Any]],
+        prompt_tokens: int,
+        output_tokens: int,
+        hedge: bool = True
+    ) -> Any:
+        """Run a request on the best backend, with failover and hedging.
+        
+        Args:
+            request: Coroutine function taking a connector and making the call.
+            prompt_tokens: Estimated prompt tokens, for cost routing.
+            output_tokens: Estimated output tokens, for cost routing.
+            hedge: Whether this request may be hedged.
+            
+        Returns:
+            Result of the first successful call.
+            
+        Raises:
+            InvalidArgumentError: If the request is invalid (not failed over).
+            ModelError: If every backend tried failed.
+        """
+        self._stats["requests"] += 1
+        candidates = iter(self._rank(prompt_tokens, output_tokens)[:self.max_failovers + 1])
+        pending: Dict[asyncio.Task, RouteBackend] = {}
+        errors: List[str] = []
+        last_error: Optional[BaseException] = None
+        hedged = False
+        
+        def launch(backend: RouteBackend) -> None:
+            # Counted before the task first runs, so concurrent routing decisions see it
+            backend.outstanding += 1
+            task = asyncio.ensure_future(self._call(backend, request))
+            task.add_done_callback(lambda _: setattr(backend, "outstanding", backend.outstanding - 1))
+            pending[task] = backend
+            
+        launch(next(candidates))
+        try:
+            while pending:
+                timeout = None
+                if hedge and not hedged and len(pending) == 1:
+                    timeout = self._hedge_delay(next(iter(pending.values())))
+                    
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # The primary is slower than usual: race a backup against it
+                    hedged = True
+                    backup = next(candidates, None)
+                    if backup is not None:
+                        self._stats["hedges"] += 1
+                        launch(backup)
+                    continue
+                    
+                for task in done:
+                    backend = pending.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        if hedged and pending:
+                            self._stats["hedge_wins"] += 1
+                        return task.result()
+                        
+                    if isinstance(error, InvalidArgumentError):
+                        raise error
+                    last_error = error
+                    errors.append(f"{backend.name}: {str(error)}")
+                    if not isinstance(error, CircuitOpenError):
+                        self.logger.warning(f"Backend {backend.name} failed: {str(error)}")
+                        
+                if not pending:
+                    backup = next(candidates, None)
+                    if backup is not None:
+                        self._stats["failovers"] += 1
+                        launch(backup)
+        finally:
+            for task in pending:
+                task.cancel()
+                
+        self._stats["failures"] += 1
+        raise ModelError(f"All backends failed: {'; '.join(errors)}") from last_error
+        
+    async def generate(
+        self,
+        prompt: str,
+        max_tokens: Optional[int] = None,
+        temperature: float = 0.7,
+        stream: bool = False,
+        **kwargs: Any
+    ) -> Union[str, AsyncGenerator[str, None]]:
+        """Generate text on the best available backend.
+        
+        Args:
+            prompt: Input text to generate from.
+            max_tokens: Maximum tokens to generate.
+            temperature: Sampling temperature.
+            stream: Whether to stream the response. Streams fail over only
+                when opening them fails and are never hedged.
+            **kwargs: Additional parameters passed to the backend.
+            
+        Returns:
+            Generated text or async generator for streaming.
+            
+        Raises:
+            ModelError: If every backend tried failed.
+        """
+        params = dict(kwargs, temperature=temperature)
+        if max_tokens is not None:
+            params["max_tokens"] = max_tokens
+        if stream:
+            params["stream"] = True
+            
+        async def request(connector: Any) -> Union[str, AsyncGenerator[str, None]]:
+            return await connector.generate(prompt=prompt, **params)
+            
+        return await self._route(request, *self._estimate_tokens(prompt, max_tokens), hedge=not stream)
+        
+    async def generate_many(
+        self,
+        prompt: str,
+        n: int,
+        max_tokens: Optional[int] = None,
+        temperature: float = 0.7,
+        **kwargs: Any
+    ) -> List[str]:
+        """Sample several completions of a prompt on the best available backend.
+        
+        Args:
+            prompt: Input text to generate from.
+            n: Number of completions to sample.
+            max_tokens: Maximum tokens to generate per completion.
+            temperature: Sampling temperature.
+            **kwargs: Additional parameters passed to the backend.
+            
+        Returns:
+            List of generated texts.
+            
+        Raises:
+            InvalidArgumentError: If n is less than 1.
+            ModelError: If every backend tried failed.
+        """
+        if n < 1:
+            raise InvalidArgumentError("n", "must be at least 1")
+            
+        params = dict(kwargs, temperature=temperature)
+        if max_tokens is not None:
+            params["max_tokens"] = max_tokens
+            
+        async def request(connector: Any) -> List[str]:
+            return await connector.generate_many(prompt, n=n, **params)
+            
+        return await self._route(request, *self._estimate_tokens(prompt, max_tokens, n))
+        
+    async def batch_generate(
+        self,
+        prompts: List[str],
+        max_tokens: Optional[int] = None,
+        temperature: float = 0.7,
+        max_concurrency: int = 16,
+        **kwargs: Any
+    ) -> List[Optional[str]]:
+        """Generate text for multiple prompts, routing each independently.
+        
+        Args:
+            prompts: List of input prompts.
+            max_tokens: Maximum tokens to generate per prompt.
+            temperature: Sampling temperature.
+            max_concurrency: Maximum prompts in flight.
+            **kwargs: Additional parameters passed to the backends.
+            
+        Returns:
+            Generated texts in prompt order, None where every backend failed.
+        """
+        results = await gather_with_concurrency(
+            [
+                lambda prompt=prompt: self.generate(prompt, max_tokens=max_tokens, temperature=temperature, **kwargs)
+                for prompt in prompts
+            ],
+            max_concurrency=max_concurrency,
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                self.logger.error(f"Batch generation error: {str(result)}")
+        return [None if isinstance(result, Exception) else result for result in results]
+        
+    def get_token_count(self, text: str) -> int:
+        """Count tokens with the first backend's tokenizer."""
+        connector = self.backends[0].connector
+        if hasattr(connector, "get_token_count"):
+            return connector.get_token_count(text)
+        return len(text) // 4 + 1
+        
+    def count_tokens_batch(self, texts: List[str]) -> List[int]:
+        """Count tokens of several texts with the first backend's tokenizer."""
+        connector = self.backends[0].connector
+        if hasattr(connector, "count_tokens_batch"):
+            return connector.count_tokens_batch(texts)
+        return [self.get_token_count(text) for text in texts]
+        
+    def get_stats(self) -> Dict[str, Any]:
+        """Get routing counters and per-backend statistics.
+        
+        Returns:
+            Dictionary with request, failover and hedge counts and a
+            ``backends`` mapping of backend name to its statistics.
+        """
+        return {
+            **self._stats,
+            "strategy": self.strategy,
+            "backends": {backend.name: backend.get_stats() for backend in self.backends}
+        }
+        
+    async def close(self) -> None:
+        """Close every backend connector."""
+        for backend in self.backends:
+            close = getattr(backend.connector, "close", None)
+            if close is not None:
+                await close()
+                
+    def __repr__(self) -> str:
+        """Return string representation of the router."""
+        return (
+            f"RoutingConnector(strategy={self.strategy}, "
+            f"backends={[backend.name for backend in self.backends]})"
+        )
@@ -1,5 +1,7 @@
 """Noisers module for text transformation and augmentation."""
 
 from .context_noiser import ContextNoiser
+from .noiser_chain import NoiserChain
+from .typo_engine import TypoEngine
 
-__all__ = ["ContextNoiser"] 
\ No newline at end of file
+__all__ = ["ContextNoiser", "NoiserChain", "TypoEngine"] 
\ No newline at end of file
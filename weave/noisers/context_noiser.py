@@ -39,9 +39,9 @@ class ContextNoiser(BaseNoiser):
         if "window_sizes" in self.config:
             self.window_sizes.update(self.config["window_sizes"])
             
-    def augment(self, 
-                query: str,
-                context: Optional[Dict[str, Any]] = None) -> str:
+    async def aaugment(self,
+                       query: str,
+                       context: Optional[Dict[str, Any]] = None) -> str:
         """Apply context-aware transformation.
         
         Args:
@@ -57,7 +57,7 @@ class ContextNoiser(BaseNoiser):
         # Build context-aware prompt
         prompt = self._build_context_prompt(query, context, context_type)
         
-        response = self.model.generate(
+        response = await self.model.generate(
             prompt=prompt,
             max_tokens=self.config.get("max_tokens", 150),
             temperature=self.config.get("temperature", 0.7)
@@ -65,20 +65,6 @@ class ContextNoiser(BaseNoiser):
         
         return response.strip()
         
-    def batch_augment(self,
-                     queries: List[str],
-                     context: Optional[Dict[str, Any]] = None) -> List[str]:
-        """Apply context-aware transformation to multiple texts.
-        
-        Args:
-            queries: List of texts to transform
-            context: Shared context information
-            
-        Returns:
-            List of transformed texts
-        """
-        return [self.augment(q, context) for q in queries]
-        
     def _build_context_prompt(self,
                             text: str,
                             context: Dict[str, Any],
@@ -22,11 +22,13 @@ class DomainErrorNoiser(BaseNoiser):
         
         Args:
             model_connector: LLM connector for transformations
-            domain_config: Configuration for domain-specific errors
+            domain_config: Configuration for domain-specific errors; also the noiser's base
+                configuration (``max_concurrency`` and the packed batch
+                settings ``packed``, ``packed_token_budget`` and ``max_pack_size``)
         """
-        super().__init__()
+        super().__init__(domain_config)
         self.model = model_connector
-        self.domain_config = domain_config or {}
+        self.domain_config = self.config
         
         # Load domain-specific error patterns
         self.domain_patterns = {
@@ -56,7 +58,7 @@ class DomainErrorNoiser(BaseNoiser):
         if "custom_domains" in self.domain_config:
             self.domain_patterns.update(self.domain_config["custom_domains"])
             
-    def augment(self, query: str) -> str:
+    async def aaugment(self, query: str) -> str:
         """Apply domain-specific errors to a single query.
         
         Args:
@@ -65,6 +67,15 @@ class DomainErrorNoiser(BaseNoiser):
         Returns:
             Text with domain-specific errors
         """
+        response = await self.model.generate(
+            prompt=self._build_prompt(query),
+            **self._generation_params(query)
+        )
+        
+        return response.strip()
+        
+    def _build_prompt(self, text: str) -> str:
+        """Build the domain-specific error prompt for a text."""
         domain = self.domain_config.get("domain", "programming")
         error_categories = self.domain_config.get("error_categories", ["syntax"])
         error_rate = self.domain_config.get("error_rate", 0.3)
@@ -72,13 +83,12 @@ class DomainErrorNoiser(BaseNoiser):
         if domain not in self.domain_patterns:
             raise ValueError(f"Unsupported domain: {domain}")
             
-        # Build prompt for domain-specific transformation
-        prompt = f"""Transform this {domain} text by introducing domain-specific errors:
+        return f"""Transform this {domain} text by introducing domain-specific errors:
         Error categories: {', '.join(error_categories)}
         Error rate: {error_rate}
         
         Original text:
-        {query}
+        {text}
         
         Instructions:
         1. Maintain overall structure and meaning
@@ -86,24 +96,12 @@ class DomainErrorNoiser(BaseNoiser):
         3. Keep the error rate at approximately {error_rate * 100}%
         """
         
-        response = self.model.generate(
-            prompt=prompt,
-            max_tokens=self.domain_config.get("max_tokens", 150),
-            temperature=self.domain_config.get("temperature", 0.7)
-        )
-        
-        return response.strip()
-        
-    def batch_augment(self, queries: List[str]) -> List[str]:
-        """Apply domain-specific errors to multiple queries.
-        
-        Args:
-            queries: List of original texts
-            
-        Returns:
-            List of transformed texts
-        """
-        return [self.augment(q) for q in queries]
+    def _generation_params(self, text: str) -> Dict[str, Any]:
+        """Generation parameters for domain error injection."""
+        return {
+            "max_tokens": self.domain_config.get("max_tokens", 150),
+            "temperature": self.domain_config.get("temperature", 0.7)
+        }
         
     def add_domain(self, domain: str, patterns: Dict[str, List[str]]) -> None:
         """Add a new domain with its error patterns.
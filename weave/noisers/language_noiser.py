@@ -23,11 +23,13 @@ class LanguageNoiser(BaseNoiser):
         
         Args:
             model_connector: LLM connector for transformations
-            language_config: Configuration for language handling
+            language_config: Configuration for language handling; also the noiser's base
+                configuration (``max_concurrency`` and the packed batch
+                settings ``packed``, ``packed_token_budget`` and ``max_pack_size``)
         """
-        super().__init__()
+        super().__init__(language_config)
         self.model = model_connector
-        self.language_config = language_config or {}
+        self.language_config = self.config
         
         # Load language-specific error patterns
         self.error_patterns = {
@@ -51,7 +53,7 @@ class LanguageNoiser(BaseNoiser):
                     self.error_patterns[lang] = {}
                 self.error_patterns[lang].update(patterns)
                 
-    def augment(self, query: str) -> str:
+    async def aaugment(self, query: str) -> str:
         """Apply language-specific transformation to a single query.
         
         Args:
@@ -60,6 +62,15 @@ class LanguageNoiser(BaseNoiser):
         Returns:
             Transformed text with language-specific modifications
         """
+        response = await self.model.generate(
+            prompt=self._build_prompt(query),
+            **self._generation_params(query)
+        )
+        
+        return response.strip()
+        
+    def _build_prompt(self, text: str) -> str:
+        """Build the language error prompt for a text."""
         language = self.language_config.get("language", "en")
         error_types = self.language_config.get("error_types", ["grammar"])
         error_rate = self.language_config.get("error_rate", 0.3)
@@ -67,13 +78,12 @@ class LanguageNoiser(BaseNoiser):
         if language not in self.error_patterns:
             raise ValueError(f"Unsupported language: {language}")
             
-        # Build prompt for language-specific transformation
-        prompt = f"""Transform this text by introducing {language} language errors:
+        return f"""Transform this text by introducing {language} language errors:
         Error types: {', '.join(error_types)}
         Error rate: {error_rate}
         
         Original text:
-        {query}
+        {text}
         
         Instructions:
         1. Maintain the original meaning
@@ -81,24 +91,12 @@ class LanguageNoiser(BaseNoiser):
         3. Keep the error rate at approximately {error_rate * 100}%
         """
         
-        response = self.model.generate(
-            prompt=prompt,
-            max_tokens=self.language_config.get("max_tokens", 150),
-            temperature=self.language_config.get("temperature", 0.7)
-        )
-        
-        return response.strip()
-        
-    def batch_augment(self, queries: List[str]) -> List[str]:
-        """Apply language transformation to multiple queries.
-        
-        Args:
-            queries: List of original texts
-            
-        Returns:
-            List of transformed texts
-        """
-        return [self.augment(q) for q in queries]
+    def _generation_params(self, text: str) -> Dict[str, Any]:
+        """Generation parameters for language error injection."""
+        return {
+            "max_tokens": self.language_config.get("max_tokens", 150),
+            "temperature": self.language_config.get("temperature", 0.7)
+        }
         
     def add_language_patterns(self, language: str, patterns: Dict[str, List[str]]) -> None:
         """Add custom error patterns for a language.
@@ -0,0 +1,212 @@
+"""Noiser chains that fuse several LLM noisers into one call."""
+
+from typing import Any, Dict, List, Optional
+from ..core import BaseNoiser, NoiserError
+
+# Stands in for the input text in each fused noiser's instructions
+FUSED_TEXT_PLACEHOLDER = "[the text given at the end]"
+
+class NoiserChain(BaseNoiser):
+    """Applies a sequence of noisers, fusing adjacent LLM noisers.
+    
+    LLM noisers that build their request with ``_build_prompt`` (style,
+    sentiment, persona, typos, language, domain errors) and share a model
+    connector are compiled into a single prompt that lists each noiser's
+    instructions in order, so a chain of three such noisers costs one
+    round-trip instead of three. Other noisers (rule-based, or with
+    per-call context) run on their own, in their place in the sequence:
+    only adjacent compatible noisers are fused, so the order of
+    transformations is preserved.
+    
+    If a fused call fails, the noisers of that group are applied one by one
+    instead. The chain reports the metadata of every member noiser, as a
+    generator applying them separately would.
+    
+    Example:
+        chain = NoiserChain([style_noiser, sentiment_noiser, typo_noiser])
+        noised = await chain.aaugment(query)
+    """
+    
+    FUSED_TEMPLATE = """Apply all of the following transformations to the text, in order, as a single rewrite.
+    Return only the final text.
+    
+    ${transformations}
+    
+    Text:
+    ${original_text}
+    
+    Final text:
+    """
+    
+    def __init__(
+        self,
+        noisers: List[BaseNoiser],
+        fuse: bool = True,
+        config: Optional[Dict[str, Any]] = None
+    ):
+        """Initialize the chain.
+        
+        Args:
+            noisers: Noisers to apply, in order.
+            fuse: Whether to fuse adjacent compatible LLM noisers.
+            config: Additional configuration options.
+            
+        Raises:
+            ValueError: If no noisers are given.
+        """
+        super().__init__(config)
+        if not noisers:
+            raise ValueError("NoiserChain needs at least one noiser")
+            
+        self.noisers = list(noisers)
+        self.fuse = fuse
+        self.steps = self._plan_steps()
+        
+    @staticmethod
+    def _is_fusable(noiser: BaseNoiser) -> bool:
+        """Check whether a noiser is a single-prompt LLM call."""
+        return getattr(noiser, "model", None) is not None and noiser._build_prompt(FUSED_TEXT_PLACEHOLDER) is not None
+        
+    def _plan_steps(self) -> List[List[BaseNoiser]]:
+        """Group adjacent fusable noisers that share a model into steps."""
+        steps: List[List[BaseNoiser]] = []
+        for noiser in self.noisers:
+            previous = steps[-1] if steps else None
+            if (
+                self.fuse
+                and previous is not None
+                and self._is_fusable(noiser)
+                and self._is_fusable(previous[0])
+                and noiser.model is previous[0].model
+            ):
+                previous.append(noiser)
+            else:
+                steps.append([noiser])
+        return steps
+        
+    def _build_fused_prompt(self, group: List[BaseNoiser], text: str) -> str:
+        """Combine the instructions of a group of noisers into one prompt."""
+        transformations = "\n\n".join(
+            f"Transformation {number} ({noiser.__class__.__name__}):\n"
+            f"{noiser._build_prompt(FUSED_TEXT_PLACEHOLDER).strip()}"
+            for number, noiser in enumerate(group, 1)
+        )
+        return self.FUSED_TEMPLATE.replace(
+            "${transformations}", transformations
+        ).replace(
+            "${original_text}", text
+        )
+        
+    def _build_prompt(self, text: str, **kwargs: Any) -> Optional[str]:
+        """Build the fused prompt when the whole chain fuses into one call.
+        
+        This also lets a fully fused chain use packed batches.
+        """
+        if len(self.steps) != 1 or not self._is_fusable(self.steps[0][0]):
+            return None
+        group = self.steps[0]
+        if len(group) == 1:
+            return group[0]._build_prompt(text)
+        return self._build_fused_prompt(group, text)
+        
+    def _generation_params(self, text: str) -> Dict[str, Any]:
+        """Generation parameters covering every noiser of the first step."""
+        return self._group_params(self.steps[0], text)
+        
+    @staticmethod
+    def _group_params(group: List[BaseNoiser], text: str) -> Dict[str, Any]:
+        """Largest token limit and mean temperature of a group."""
+        params = [noiser._generation_params(text) for noiser in group]
+        result: Dict[str, Any] = {}
+        max_tokens = [param["max_tokens"] for param in params if "max_tokens" in param]
+        temperatures = [param["temperature"] for param in params if "temperature" in param]
+        if max_tokens:
+            result["max_tokens"] = max(max_tokens)
+        if temperatures:
+            result["temperature"] = sum(temperatures) / len(temperatures)
+        return result
+        
+    @property
+    def model(self) -> Any:
+        """Model of a fully fused chain (used by packed batches), else None."""
+        if self._build_prompt(FUSED_TEXT_PLACEHOLDER) is None:
+            return None
+        return self.steps[0][0].model
+        
+    async def aaugment(self, query: str, **kwargs: Any) -> str:
+        """Apply every noiser of the chain to a query.
+        
+        Args:
+            query: Original text to transform.
+            **kwargs: Options passed to noisers that run on their own.
+            
+        Returns:
+            Text after all transformations.
+            
+        Raises:
+            NoiserError: If a noiser fails.
+        """
+        text = query
+        for group in self.steps:
+            if len(group) > 1:
+                text = await self._apply_fused(group, text)
+            else:
+                text = await self._apply_single(group[0], text, **kwargs)
+        return text
+        
+    async def _apply_fused(self, group: List[BaseNoiser], text: str) -> str:
+        """Run a group in one call, or member by member if that fails."""
+        try:
+            response = await group[0].model.generate(
+                prompt=self._build_fused_prompt(group, text),
+                **self._group_params(group, text)
+            )
+            result = response.strip()
+            if result:
+                return result
+            raise NoiserError("Fused noiser call returned no text")
+        except Exception as e:
+            self.logger.warning(
+                f"Fused call for {[noiser.__class__.__name__ for noiser in group]} failed, "
+                f"applying them separately: {str(e)}"
+            )
+            
+        for noiser in group:
+            text = await self._apply_single(noiser, text)
+        return text
+        
+    async def _apply_single(self, noiser: BaseNoiser, text: str, **kwargs: Any) -> str:
+        """Apply one noiser, wrapping its failure in a NoiserError."""
+        try:
+            return await noiser.aaugment(text, **kwargs)
+        except NoiserError:
+            raise
+        except Exception as e:
+            raise NoiserError(f"{noiser.__class__.__name__} failed in chain: {str(e)}") from e
+            
+    def get_member_metadata(self) -> List[Dict[str, Any]]:
+        """Get the augmentation metadata of each member noiser, in order.
+        
+        Returns:
+            One metadata dictionary per noiser, as each would report it when
+            applied on its own.
+        """
+        return [noiser.get_augmentation_metadata() for noiser in self.noisers]
+        
+    def get_augmentation_metadata(self) -> Dict[str, Any]:
+        """Get metadata about the chain and its member noisers.
+        
+        Returns:
+            Dictionary with the member noisers' metadata and how they were
+            grouped into calls.
+        """
+        return {
+            "noiser_type": self.__class__.__name__,
+            "noisers": self.get_member_metadata(),
+            "steps": [[noiser.__class__.__name__ for noiser in group] for group in self.steps],
+            "fused": self.fuse
+        }
+        
+    def __repr__(self) -> str:
+        """Return string representation of the chain."""
+        return f"NoiserChain(steps={[[n.__class__.__name__ for n in group] for group in self.steps]})"
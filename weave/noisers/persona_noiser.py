@@ -103,7 +103,7 @@ class PersonaNoiser(BaseNoiser):
                 f"Prompt template is missing required variables: {missing_vars}"
             )
             
-    def _build_prompt(self, text: str) -> str:
+    def _build_prompt(self, text: str, **kwargs: Any) -> str:
         """Build the complete prompt for text transformation.
         
         Args:
@@ -128,7 +128,21 @@ class PersonaNoiser(BaseNoiser):
             "${original_text}", text
         )
         
-    async def augment(self, text: str) -> str:
+    def _generation_params(self, text: str) -> Dict[str, Any]:
+        """Generation parameters for transforming a text.
+        
+        Args:
+            text: Original text to transform.
+            
+        Returns:
+            Keyword arguments for ``model.generate``.
+        """
+        return {
+            "temperature": 0.7,  # Allow some creativity while maintaining coherence
+            "max_tokens": len(text.split()) * 2  # Reasonable limit for transformation
+        }
+        
+    async def aaugment(self, text: str) -> str:
         """Transform text to match the specified persona.
         
         Args:
@@ -145,32 +159,13 @@ class PersonaNoiser(BaseNoiser):
         try:
             transformed_text = await self.model.generate(
                 prompt=prompt,
-                temperature=0.7,  # Allow some creativity while maintaining coherence
-                max_tokens=len(text.split()) * 2  # Reasonable limit for transformation
+                **self._generation_params(text)
             )
             return transformed_text.strip()
             
         except Exception as e:
             raise ModelError(f"Failed to transform text: {str(e)}")
             
-    async def batch_augment(self, texts: List[str]) -> List[str]:
-        """Transform multiple texts to match the specified persona.
-        
-        Args:
-            texts: List of original texts to transform.
-            
-        Returns:
-            List of transformed texts in the persona's style.
-            
-        Raises:
-            ModelError: If the transformation fails.
-        """
-        results = []
-        for text in texts:
-            transformed = await self.augment(text)
-            results.append(transformed)
-        return results
-        
     def update_template(
         self,
         template: str,
@@ -1,15 +1,18 @@
 """Random typo generation for text noising in the Weave framework."""
 
-import random
 from typing import Any, Dict, List, Optional, Union
-from ..core import BaseNoiser, ModelError
+from ..core import BaseNoiser, ModelError, NoiserError
 from ..llms import OpenAILLM, HuggingFaceLLM
+from .typo_engine import TypoEngine, resolve_error_kinds
 
 class RandomTyposNoiser(BaseNoiser):
     """A noiser that introduces realistic typos and errors into text.
     
-    This noiser uses LLMs to introduce natural, human-like typos and errors
-    while maintaining readability and semantic meaning.
+    By default typos are produced locally by a rule-based ``TypoEngine``
+    (keyboard-adjacent slips, common misspellings, homophones, dropped,
+    doubled and transposed letters, case, spacing and punctuation errors),
+    with no LLM calls. Code spans, URLs and numbers are left intact. With
+    ``use_llm=True`` the errors are written by an LLM instead.
     """
     
     DEFAULT_TEMPLATE = """
@@ -57,23 +60,34 @@ class RandomTyposNoiser(BaseNoiser):
         error_severity: str = "mild",
         instructions: Optional[str] = None,
         prompt_template: Optional[str] = None,
+        use_llm: Optional[bool] = None,
+        seed: Optional[int] = None,
         config: Optional[Dict[str, Any]] = None
     ):
         """Initialize the RandomTyposNoiser.
         
         Args:
-            model_connector: LLM provider to use for text transformation.
+            model_connector: LLM provider to use when ``use_llm`` is set
+                (default: ``OpenAILLM``, created on first use).
             error_types: List of error types to introduce.
             error_frequency: How often to introduce errors ("low", "moderate", "high").
             error_severity: How severe the errors should be ("mild", "moderate", "severe").
             instructions: Custom instructions for error introduction.
             prompt_template: Custom template for the transformation prompt.
+            use_llm: Write errors with the LLM instead of the local engine
+                (default: config ``use_llm``, else whether a
+                ``model_connector`` was given).
+            seed: Seed for reproducible local typos (default: config ``seed``).
             config: Additional configuration options.
         """
         super().__init__(config)
         
-        # Set up model connector
-        self.model = model_connector or OpenAILLM()
+        if use_llm is None:
+            use_llm = self.config.get("use_llm", model_connector is not None)
+        self.use_llm = use_llm
+        
+        # Model connector is only needed, and created, for the LLM path
+        self._model = model_connector
         
         # Error configuration
         self.error_types = error_types or self.DEFAULT_ERROR_TYPES
@@ -87,6 +101,24 @@ class RandomTyposNoiser(BaseNoiser):
         # Validate configuration
         self._validate_config()
         
+        self.engine = TypoEngine(
+            error_frequency=self.error_frequency,
+            error_severity=self.error_severity,
+            error_kinds=resolve_error_kinds(self.error_types),
+            seed=seed if seed is not None else self.config.get("seed")
+        )
+        
+    @property
+    def model(self) -> Optional[Union[OpenAILLM, HuggingFaceLLM]]:
+        """LLM connector of the LLM path; None in local mode unless one was given."""
+        if self._model is None and self.use_llm:
+            self._model = OpenAILLM()
+        return self._model
+        
+    @model.setter
+    def model(self, model_connector: Optional[Union[OpenAILLM, HuggingFaceLLM]]) -> None:
+        self._model = model_connector
+        
     def _validate_config(self) -> None:
         """Validate the noiser configuration."""
         valid_frequencies = {"low", "moderate", "high"}
@@ -119,15 +151,18 @@ class RandomTyposNoiser(BaseNoiser):
                 f"Prompt template is missing required variables: {missing_vars}"
             )
             
-    def _build_prompt(self, text: str) -> str:
+    def _build_prompt(self, text: str) -> Optional[str]:
         """Build the complete prompt for text transformation.
         
         Args:
             text: Original text to transform.
             
         Returns:
-            Complete prompt with all variables substituted.
+            Complete prompt with all variables substituted, or None in local
+            mode (so the noiser is never fused into or packed with LLM calls).
         """
+        if not self.use_llm:
+            return None
         return self.prompt_template.replace(
             "${error_types}", "\n".join(f"- {et}" for et in self.error_types)
         ).replace(
@@ -140,7 +175,21 @@ class RandomTyposNoiser(BaseNoiser):
             "${original_text}", text
         )
         
-    async def augment(self, text: str) -> str:
+    def _generation_params(self, text: str) -> Dict[str, Any]:
+        """Generation parameters for transforming a text.
+        
+        Args:
+            text: Original text to transform.
+            
+        Returns:
+            Keyword arguments for ``model.generate``.
+        """
+        return {
+            "temperature": 0.8,  # Higher temperature for more random errors
+            "max_tokens": len(text.split()) * 2  # Reasonable limit for transformation
+        }
+        
+    async def aaugment(self, text: str, **kwargs: Any) -> str:
         """Introduce typos and errors into the text.
         
         Args:
@@ -152,36 +201,64 @@ class RandomTyposNoiser(BaseNoiser):
         Raises:
             ModelError: If the transformation fails.
         """
+        if not self.use_llm:
+            return self.engine.augment(text)
+            
         prompt = self._build_prompt(text)
         
         try:
             transformed_text = await self.model.generate(
                 prompt=prompt,
-                temperature=0.8,  # Higher temperature for more random errors
-                max_tokens=len(text.split()) * 2  # Reasonable limit for transformation
+                **self._generation_params(text)
             )
             return transformed_text.strip()
             
         except Exception as e:
             raise ModelError(f"Failed to introduce typos: {str(e)}")
             
-    async def batch_augment(self, texts: List[str]) -> List[str]:
-        """Introduce typos and errors into multiple texts.
+    async def abatch_augment(
+        self,
+        queries: List[str],
+        max_concurrency: Optional[int] = None,
+        return_exceptions: bool = True,
+        packed: Optional[bool] = None,
+        **kwargs: Any
+    ) -> List[Union[str, NoiserError]]:
+        """Introduce typos into multiple texts.
+        
+        In local mode the whole batch is processed in one pass by the engine;
+        otherwise this is ``BaseNoiser.abatch_augment``.
         
         Args:
-            texts: List of original texts to transform.
+            queries: List of original texts.
+            max_concurrency: Maximum concurrent LLM calls (LLM path only).
+            return_exceptions: Return failures in place (LLM path only).
+            packed: Pack several texts per LLM call (LLM path only).
             
         Returns:
-            List of texts with introduced typos and errors.
-            
-        Raises:
-            ModelError: If the transformation fails.
+            List of texts with typos, in input order.
         """
-        results = []
-        for text in texts:
-            transformed = await self.augment(text)
-            results.append(transformed)
-        return results
+        if not self.use_llm:
+            return self.engine.augment_batch(queries)
+        return await super().abatch_augment(
+            queries,
+            max_concurrency=max_concurrency,
+            return_exceptions=return_exceptions,
+            packed=packed,
+            **kwargs
+        )
+        
+    def augment(self, query: str, **kwargs: Any) -> str:
+        """Synchronous ``aaugment``; local typos skip the event loop entirely."""
+        if not self.use_llm:
+            return self.engine.augment(query)
+        return super().augment(query, **kwargs)
+        
+    def batch_augment(self, queries: List[str], **kwargs: Any) -> List[Union[str, NoiserError]]:
+        """Synchronous ``abatch_augment``; local typos skip the event loop entirely."""
+        if not self.use_llm:
+            return self.engine.augment_batch(queries)
+        return super().batch_augment(queries, **kwargs)
         
     def update_template(
         self,
@@ -211,7 +288,9 @@ class RandomTyposNoiser(BaseNoiser):
             "error_types": self.error_types,
             "error_frequency": self.error_frequency,
             "error_severity": self.error_severity,
-            "instructions": self.instructions
+            "instructions": self.instructions,
+            "use_llm": self.use_llm,
+            "seed": self.engine.seed
         }
         
     def __repr__(self) -> str:
@@ -219,5 +298,5 @@ class RandomTyposNoiser(BaseNoiser):
         return (
             f"RandomTyposNoiser(frequency='{self.error_frequency}', "
             f"severity='{self.error_severity}', "
-            f"model={self.model.__class__.__name__})"
+            f"model={self.model.__class__.__name__ if self.use_llm else 'local'})"
         )
@@ -1,5 +1,6 @@
 """Sentiment-based text transformation noiser."""
 
+import json
 from typing import Any, Dict, List, Optional, Union
 from ..core.base_noiser import BaseNoiser
 from ..core.model_connector import ModelConnector
@@ -38,7 +39,7 @@ class SentimentNoiser(BaseNoiser):
             "intense": "Amplify the emotional intensity of this text while maintaining its sentiment direction"
         }
         
-    def augment(self, query: str) -> str:
+    async def aaugment(self, query: str) -> str:
         """Apply sentiment transformation to text.
         
         Args:
@@ -47,6 +48,15 @@ class SentimentNoiser(BaseNoiser):
         Returns:
             Transformed text with adjusted sentiment
         """
+        response = await self.model.generate(
+            prompt=self._build_prompt(query),
+            **self._generation_params(query)
+        )
+        
+        return response.strip()
+        
+    def _build_prompt(self, text: str) -> str:
+        """Build the sentiment transformation prompt for a text."""
         target_sentiment = self.config.get("target_sentiment", "neutral")
         intensity = self.config.get("intensity", 0.5)
         preserve_keywords = self.config.get("preserve_keywords", [])
@@ -55,13 +65,13 @@ class SentimentNoiser(BaseNoiser):
             raise ValueError(f"Unknown sentiment: {target_sentiment}")
             
         # Build prompt with sentiment instructions
-        prompt = f"""{self.templates[target_sentiment]}
+        return f"""{self.templates[target_sentiment]}
         
         Intensity: {intensity}
         Keywords to preserve: {', '.join(preserve_keywords)}
         
         Original text:
-        {query}
+        {text}
         
         Instructions:
         1. Maintain the core meaning and key information
@@ -70,28 +80,16 @@ class SentimentNoiser(BaseNoiser):
         4. Preserve these keywords: {preserve_keywords}
         """
         
-        response = self.model.generate(
-            prompt=prompt,
-            max_tokens=self.config.get("max_tokens", 150),
-            temperature=self.config.get("temperature", 0.7)
-        )
-        
-        return response.strip()
-        
-    def batch_augment(self, queries: List[str]) -> List[str]:
-        """Apply sentiment transformation to multiple texts.
-        
-        Args:
-            queries: List of original texts
-            
-        Returns:
-            List of transformed texts
-        """
-        return [self.augment(q) for q in queries]
+    def _generation_params(self, text: str) -> Dict[str, Any]:
+        """Generation parameters for sentiment transformation."""
+        return {
+            "max_tokens": self.config.get("max_tokens", 150),
+            "temperature": self.config.get("temperature", 0.7)
+        }
         
-    def adjust_sentiment(self,
-                        text: str,
-                        target_sentiment: Dict[str, float]) -> str:
+    async def adjust_sentiment(self,
+                               text: str,
+                               target_sentiment: Dict[str, float]) -> str:
         """Fine-grained sentiment adjustment using multiple scales.
         
         Args:
@@ -129,7 +127,7 @@ class SentimentNoiser(BaseNoiser):
            - Objectivity (subjective to objective)
         """
         
-        response = self.model.generate(
+        response = await self.model.generate(
             prompt=prompt,
             max_tokens=self.config.get("max_tokens", 150),
             temperature=self.config.get("temperature", 0.7)
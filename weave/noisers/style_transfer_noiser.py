@@ -19,11 +19,13 @@ class StyleTransferNoiser(BaseNoiser):
         
         Args:
             model_connector: LLM connector for style transfer
-            style_config: Configuration for the target style
+            style_config: Configuration for the target style; also the noiser's base
+                configuration (``max_concurrency`` and the packed batch
+                settings ``packed``, ``packed_token_budget`` and ``max_pack_size``)
         """
-        super().__init__()
+        super().__init__(style_config)
         self.model = model_connector
-        self.style_config = style_config or {}
+        self.style_config = self.config
         
         # Load style templates
         self.style_templates = {
@@ -38,7 +40,7 @@ class StyleTransferNoiser(BaseNoiser):
         if "custom_styles" in self.style_config:
             self.style_templates.update(self.style_config["custom_styles"])
             
-    def augment(self, query: str) -> str:
+    async def aaugment(self, query: str) -> str:
         """Apply style transfer to a single query.
         
         Args:
@@ -47,30 +49,27 @@ class StyleTransferNoiser(BaseNoiser):
         Returns:
             Style-transferred text
         """
-        style = self.style_config.get("style", "technical")
-        if style not in self.style_templates:
-            raise ValueError(f"Unknown style: {style}")
-            
-        prompt = f"{self.style_templates[style]}:\n\n{query}"
-        
-        response = self.model.generate(
-            prompt=prompt,
-            max_tokens=self.style_config.get("max_tokens", 150),
-            temperature=self.style_config.get("temperature", 0.7)
+        response = await self.model.generate(
+            prompt=self._build_prompt(query),
+            **self._generation_params(query)
         )
         
         return response.strip()
         
-    def batch_augment(self, queries: List[str]) -> List[str]:
-        """Apply style transfer to multiple queries.
-        
-        Args:
-            queries: List of original texts
+    def _build_prompt(self, text: str, **kwargs: Any) -> str:
+        """Build the style transfer prompt for a text."""
+        style = self.style_config.get("style", "technical")
+        if style not in self.style_templates:
+            raise ValueError(f"Unknown style: {style}")
             
-        Returns:
-            List of style-transferred texts
-        """
-        return [self.augment(q) for q in queries]
+        return f"{self.style_templates[style]}:\n\n{text}"
+        
+    def _generation_params(self, text: str) -> Dict[str, Any]:
+        """Generation parameters for style transfer."""
+        return {
+            "max_tokens": self.style_config.get("max_tokens", 150),
+            "temperature": self.style_config.get("temperature", 0.7)
+        }
         
     def add_custom_style(self, name: str, template: str) -> None:
         """Add a custom style template.
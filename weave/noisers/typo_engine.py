@@ -0,0 +1,346 @@
+"""Local, seedable typo generation without LLM calls."""
+
+import math
+import random
+import re
+import zlib
+from typing import List, Optional, Sequence, Tuple
+
+# QWERTY neighbours of each letter key
+KEYBOARD_ADJACENCY = {
+    "q": "wa", "w": "qeas", "e": "wrsd", "r": "etdf", "t": "ryfg",
+    "y": "tugh", "u": "yihj", "i": "uojk", "o": "ipkl", "p": "ol",
+    "a": "qwsz", "s": "awedxz", "d": "serfcx", "f": "drtgvc", "g": "ftyhbv",
+    "h": "gyujnb", "j": "huikmn", "k": "jiolm", "l": "kop",
+    "z": "asx", "x": "zsdc", "c": "xdfv", "v": "cfgb", "b": "vghn",
+    "n": "bhjm", "m": "njk"
+}
+
+# Common misspellings, keyed by the correct word
+MISSPELLINGS = {
+    "the": "teh", "and": "adn", "that": "taht", "with": "wiht", "which": "whcih",
+    "receive": "recieve", "believe": "beleive", "separate": "seperate",
+    "definitely": "definately", "occurred": "occured", "until": "untill",
+    "necessary": "neccessary", "address": "adress", "beginning": "begining",
+    "calendar": "calender", "environment": "enviroment", "government": "goverment",
+    "because": "becuase", "different": "diffrent", "function": "fucntion",
+    "return": "retrun", "should": "shoudl", "would": "woudl", "could": "coudl",
+    "their": "thier", "friend": "freind", "weird": "wierd", "really": "realy",
+    "probably": "probaly", "tomorrow": "tommorow", "argument": "arguement",
+    "length": "lenght", "height": "heigth", "parameter": "paramter",
+    "variable": "varible", "message": "mesage", "successful": "succesful"
+}
+
+# Homophone groups; a word is replaced by another member of its group
+HOMOPHONE_GROUPS = [
+    ("their", "there", "they're"), ("your", "you're"), ("its", "it's"),
+    ("to", "too", "two"), ("then", "than"), ("affect", "effect"),
+    ("whose", "who's"), ("lose", "loose"), ("accept", "except"),
+    ("hear", "here"), ("know", "no"), ("weather", "whether"),
+    ("break", "brake"), ("peace", "piece"), ("right", "write"),
+    ("principal", "principle"), ("where", "wear"), ("by", "buy", "bye")
+]
+HOMOPHONES = {word: [other for other in group if other != word] for group in HOMOPHONE_GROUPS for word in group}
+
+# Spans never modified: fenced and inline code, URLs, tokens with digits or
+# underscores (numbers, identifiers), camelCase and ALL-CAPS tokens
+PROTECTED_PATTERN = re.compile(
+    r"```.*?```|`[^`\n]*`|https?://\S+|\S*[\d_]\S*|\b[a-z]+[A-Z]\w*\b|\b[A-Z]{2,}\b",
+    re.DOTALL
+)
+WORD_PATTERN = re.compile(r"[A-Za-z][A-Za-z']*")
+
+# Error kinds the engine can produce, matched against error type descriptions
+ERROR_KINDS = {
+    "misspelling": ("misspell",),
+    "missing_letter": ("missing letter",),
+    "transposition": ("transpos",),
+    "wrong_case": ("case",),
+    "homophone": ("homophone",),
+    "double_letter": ("double",),
+    "spacing": ("space",),
+    "punctuation": ("punctuation",),
+    "keyboard": ("keyboard", "adjacent", "fat finger")
+}
+
+# Probability that a word receives an error
+FREQUENCY_RATES = {"low": 0.03, "moderate": 0.08, "high": 0.15}
+
+# Per-severity relative weights of the error kinds and edits per chosen word
+SEVERITY_PROFILES = {
+    "mild": (
+        {"transposition": 3, "double_letter": 3, "wrong_case": 2, "spacing": 2, "punctuation": 2,
+         "missing_letter": 1, "misspelling": 1, "homophone": 1, "keyboard": 1},
+        (1,)
+    ),
+    "moderate": (
+        {"transposition": 2, "double_letter": 2, "wrong_case": 1, "spacing": 1, "punctuation": 1,
+         "missing_letter": 2, "misspelling": 2, "homophone": 2, "keyboard": 2},
+        (1, 1, 1, 2)
+    ),
+    "severe": (
+        {"transposition": 2, "double_letter": 1, "wrong_case": 1, "spacing": 1, "punctuation": 1,
+         "missing_letter": 3, "misspelling": 3, "homophone": 3, "keyboard": 3},
+        (1, 2, 2, 3)
+    )
+}
+
+def resolve_error_kinds(error_types: Optional[Sequence[str]]) -> List[str]:
+    """Map free-text error type descriptions to engine error kinds.
+    
+    Args:
+        error_types: Descriptions such as ``RandomTyposNoiser.DEFAULT_ERROR_TYPES``.
+            None selects every kind.
+            
+    Returns:
+        Matching error kinds; every kind if nothing matches.
+    """
+    if not error_types:
+        return list(ERROR_KINDS)
+    kinds = [
+        kind for kind, keywords in ERROR_KINDS.items()
+        if any(keyword in description.lower() for description in error_types for keyword in keywords)
+    ]
+    return kinds or list(ERROR_KINDS)
+
+class TypoEngine:
+    """Rule-based typo generator.
+    
+    Introduces misspellings, dropped, doubled and transposed letters,
+    adjacent-key slips, case errors, homophone swaps, spacing and punctuation
+    errors. Code spans, URLs, numbers and identifier-like tokens are never
+    touched.
+    
+    The positions of errors are drawn with geometric skips, so the cost per
+    text grows with the number of errors rather than the number of words.
+    With a ``seed``, the output for a text depends only on the seed and the
+    text itself, so results are reproducible regardless of call order or
+    concurrency.
+    """
+    
+    def __init__(
+        self,
+        error_frequency: str = "moderate",
+        error_severity: str = "mild",
+        error_kinds: Optional[List[str]] = None,
+        seed: Optional[int] = None
+    ):
+        """Initialize the engine.
+        
+        Args:
+            error_frequency: How often words get errors ("low", "moderate", "high").
+            error_severity: How severe errors are ("mild", "moderate", "severe").
+            error_kinds: Error kinds to use (see ``ERROR_KINDS``); all by default.
+            seed: Seed for reproducible output. None draws from a shared,
+                unseeded generator.
+                
+        Raises:
+            ValueError: If the frequency, severity or an error kind is unknown.
+        """
+        if error_frequency not in FREQUENCY_RATES:
+            raise ValueError(f"Invalid error frequency: {error_frequency}")
+        if error_severity not in SEVERITY_PROFILES:
+            raise ValueError(f"Invalid error severity: {error_severity}")
+        kinds = error_kinds or list(ERROR_KINDS)
+        unknown = set(kinds) - set(ERROR_KINDS)
+        if unknown:
+            raise ValueError(f"Unknown error kinds: {sorted(unknown)}")
+            
+        self.error_frequency = error_frequency
+        self.error_severity = error_severity
+        self.error_kinds = kinds
+        self.seed = seed
+        self._rng = random.Random(seed)
+        
+        self.rate = FREQUENCY_RATES[error_frequency]
+        # Denominator of the geometric skip between errors
+        self._log_miss = math.log(1.0 - self.rate)
+        weights, self._edit_counts = SEVERITY_PROFILES[error_severity]
+        self._kinds = [kind for kind in kinds if weights.get(kind)]
+        self._cum_weights = []
+        total = 0
+        for kind in self._kinds:
+            total += weights[kind]
+            self._cum_weights.append(total)
+            
+        self._ops = {
+            "misspelling": self._misspell,
+            "missing_letter": self._drop_letter,
+            "transposition": self._transpose,
+            "wrong_case": self._wrong_case,
+            "homophone": self._homophone,
+            "double_letter": self._double_letter,
+            "keyboard": self._adjacent_key,
+            "spacing": self._spacing,
+            "punctuation": self._punctuation
+        }
+        
+    def _rng_for(self, text: str) -> random.Random:
+        """Generator for one text: derived from the seed and text, or shared."""
+        if self.seed is None:
+            return self._rng
+        return random.Random((self.seed << 32) ^ zlib.crc32(text.encode("utf-8")))
+        
+    def augment(self, text: str) -> str:
+        """Introduce typos into one text.
+        
+        Args:
+            text: Original text.
+            
+        Returns:
+            Text with typos.
+        """
+        rng = self._rng_for(text)
+        words = self._candidate_words(text)
+        if not words:
+            return text
+            
+        # Geometric skips visit each word with probability ``rate``
+        chosen: List[int] = []
+        position = -1
+        while True:
+            position += 1 + int(math.log(1.0 - rng.random()) / self._log_miss)
+            if position >= len(words):
+                break
+            chosen.append(position)
+        if not chosen:
+            return text
+            
+        pieces: List[str] = []
+        cursor = 0
+        for index in chosen:
+            start, end = words[index]
+            if start < cursor:
+                continue
+            word, consumed = self._corrupt(rng, text[start:end], text, end)
+            pieces.append(text[cursor:start])
+            pieces.append(word)
+            cursor = end + consumed
+        pieces.append(text[cursor:])
+        return "".join(pieces)
+        
+    def augment_batch(self, texts: List[str]) -> List[str]:
+        """Introduce typos into many texts.
+        
+        Args:
+            texts: Original texts.
+            
+        Returns:
+            Texts with typos, in input order.
+        """
+        augment = self.augment
+        return [augment(text) for text in texts]
+        
+    @staticmethod
+    def _candidate_words(text: str) -> List[Tuple[int, int]]:
+        """Spans of words outside protected regions."""
+        protected = [match.span() for match in PROTECTED_PATTERN.finditer(text)]
+        if not protected:
+            return [match.span() for match in WORD_PATTERN.finditer(text)]
+            
+        words = []
+        region = 0
+        for match in WORD_PATTERN.finditer(text):
+            start, end = match.span()
+            while region < len(protected) and protected[region][1] <= start:
+                region += 1
+            if region < len(protected) and protected[region][0] < end:
+                continue
+            words.append((start, end))
+        return words
+        
+    def _corrupt(self, rng: random.Random, word: str, text: str, end: int) -> Tuple[str, int]:
+        """Apply one or more edits to a word.
+        
+        Returns:
+            The edited word and how many characters after it were consumed
+            (e.g. a space removed by a spacing error).
+        """
+        consumed = 0
+        for _ in range(rng.choice(self._edit_counts)):
+            kind = rng.choices(self._kinds, cum_weights=self._cum_weights)[0]
+            word, extra = self._ops[kind](rng, word, text, end + consumed)
+            consumed += extra
+        return word, consumed
+        
+    @staticmethod
+    def _match_case(source: str, replacement: str) -> str:
+        """Give ``replacement`` the capitalization of ``source``."""
+        if source.isupper() and len(source) > 1:
+            return replacement.upper()
+        if source[:1].isupper():
+            return replacement[:1].upper() + replacement[1:]
+        return replacement
+        
+    def _misspell(self, rng: random.Random, word: str, text: str, end: int) -> Tuple[str, int]:
+        misspelling = MISSPELLINGS.get(word.lower())
+        if misspelling is None:
+            return self._adjacent_key(rng, word, text, end)
+        return self._match_case(word, misspelling), 0
+        
+    def _homophone(self, rng: random.Random, word: str, text: str, end: int) -> Tuple[str, int]:
+        options = HOMOPHONES.get(word.lower())
+        if not options:
+            return self._transpose(rng, word, text, end)
+        return self._match_case(word, rng.choice(options)), 0
+        
+    @staticmethod
+    def _drop_letter(rng: random.Random, word: str, text: str, end: int) -> Tuple[str, int]:
+        if len(word) < 3:
+            return word, 0
+        position = rng.randrange(1, len(word))
+        return word[:position] + word[position + 1:], 0
+        
+    @staticmethod
+    def _transpose(rng: random.Random, word: str, text: str, end: int) -> Tuple[str, int]:
+        if len(word) < 2:
+            return word, 0
+        position = rng.randrange(len(word) - 1)
+        return word[:position] + word[position + 1] + word[position] + word[position + 2:], 0
+        
+    @staticmethod
+    def _double_letter(rng: random.Random, word: str, text: str, end: int) -> Tuple[str, int]:
+        position = rng.randrange(len(word))
+        return word[:position + 1] + word[position:], 0
+        
+    @staticmethod
+    def _wrong_case(rng: random.Random, word: str, text: str, end: int) -> Tuple[str, int]:
+        position = 0 if rng.random() < 0.7 else rng.randrange(len(word))
+        return word[:position] + word[position].swapcase() + word[position + 1:], 0
+        
+    @staticmethod
+    def _adjacent_key(rng: random.Random, word: str, text: str, end: int) -> Tuple[str, int]:
+        position = rng.randrange(len(word))
+        char = word[position]
+        neighbours = KEYBOARD_ADJACENCY.get(char.lower())
+        if not neighbours:
+            return word, 0
+        replacement = rng.choice(neighbours)
+        if char.isupper():
+            replacement = replacement.upper()
+        return word[:position] + replacement + word[position + 1:], 0
+        
+    @staticmethod
+    def _spacing(rng: random.Random, word: str, text: str, end: int) -> Tuple[str, int]:
+        # Drop the following space to merge words, or split the word
+        if end < len(text) and text[end] == " " and rng.random() < 0.6:
+            return word, 1
+        if len(word) < 4:
+            return word + " ", 0
+        position = rng.randrange(1, len(word) - 1)
+        return word[:position] + " " + word[position:], 0
+        
+    @staticmethod
+    def _punctuation(rng: random.Random, word: str, text: str, end: int) -> Tuple[str, int]:
+        if "'" in word:
+            return word.replace("'", "", 1), 0
+        if end < len(text) and text[end] in ",.;:!?":
+            return word, 1
+        return word + ",", 0
+        
+    def __repr__(self) -> str:
+        """Return string representation of the engine."""
+        return (
+            f"TypoEngine(frequency='{self.error_frequency}', "
+            f"severity='{self.error_severity}', seed={self.seed})"
+        )
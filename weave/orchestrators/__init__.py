@@ -0,0 +1,14 @@
+"""Orchestrators for running the Weave data generation pipeline."""
+
+from .default_orchestrator import DefaultOrchestrator, StageStats
+from .sharded_orchestrator import ShardedOrchestrator
+from .work_queue import WorkQueue, QueueWorker, QueueCoordinator
+
+__all__ = [
+    "DefaultOrchestrator",
+    "StageStats",
+    "ShardedOrchestrator",
+    "WorkQueue",
+    "QueueWorker",
+    "QueueCoordinator",
+]
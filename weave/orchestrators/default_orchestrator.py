@@ -0,0 +1,512 @@
+"""Default pipelined orchestrator for the Weave framework."""
+
+import time
+import asyncio
+import inspect
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+from ..core import (
+    BaseOrchestrator,
+    BaseGenerator,
+    BaseNoiser,
+    BaseValidator,
+    PipelineError,
+    InvalidArgumentError,
+    NearDuplicateFilter,
+    RunJournal,
+    save_results,
+    load_jsonl_keys
+)
+
+# Marks the end of a stage's input
+_END = object()
+
+class StageStats:
+    """Throughput and latency counters for one pipeline stage."""
+    
+    def __init__(self, name: str, concurrency: int):
+        """Initialize empty counters.
+        
+        Args:
+            name: Stage name.
+            concurrency: Number of workers running the stage.
+        """
+        self.name = name
+        self.concurrency = concurrency
+        self.processed = 0
+        self.failed = 0
+        self.busy_time = 0.0
+        self.max_latency = 0.0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        
+    def record(self, latency: float, count: int = 1, failed: bool = False) -> None:
+        """Record one call that handled ``count`` samples."""
+        if self.started_at is None:
+            self.started_at = time.monotonic() - latency
+        self.processed += count
+        if failed:
+            self.failed += count
+        self.busy_time += latency * count
+        self.max_latency = max(self.max_latency, latency)
+        
+    def to_dict(self) -> Dict[str, Any]:
+        """Summarize the counters.
+        
+        Returns:
+            Dictionary with sample counts, mean and max latency in seconds, and
+            throughput in samples per second over the stage's active period.
+        """
+        elapsed = None
+        if self.started_at is not None:
+            elapsed = (self.finished_at or time.monotonic()) - self.started_at
+        return {
+            "concurrency": self.concurrency,
+            "processed": self.processed,
+            "failed": self.failed,
+            "mean_latency": self.busy_time / self.processed if self.processed else 0.0,
+            "max_latency": self.max_latency,
+            "throughput": self.processed / elapsed if elapsed else 0.0
+        }
+
+class DefaultOrchestrator(BaseOrchestrator):
+    """Runs Generator -> Noiser -> Miner -> Validator as a streaming pipeline.
+    
+    Each stage is a pool of async workers connected to the next stage by a
+    bounded queue, so a sample moves on as soon as its stage finishes instead
+    of waiting for the whole batch. Every stage has its own concurrency
+    limit; a slow stage only fills its input queue, which then applies
+    backpressure upstream.
+    
+    Noisers and validators are driven through their async interfaces
+    (``aaugment``/``ascore``), which run synchronous implementations in worker
+    threads. Generators and miners may be sync or async; sync calls likewise
+    run in worker threads so symbolic generation does not block the loop.
+    
+    Configuration:
+        - ``concurrency``: per-stage worker counts, e.g.
+          ``{"generate": 8, "noise": 8, "mine": 4, "validate": 16}``
+          (each defaults to 8).
+        - ``queue_size``: capacity of each inter-stage queue (default 64).
+        - ``miner_batch_size``: maximum number of queries passed to one
+          ``miner_func`` call in ``run_batch`` (default 8). Workers never
+          wait for a batch to fill.
+        - ``journal_path``: optional run journal (see ``RunJournal``). Every
+          stage a sample completes is recorded, so a restarted run with the
+          same journal skips finished samples and resumes the rest from the
+          last stage they reached.
+        - ``output_path``: optional jsonl file finished samples are appended
+          to as the run progresses. Each sample is written exactly once, even
+          across crashes and restarts. Failed samples are not written; they
+          are journaled as failed and retried when the run is resumed.
+        - ``output_flush_size``: number of finished samples buffered between
+          appends to ``output_path`` (default 32).
+        - ``run_id``: optional prefix for sample IDs (``"<run_id>-<index>"``).
+          Resuming requires the same ``run_id``.
+        - ``journal_fsync``: fsync after every journal entry (default True).
+        - ``dedup``: optional near-duplicate filtering of generated queries
+          (see ``NearDuplicateFilter.from_config``). A query that nearly
+          duplicates an earlier one is regenerated up to ``dedup_retries``
+          times (default 2); if it is still a duplicate, the sample fails in
+          the generate stage and skips noising, mining and validation. The
+          filter persists across ``run_batch`` calls.
+    """
+    
+    STAGES = ["generate", "noise", "mine", "validate"]
+    
+    # Sample field each stage fills; its presence means the stage can be skipped
+    STAGE_OUTPUTS = {
+        "generate": "query",
+        "noise": "noised_query",
+        "mine": "generated",
+        "validate": "score"
+    }
+    
+    def __init__(
+        self,
+        generator: BaseGenerator,
+        validator: BaseValidator,
+        noiser: Optional[BaseNoiser] = None,
+        config: Optional[Dict[str, Any]] = None
+    ):
+        """Initialize the orchestrator.
+        
+        Args:
+            generator: Generator producing (query, reference) samples.
+            validator: Validator scoring miner answers.
+            noiser: Optional noiser applied to each query before mining.
+            config: Orchestrator configuration (see class docstring).
+        """
+        super().__init__(generator, validator, noiser=noiser, config=config)
+        self.logger = logging.getLogger(__name__)
+        self.queue_size = self.config.get("queue_size", 64)
+        self.miner_batch_size = self.config.get("miner_batch_size", 8)
+        
+        concurrency = self.config.get("concurrency", {})
+        self.concurrency = {stage: concurrency.get(stage, 8) for stage in self.STAGES}
+        self._stats: Dict[str, StageStats] = {}
+        
+        self.journal_path = self.config.get("journal_path")
+        self.output_path = self.config.get("output_path")
+        self.output_flush_size = self.config.get("output_flush_size", 32)
+        self.run_id = self.config.get("run_id")
+        self.journal_fsync = self.config.get("journal_fsync", True)
+        self._journal: Optional[RunJournal] = None
+        self._written_ids: set = set()
+        self.dedup = NearDuplicateFilter.from_config(self.config.get("dedup"))
+        self.dedup_retries = self.config.get("dedup_retries", 2)
+        
+    def validate_config(self) -> bool:
+        """Check that stage concurrency, queue size and miner batch size are positive."""
+        return (
+            all(limit >= 1 for limit in self.concurrency.values())
+            and self.queue_size >= 1
+            and self.miner_batch_size >= 1
+            and self.output_flush_size >= 1
+            and self.dedup_retries >= 0
+        )
+        
+    async def _call(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Call a sync or async component without blocking the event loop."""
+        if inspect.iscoroutinefunction(func):
+            return await func(*args)
+        result = await asyncio.to_thread(func, *args)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+        
+    async def run_single(
+        self,
+        miner_func: Callable[[str], Union[str, Dict[str, Any], Awaitable[Any]]]
+    ) -> Dict[str, Any]:
+        """Run the pipeline for a single sample.
+        
+        Args:
+            miner_func: Callable (sync or async) that takes a query string and
+                returns an answer.
+                
+        Returns:
+            Sample record (see ``run_batch``).
+        """
+        async def batch_miner(queries: List[str]) -> List[Any]:
+            return [await self._call(miner_func, query) for query in queries]
+            
+        results = await self.run_batch(batch_miner, 1)
+        return results[0]
+        
+    async def run_batch(
+        self,
+        miner_func: Callable[[List[str]], Union[List[Union[str, Dict[str, Any]]], Awaitable[Any]]],
+        batch_size: int
+    ) -> List[Dict[str, Any]]:
+        """Run the pipeline for ``batch_size`` samples.
+        
+        Args:
+            miner_func: Callable (sync or async) that takes a list of queries
+                and returns one answer per query.
+            batch_size: Number of samples to produce.
+            
+        Returns:
+            One record per sample, in generation order, with ``id``,
+            ``query``, ``noised_query``, ``reference``, ``generated``,
+            ``score`` and ``metadata`` (component metadata and per-stage
+            latency). Samples that failed carry ``error`` and ``failed_stage``
+            instead of the fields their stage would have filled. Samples
+            completed by an earlier run are returned from the journal.
+            
+        Raises:
+            InvalidArgumentError: If batch_size is negative.
+            PipelineError: If a stage fails unexpectedly.
+            StorageError: If the journal or output file cannot be opened.
+        """
+        if batch_size < 0:
+            raise InvalidArgumentError("batch_size", "must be non-negative")
+            
+        stages = ["generate"] + (["noise"] if self.noiser else []) + ["mine", "validate"]
+        self._stats = {stage: StageStats(stage, self.concurrency[stage]) for stage in stages}
+        
+        queues = [asyncio.Queue(maxsize=self.queue_size) for _ in stages]
+        results: List[Optional[Dict[str, Any]]] = [None] * batch_size
+        
+        self._journal = RunJournal(self.journal_path, fsync=self.journal_fsync) if self.journal_path else None
+        self._written_ids = load_jsonl_keys(self.output_path, "id") if self.output_path else set()
+        
+        pending = []
+        for index in range(batch_size):
+            sample_id = self._sample_id(index)
+            if self._journal is not None and self._journal.is_done(sample_id):
+                results[index] = self._journal.get_state(sample_id)["data"]
+            else:
+                pending.append(index)
+        if len(pending) < batch_size:
+            self.logger.info(f"Resuming run: {batch_size - len(pending)} of {batch_size} samples already done")
+        indices = iter(pending)
+        
+        handlers = {
+            "noise": self._noise,
+            "validate": self._validate
+        }
+        
+        tasks = [asyncio.ensure_future(self._generate_stage(indices, queues[0]))]
+        for position, stage in enumerate(stages[1:]):
+            if stage == "mine":
+                worker = self._mine_stage(miner_func, queues[position], queues[position + 1])
+            else:
+                worker = self._stage(stage, handlers[stage], queues[position], queues[position + 1])
+            tasks.append(asyncio.ensure_future(worker))
+        tasks.append(asyncio.ensure_future(self._collect(queues[-1], results)))
+        
+        try:
+            await asyncio.gather(*tasks)
+        except Exception as e:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise PipelineError(f"Pipeline failed: {str(e)}")
+        finally:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+                
+        for name, stats in self.get_stage_stats().items():
+            self.logger.info(
+                f"Stage {name}: {stats['processed']} samples, "
+                f"{stats['throughput']:.2f}/s, mean latency {stats['mean_latency']:.3f}s"
+            )
+        if self.dedup is not None:
+            stats = self.dedup.get_stats()
+            self.logger.info(
+                f"Dedup: {stats['duplicates']} near-duplicates in {stats['checked']} queries "
+                f"({stats['entries']} remembered)"
+            )
+            
+        return results
+        
+    def _sample_id(self, index: int) -> str:
+        """Stable ID of the sample at ``index``."""
+        return f"{self.run_id}-{index}" if self.run_id else str(index)
+        
+    async def _checkpoint(self, sample: Dict[str, Any], stage: str, fields: List[str]) -> None:
+        """Journal the outputs a stage added to a sample."""
+        if self._journal is None:
+            return
+        data = {field: sample[field] for field in fields if field in sample}
+        metadata_key = {"noise": "noiser", "validate": "validator"}.get(stage)
+        if metadata_key in sample["metadata"]:
+            data["metadata"] = {metadata_key: sample["metadata"][metadata_key]}
+        await asyncio.to_thread(self._journal.record, sample["id"], stage, data)
+        
+    def _restore(self, sample: Dict[str, Any]) -> None:
+        """Pre-fill a sample with the outputs an earlier run journaled."""
+        state = self._journal.get_state(sample["id"]) if self._journal is not None else None
+        if not state:
+            return
+        data = state["data"]
+        sample["metadata"].update(data.pop("metadata", {}))
+        sample.update(data)
+        
+    async def _run_workers(
+        self,
+        stage: str,
+        worker: Callable[[], Awaitable[None]],
+        output: asyncio.Queue
+    ) -> None:
+        """Run a stage's workers, then signal the end of input downstream."""
+        await asyncio.gather(*[worker() for _ in range(self.concurrency[stage])])
+        self._stats[stage].finished_at = time.monotonic()
+        await output.put(_END)
+        
+    async def _generate_stage(self, indices: Any, output: asyncio.Queue) -> None:
+        """Produce samples from the generator."""
+        stats = self._stats["generate"]
+        
+        async def worker() -> None:
+            for index in indices:
+                sample = {"index": index, "id": self._sample_id(index), "metadata": {"latency": {}}}
+                self._restore(sample)
+                if "query" in sample and self.dedup is not None:
+                    # Remember queries of resumed samples so new ones are checked against them
+                    await self.dedup.ais_duplicate(sample["query"])
+                elif "query" not in sample:
+                    start = time.monotonic()
+                    try:
+                        sample["query"], sample["reference"] = await self._generate_unique()
+                        await self._checkpoint(sample, "generate", ["query", "reference"])
+                        failed = False
+                    except Exception as e:
+                        self._fail(sample, "generate", e)
+                        failed = True
+                    latency = time.monotonic() - start
+                    stats.record(latency, failed=failed)
+                    sample["metadata"]["latency"]["generate"] = latency
+                await output.put(sample)
+                
+        await self._run_workers("generate", worker, output)
+        
+    async def _generate_unique(self) -> Any:
+        """Generate a sample, regenerating near-duplicates of earlier queries.
+        
+        Raises:
+            PipelineError: If every attempt produced a near-duplicate.
+        """
+        attempts = self.dedup_retries + 1 if self.dedup is not None else 1
+        for _ in range(attempts):
+            query, reference = await self._call(self.generator.generate)
+            if self.dedup is None or not await self.dedup.ais_duplicate(query):
+                return query, reference
+        raise PipelineError(f"Near-duplicate query after {attempts} attempts")
+        
+    async def _stage(
+        self,
+        stage: str,
+        handler: Callable[[Dict[str, Any]], Awaitable[None]],
+        source: asyncio.Queue,
+        output: asyncio.Queue
+    ) -> None:
+        """Apply ``handler`` to every sample flowing through a stage."""
+        stats = self._stats[stage]
+        
+        async def worker() -> None:
+            while True:
+                sample = await source.get()
+                if sample is _END:
+                    # Let the stage's other workers see the end marker too
+                    await source.put(_END)
+                    return
+                if "error" not in sample and self.STAGE_OUTPUTS[stage] not in sample:
+                    start = time.monotonic()
+                    try:
+                        await handler(sample)
+                        await self._checkpoint(sample, stage, [self.STAGE_OUTPUTS[stage]])
+                        failed = False
+                    except Exception as e:
+                        self._fail(sample, stage, e)
+                        failed = True
+                    latency = time.monotonic() - start
+                    stats.record(latency, failed=failed)
+                    sample["metadata"]["latency"][stage] = latency
+                await output.put(sample)
+                
+        await self._run_workers(stage, worker, output)
+        
+    async def _mine_stage(
+        self,
+        miner_func: Callable[[List[str]], Any],
+        source: asyncio.Queue,
+        output: asyncio.Queue
+    ) -> None:
+        """Send queries to the miner in opportunistic micro-batches."""
+        stats = self._stats["mine"]
+        
+        async def worker() -> None:
+            done = False
+            while not done:
+                batch = [await source.get()]
+                # Take whatever else is already waiting, without waiting for more
+                while batch[-1] is not _END and len(batch) < self.miner_batch_size:
+                    try:
+                        batch.append(source.get_nowait())
+                    except asyncio.QueueEmpty:
+                        break
+                if batch[-1] is _END:
+                    batch.pop()
+                    await source.put(_END)
+                    done = True
+                    
+                pending = [sample for sample in batch if "error" not in sample and "generated" not in sample]
+                if pending:
+                    queries = [sample.get("noised_query", sample["query"]) for sample in pending]
+                    start = time.monotonic()
+                    try:
+                        answers = await self._call(miner_func, queries)
+                        if len(answers) != len(queries):
+                            raise PipelineError(
+                                f"Miner returned {len(answers)} answers for {len(queries)} queries"
+                            )
+                        for sample, answer in zip(pending, answers):
+                            sample["generated"] = answer
+                        for sample in pending:
+                            await self._checkpoint(sample, "mine", ["generated"])
+                        failed = False
+                    except Exception as e:
+                        for sample in pending:
+                            self._fail(sample, "mine", e)
+                        failed = True
+                    latency = time.monotonic() - start
+                    stats.record(latency, count=len(pending), failed=failed)
+                    for sample in pending:
+                        sample["metadata"]["latency"]["mine"] = latency
+                        
+                for sample in batch:
+                    await output.put(sample)
+                    
+        await self._run_workers("mine", worker, output)
+        
+    async def _noise(self, sample: Dict[str, Any]) -> None:
+        """Apply the noiser to a sample's query."""
+        sample["noised_query"] = await self.noiser.aaugment(sample["query"])
+        sample["metadata"]["noiser"] = self.noiser.get_augmentation_metadata()
+        
+    async def _validate(self, sample: Dict[str, Any]) -> None:
+        """Score a sample's miner answer against its reference."""
+        sample["score"] = await self.validator.ascore(
+            sample.get("noised_query", sample["query"]),
+            sample["reference"],
+            sample["generated"]
+        )
+        sample["metadata"]["validator"] = self.validator.get_validation_metadata()
+        
+    async def _collect(self, source: asyncio.Queue, results: List[Optional[Dict[str, Any]]]) -> None:
+        """Place finished samples at their generation index and flush them out."""
+        buffer = []
+        while True:
+            sample = await source.get()
+            if sample is _END:
+                await self._flush(buffer)
+                return
+            results[sample.pop("index")] = sample
+            buffer.append(sample)
+            if len(buffer) >= self.output_flush_size:
+                await self._flush(buffer)
+                buffer = []
+                
+    async def _flush(self, samples: List[Dict[str, Any]]) -> None:
+        """Append finished samples to the output file, then mark them done.
+        
+        Writing the output before the journal entry makes a crash in between
+        harmless: the restarted run redoes the sample and the append skips it,
+        since its ID is already in the file.
+        
+        Failed samples are only journaled as failed, without their error, so
+        a resumed run retries them from the last stage they completed.
+        """
+        if not samples:
+            return
+        succeeded = [sample for sample in samples if "error" not in sample]
+        if self.output_path:
+            fresh = [sample for sample in succeeded if sample["id"] not in self._written_ids]
+            if fresh:
+                await asyncio.to_thread(save_results, fresh, self.output_path, "jsonl", True)
+                self._written_ids.update(sample["id"] for sample in fresh)
+        if self._journal is not None:
+            entries = [
+                (sample["id"], RunJournal.FAILED, None) if "error" in sample
+                else (sample["id"], RunJournal.DONE, sample)
+                for sample in samples
+            ]
+            await asyncio.to_thread(self._journal.record_many, entries)
+            
+    def _fail(self, sample: Dict[str, Any], stage: str, error: Exception) -> None:
+        """Mark a sample as failed; later stages pass it through untouched."""
+        sample["error"] = str(error)
+        sample["failed_stage"] = stage
+        self.logger.warning(f"Sample {sample['index']} failed in {stage}: {str(error)}")
+        
+    def get_stage_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get per-stage throughput and latency for the last run.
+        
+        Returns:
+            Mapping of stage name to its statistics (see ``StageStats.to_dict``).
+        """
+        return {name: stats.to_dict() for name, stats in self._stats.items()}
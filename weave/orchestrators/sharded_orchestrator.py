@@ -0,0 +1,378 @@
+"""Multi-process sharded orchestrator for the Weave framework."""
+
+import os
+import asyncio
+import hashlib
+import logging
+import random
+import multiprocessing
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from pathlib import Path
+from typing import Any, AsyncGenerator, Callable, Dict, List, Optional, Tuple, Union
+
+from ..core import (
+    BaseOrchestrator,
+    BaseGenerator,
+    BaseNoiser,
+    BaseValidator,
+    PipelineError,
+    InvalidArgumentError,
+    save_results
+)
+from .default_orchestrator import DefaultOrchestrator
+
+# Components of the worker process, set once by _init_worker
+_WORKER_STATE: Dict[str, Any] = {}
+
+def _init_worker(
+    components: Optional[Tuple[BaseGenerator, BaseValidator, Optional[BaseNoiser]]],
+    component_factory: Optional[Callable[[], Tuple[BaseGenerator, BaseValidator, Optional[BaseNoiser]]]],
+    pipeline_config: Dict[str, Any],
+    started: Any = None
+) -> None:
+    """Build the pipeline components once per worker process."""
+    if component_factory is not None:
+        components = component_factory()
+    _WORKER_STATE["components"] = components
+    _WORKER_STATE["pipeline_config"] = pipeline_config
+    _WORKER_STATE["started"] = started
+
+def derive_shard_seed(seed: int, shard_index: int) -> int:
+    """Derive the seed of a shard from a run seed.
+    
+    Args:
+        seed: Run seed.
+        shard_index: Index of the shard within the run.
+        
+    Returns:
+        64-bit seed, stable across runs and platforms.
+    """
+    digest = hashlib.sha256(f"{seed}:{shard_index}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big")
+    
+def seed_shard(seed: int) -> None:
+    """Seed every random number generator the components may draw from."""
+    random.seed(seed)
+    try:
+        import numpy as np
+        np.random.seed(seed % 2**32)
+    except ImportError:
+        pass
+
+def shard_pipeline_config(pipeline_config: Dict[str, Any], shard_index: int) -> Dict[str, Any]:
+    """Give a shard's DefaultOrchestrator sample IDs and a journal of its own.
+    
+    Every shard numbers its samples from 0, so shards sharing a ``run_id``
+    and ``journal_path`` would restore each other's samples on resume. The
+    shard's IDs get a ``-shard<index>`` suffix and its journal is written to
+    ``<stem>.shard<index><suffix>`` next to the configured path.
+    
+    Args:
+        pipeline_config: Configuration of the per-shard orchestrator.
+        shard_index: Index of the shard within the run.
+        
+    Returns:
+        New configuration for the shard.
+    """
+    config = dict(pipeline_config)
+    run_id = config.get("run_id")
+    config["run_id"] = f"{run_id}-shard{shard_index}" if run_id else f"shard{shard_index}"
+    if config.get("journal_path"):
+        path = Path(config["journal_path"])
+        config["journal_path"] = str(path.with_name(f"{path.stem}.shard{shard_index}{path.suffix}"))
+    return config
+    
+def _run_shard(
+    shard_index: int,
+    count: int,
+    seed: int,
+    miner_func: Callable[[List[str]], Any]
+) -> List[Dict[str, Any]]:
+    """Run one shard through a DefaultOrchestrator in the worker process."""
+    started = _WORKER_STATE.get("started")
+    if started is not None:
+        # Shared memory is written at once, so the flag survives this worker crashing
+        started[shard_index] = 1
+    seed_shard(seed)
+    generator, validator, noiser = _WORKER_STATE["components"]
+    config = shard_pipeline_config(_WORKER_STATE["pipeline_config"], shard_index)
+    orchestrator = DefaultOrchestrator(generator, validator, noiser=noiser, config=config)
+    return asyncio.run(orchestrator.run_batch(miner_func, count))
+
+def _single_miner(miner_func: Callable[[str], Any], queries: List[str]) -> List[Any]:
+    """Adapt a per-query miner to the batch interface (picklable)."""
+    return [miner_func(query) for query in queries]
+
+class ShardedOrchestrator(BaseOrchestrator):
+    """Shards sample generation across a pool of worker processes.
+    
+    The samples of a batch are split into fixed-size shards of consecutive
+    indices. Each shard runs through a ``DefaultOrchestrator`` inside a worker
+    process, so CPU-bound stages (symbolic generation with sympy, rule-based
+    validation) use every core instead of sharing one GIL. Results are merged
+    back into a single stream in sample order.
+    
+    Every shard seeds ``random`` (and numpy, if installed) with a seed
+    derived from the run seed and the shard index. Since the shard layout
+    depends only on ``shard_size``, a run is reproducible regardless of the
+    number of workers. Within a shard, the generate stage runs with one
+    worker by default so its random draws happen in a fixed order.
+    
+    If a worker process dies, the pool is rebuilt and every unfinished shard
+    is dispatched again, up to ``max_shard_retries`` times per shard.
+    
+    Components and ``miner_func`` are sent to the workers by pickling, so
+    they must be picklable (``miner_func`` should be a module-level function).
+    Components holding unpicklable state (open sessions, locks) can instead
+    be built in each worker by a ``component_factory``.
+    
+    Configuration:
+        - ``max_workers``: number of worker processes (default: CPU count).
+        - ``shard_size``: samples per shard (default 16).
+        - ``seed``: run seed the shard seeds are derived from (default 0).
+        - ``max_shard_retries``: re-dispatches allowed per shard after a
+          worker crash (default 2).
+        - ``start_method``: multiprocessing start method (default: the
+          platform default).
+        - ``component_factory``: optional picklable callable returning
+          ``(generator, validator, noiser)``, called once per worker.
+        - ``pipeline``: configuration of the per-shard ``DefaultOrchestrator``.
+          Each shard gets its own ``run_id`` and ``journal_path`` derived from
+          it (see ``shard_pipeline_config``); ``output_path`` is not allowed
+          here, since shards would append to it concurrently.
+        - ``output_path``: optional jsonl file merged records are appended to,
+          in sample order.
+        - ``run_id``: optional prefix for sample IDs (``"<run_id>-<index>"``).
+    """
+    
+    def __init__(
+        self,
+        generator: Optional[BaseGenerator] = None,
+        validator: Optional[BaseValidator] = None,
+        noiser: Optional[BaseNoiser] = None,
+        config: Optional[Dict[str, Any]] = None
+    ):
+        """Initialize the orchestrator.
+        
+        Args:
+            generator: Generator producing (query, reference) samples. May be
+                None when ``component_factory`` is configured.
+            validator: Validator scoring miner answers. May be None when
+                ``component_factory`` is configured.
+            noiser: Optional noiser applied to each query before mining.
+            config: Orchestrator configuration (see class docstring).
+            
+        Raises:
+            InvalidArgumentError: If neither components nor a factory are given,
+                or the pipeline configuration sets ``output_path``.
+        """
+        super().__init__(generator, validator, noiser=noiser, config=config)
+        self.logger = logging.getLogger(__name__)
+        self.max_workers = self.config.get("max_workers") or os.cpu_count() or 1
+        self.shard_size = self.config.get("shard_size", 16)
+        self.seed = self.config.get("seed", 0)
+        self.max_shard_retries = self.config.get("max_shard_retries", 2)
+        self.start_method = self.config.get("start_method")
+        self.component_factory = self.config.get("component_factory")
+        self.output_path = self.config.get("output_path")
+        self.run_id = self.config.get("run_id")
+        
+        self.pipeline_config = dict(self.config.get("pipeline", {}))
+        if self.pipeline_config.get("output_path"):
+            raise InvalidArgumentError(
+                "pipeline", "output_path is not supported per shard; use the orchestrator's output_path"
+            )
+        concurrency = dict(self.pipeline_config.get("concurrency", {}))
+        concurrency.setdefault("generate", 1)
+        self.pipeline_config["concurrency"] = concurrency
+        
+        if self.component_factory is None and (generator is None or validator is None):
+            raise InvalidArgumentError(
+                "component_factory", "required when no generator and validator are given"
+            )
+            
+    def validate_config(self) -> bool:
+        """Check that worker count, shard size and retry budget are valid."""
+        return self.max_workers >= 1 and self.shard_size >= 1 and self.max_shard_retries >= 0
+        
+    def validate_pipeline(self) -> bool:
+        """Validate the pipeline, skipping components built by a factory."""
+        if self.component_factory is not None:
+            return self.validate_config()
+        return super().validate_pipeline()
+        
+    def shard_seed(self, shard_index: int) -> int:
+        """Derive the seed of a shard from the run seed.
+        
+        Args:
+            shard_index: Index of the shard within the run.
+            
+        Returns:
+            64-bit seed, stable across runs and platforms.
+        """
+        return derive_shard_seed(self.seed, shard_index)
+        
+    def _new_pool(self, num_shards: int) -> Tuple[ProcessPoolExecutor, Any]:
+        """Start a worker pool with the components installed in each worker.
+        
+        Returns:
+            The pool and a shared array in which workers flag every shard they
+            start, so a crash can be blamed on the shards actually running.
+        """
+        components = None if self.component_factory else (self.generator, self.validator, self.noiser)
+        context = multiprocessing.get_context(self.start_method)
+        started = context.RawArray("b", num_shards)
+        pool = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(components, self.component_factory, self.pipeline_config, started)
+        )
+        return pool, started
+        
+    async def run_single(
+        self,
+        miner_func: Callable[[str], Union[str, Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """Run the pipeline for a single sample in a worker process.
+        
+        Args:
+            miner_func: Picklable callable that takes a query string and
+                returns an answer.
+                
+        Returns:
+            Sample record (see ``DefaultOrchestrator.run_batch``).
+        """
+        results = await self.run_batch(partial(_single_miner, miner_func), 1)
+        return results[0]
+        
+    async def run_batch(
+        self,
+        miner_func: Callable[[List[str]], List[Union[str, Dict[str, Any]]]],
+        batch_size: int
+    ) -> List[Dict[str, Any]]:
+        """Run the pipeline for ``batch_size`` samples across worker processes.
+        
+        Args:
+            miner_func: Picklable callable that takes a list of queries and
+                returns one answer per query.
+            batch_size: Number of samples to produce.
+            
+        Returns:
+            One record per sample, in sample order (see
+            ``DefaultOrchestrator.run_batch``), each with its ``shard`` in
+            ``metadata``.
+            
+        Raises:
+            InvalidArgumentError: If batch_size is negative.
+            PipelineError: If a shard fails or keeps crashing its worker.
+        """
+        return [record async for record in self.iter_batch(miner_func, batch_size)]
+        
+    async def iter_batch(
+        self,
+        miner_func: Callable[[List[str]], List[Union[str, Dict[str, Any]]]],
+        batch_size: int
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """Stream sample records in sample order as shards complete.
+        
+        A shard that finishes early is held back until every shard before it
+        has been emitted. Records are appended to ``output_path`` (if set) as
+        they are emitted.
+        
+        Args:
+            miner_func: Picklable callable that takes a list of queries and
+                returns one answer per query.
+            batch_size: Number of samples to produce.
+            
+        Yields:
+            Sample records in sample order.
+            
+        Raises:
+            InvalidArgumentError: If batch_size is negative.
+            PipelineError: If a shard fails or keeps crashing its worker.
+        """
+        if batch_size < 0:
+            raise InvalidArgumentError("batch_size", "must be non-negative")
+            
+        shards = {
+            shard_index: (start, min(self.shard_size, batch_size - start))
+            for shard_index, start in enumerate(range(0, batch_size, self.shard_size))
+        }
+        finished: Dict[int, List[Dict[str, Any]]] = {}
+        next_shard = 0
+        
+        async for shard_index, records in self._dispatch(miner_func, shards):
+            start = shards[shard_index][0]
+            for offset, record in enumerate(records):
+                index = start + offset
+                record["id"] = f"{self.run_id}-{index}" if self.run_id else str(index)
+                record["metadata"]["shard"] = shard_index
+            finished[shard_index] = records
+            
+            while next_shard in finished:
+                ready = finished.pop(next_shard)
+                next_shard += 1
+                if self.output_path and ready:
+                    await asyncio.to_thread(save_results, ready, self.output_path, "jsonl", True, "id")
+                for record in ready:
+                    yield record
+                    
+    async def _dispatch(
+        self,
+        miner_func: Callable[[List[str]], Any],
+        shards: Dict[int, Tuple[int, int]]
+    ) -> AsyncGenerator[Tuple[int, List[Dict[str, Any]]], None]:
+        """Run shards on the pool, rebuilding it and re-dispatching after crashes."""
+        remaining = dict(shards)
+        attempts: Dict[int, int] = defaultdict(int)
+        
+        while remaining:
+            pool, started = self._new_pool(max(shards) + 1)
+            loop = asyncio.get_running_loop()
+            futures = {
+                loop.run_in_executor(
+                    pool, _run_shard, shard_index, count, self.shard_seed(shard_index), miner_func
+                ): shard_index
+                for shard_index, (_, count) in remaining.items()
+            }
+            crashed = []
+            completed = False
+            try:
+                pending = set(futures)
+                while pending and not crashed:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for future in done:
+                        shard_index = futures[future]
+                        try:
+                            records = future.result()
+                        except BrokenProcessPool:
+                            crashed.append(shard_index)
+                            continue
+                        except Exception as e:
+                            raise PipelineError(f"Shard {shard_index} failed: {str(e)}")
+                        del remaining[shard_index]
+                        yield shard_index, records
+                completed = not crashed
+            finally:
+                # Waiting lets the idle workers exit cleanly; it is skipped when a
+                # worker died or shards are being abandoned mid-run
+                pool.shutdown(wait=completed, cancel_futures=not completed)
+                
+            if crashed:
+                # Any shard that was running may have been the one that killed the
+                # worker; queued shards are not charged. If none had started, the
+                # worker died on start-up and every shard is charged so the run ends.
+                suspects = [shard_index for shard_index in remaining if started[shard_index]]
+                for shard_index in suspects or list(remaining):
+                    attempts[shard_index] += 1
+                    if attempts[shard_index] > self.max_shard_retries:
+                        raise PipelineError(
+                            f"Shard {shard_index} crashed its worker {attempts[shard_index]} times"
+                        )
+                self.logger.warning(
+                    f"Worker process died; re-dispatching {len(remaining)} unfinished shards"
+                )
@@ -0,0 +1,576 @@
+"""Lease-based work queue for running pipelines across several machines."""
+
+import os
+import json
+import time
+import uuid
+import socket
+import asyncio
+import inspect
+import logging
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+from ..core import (
+    BaseOrchestrator,
+    PipelineError,
+    StorageError,
+    InvalidArgumentError,
+    save_results
+)
+from .sharded_orchestrator import derive_shard_seed, seed_shard
+
+class WorkQueue:
+    """SQLite-backed queue of sample shards leased to workers.
+    
+    A task is one shard of a run: a range of consecutive sample indices plus
+    the seed to generate them with. Workers lease tasks for
+    ``lease_timeout`` seconds and extend the lease with heartbeats while
+    they work. A lease that expires (the worker died or lost the file
+    system) returns its task to the queue, until ``max_attempts`` leases have
+    been handed out, after which the task is marked failed.
+    
+    All state lives in one SQLite file, so any machine that can reach the
+    file can take part; no broker service is needed. Every operation runs in
+    its own short ``BEGIN IMMEDIATE`` transaction. On network file systems,
+    keep SQLite's default rollback journal (WAL needs shared memory) and make
+    sure the file system honours POSIX locks.
+    """
+    
+    PENDING = "pending"
+    LEASED = "leased"
+    DONE = "done"
+    FAILED = "failed"
+    
+    def __init__(
+        self,
+        path: Union[str, Path],
+        lease_timeout: float = 60.0,
+        max_attempts: int = 3,
+        busy_timeout: float = 30.0
+    ):
+        """Open (and create if needed) a work queue.
+        
+        Args:
+            path: SQLite database file.
+            lease_timeout: Seconds a lease lasts without a heartbeat.
+            max_attempts: Leases handed out per task before it is marked failed.
+            busy_timeout: Seconds to wait for another process's lock.
+            
+        Raises:
+            StorageError: If the database cannot be opened.
+        """
+        self.path = Path(path)
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        self.busy_timeout = busy_timeout
+        
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._transaction() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS tasks (
+                    id TEXT PRIMARY KEY,
+                    run_id TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    worker TEXT,
+                    lease_expires REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    result TEXT,
+                    error TEXT,
+                    updated REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, run_id)")
+            
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run statements in one immediate (write-locked) transaction."""
+        try:
+            conn = sqlite3.connect(str(self.path), timeout=self.busy_timeout, isolation_level=None)
+        except sqlite3.Error as e:
+            raise StorageError(f"Error opening work queue {self.path}: {str(e)}")
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            raise StorageError(f"Work queue operation failed: {str(e)}")
+        finally:
+            conn.close()
+            
+    def enqueue(self, run_id: str, payloads: List[Dict[str, Any]]) -> List[str]:
+        """Add tasks for a run. Re-enqueuing an existing task is a no-op.
+        
+        Args:
+            run_id: Run the tasks belong to.
+            payloads: JSON-serializable task descriptions, each with a
+                ``shard`` index.
+                
+        Returns:
+            Task IDs, in payload order.
+        """
+        now = time.time()
+        task_ids = [f"{run_id}/{payload['shard']:06d}" for payload in payloads]
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO tasks (id, run_id, payload, status, updated) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (task_id, run_id, json.dumps(payload), self.PENDING, now)
+                    for task_id, payload in zip(task_ids, payloads)
+                ]
+            )
+        return task_ids
+        
+    def _expire_leases(self, conn: sqlite3.Connection, now: float) -> None:
+        """Return expired leases to the queue, or fail tasks out of attempts."""
+        conn.execute(
+            "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+            "worker = NULL, lease_expires = NULL, error = 'lease expired', updated = ? "
+            "WHERE status = ? AND lease_expires < ?",
+            (self.max_attempts, self.FAILED, self.PENDING, now, self.LEASED, now)
+        )
+        
+    def lease(self, worker_id: str, limit: int = 1, run_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Lease up to ``limit`` pending tasks.
+        
+        Args:
+            worker_id: Identifier of the leasing worker.
+            limit: Maximum number of tasks to lease.
+            run_id: Only lease tasks of this run.
+            
+        Returns:
+            Leased tasks, each with ``id``, ``run_id``, ``payload`` and
+            ``attempts``.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            self._expire_leases(conn, now)
+            query = "SELECT id, run_id, payload, attempts FROM tasks WHERE status = ?"
+            params: List[Any] = [self.PENDING]
+            if run_id is not None:
+                query += " AND run_id = ?"
+                params.append(run_id)
+            rows = conn.execute(query + " ORDER BY id LIMIT ?", params + [limit]).fetchall()
+            conn.executemany(
+                "UPDATE tasks SET status = ?, worker = ?, lease_expires = ?, "
+                "attempts = attempts + 1, updated = ? WHERE id = ?",
+                [(self.LEASED, worker_id, now + self.lease_timeout, now, row["id"]) for row in rows]
+            )
+        return [
+            {
+                "id": row["id"],
+                "run_id": row["run_id"],
+                "payload": json.loads(row["payload"]),
+                "attempts": row["attempts"] + 1
+            }
+            for row in rows
+        ]
+        
+    def heartbeat(self, task_id: str, worker_id: str) -> bool:
+        """Extend a lease.
+        
+        Returns:
+            False if the worker no longer holds the lease (it expired and the
+            task was handed to someone else).
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET lease_expires = ?, updated = ? WHERE id = ? AND worker = ? AND status = ?",
+                (now + self.lease_timeout, now, task_id, worker_id, self.LEASED)
+            )
+            return cursor.rowcount == 1
+            
+    def complete(self, task_id: str, worker_id: str, result: Optional[Dict[str, Any]] = None) -> bool:
+        """Mark a leased task done.
+        
+        Args:
+            task_id: Task to complete.
+            worker_id: Worker holding the lease.
+            result: JSON-serializable result description (e.g. output path).
+            
+        Returns:
+            False if the worker no longer held the lease.
+        """
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET status = ?, result = ?, error = NULL, lease_expires = NULL, updated = ? "
+                "WHERE id = ? AND worker = ? AND status = ?",
+                (self.DONE, json.dumps(result or {}), time.time(), task_id, worker_id, self.LEASED)
+            )
+            return cursor.rowcount == 1
+            
+    def fail(self, task_id: str, worker_id: str, error: str) -> bool:
+        """Release a leased task after an error.
+        
+        The task goes back to the queue unless it is out of attempts.
+        
+        Returns:
+            False if the worker no longer held the lease.
+        """
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+                "worker = NULL, lease_expires = NULL, error = ?, updated = ? "
+                "WHERE id = ? AND worker = ? AND status = ?",
+                (self.max_attempts, self.FAILED, self.PENDING, error, time.time(), task_id, worker_id, self.LEASED)
+            )
+            return cursor.rowcount == 1
+            
+    def requeue_expired(self) -> None:
+        """Return expired leases to the queue without leasing anything."""
+        with self._transaction() as conn:
+            self._expire_leases(conn, time.time())
+            
+    def get_tasks(self, run_id: str) -> List[Dict[str, Any]]:
+        """Get every task of a run, in shard order.
+        
+        Returns:
+            Tasks with ``id``, ``payload``, ``status``, ``worker``,
+            ``attempts``, ``result`` and ``error``.
+        """
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT id, payload, status, worker, attempts, result, error FROM tasks "
+                "WHERE run_id = ? ORDER BY id",
+                (run_id,)
+            ).fetchall()
+        return [
+            {
+                "id": row["id"],
+                "payload": json.loads(row["payload"]),
+                "status": row["status"],
+                "worker": row["worker"],
+                "attempts": row["attempts"],
+                "result": json.loads(row["result"]) if row["result"] else None,
+                "error": row["error"]
+            }
+            for row in rows
+        ]
+        
+    def get_stats(self, run_id: Optional[str] = None) -> Dict[str, int]:
+        """Count tasks per status.
+        
+        Args:
+            run_id: Only count tasks of this run.
+            
+        Returns:
+            Mapping of status to task count.
+        """
+        query = "SELECT status, COUNT(*) AS n FROM tasks"
+        params: List[Any] = []
+        if run_id is not None:
+            query += " WHERE run_id = ?"
+            params.append(run_id)
+        with self._transaction() as conn:
+            rows = conn.execute(query + " GROUP BY status", params).fetchall()
+        stats = {status: 0 for status in (self.PENDING, self.LEASED, self.DONE, self.FAILED)}
+        stats.update({row["status"]: row["n"] for row in rows})
+        return stats
+        
+    def __repr__(self) -> str:
+        """Return string representation of the queue."""
+        return f"WorkQueue(path={self.path}, lease_timeout={self.lease_timeout})"
+
+def shard_output_path(output_dir: Union[str, Path], run_id: str, shard: int) -> Path:
+    """Path of the jsonl file holding one shard's records."""
+    return Path(output_dir) / run_id / f"shard-{shard:06d}.jsonl"
+
+class QueueWorker:
+    """Pulls shards from a ``WorkQueue`` and runs them through an orchestrator.
+    
+    With a ``miner_func`` each shard goes through
+    ``orchestrator.run_batch``. Without one, the worker only builds the
+    dataset: it calls the generator's ``batch_generate`` and records each
+    (query, reference) pair.
+    
+    Each shard's records are written atomically to their own file under
+    ``output_dir`` before the task is completed, so a shard re-run after a
+    lost lease simply replaces the file.
+    
+    While a shard runs, an orchestrator with a ``run_id`` (such as
+    ``DefaultOrchestrator``) gets ``"<run_id>-shard<index>"``, so the samples
+    it journals are not mistaken for another shard's on resume. A journal is
+    only safe to share between shards of one worker; give every worker
+    its own orchestrator and ``journal_path``.
+    """
+    
+    def __init__(
+        self,
+        queue: WorkQueue,
+        orchestrator: BaseOrchestrator,
+        output_dir: Union[str, Path],
+        miner_func: Optional[Callable[[List[str]], Any]] = None,
+        worker_id: Optional[str] = None,
+        heartbeat_interval: Optional[float] = None
+    ):
+        """Initialize the worker.
+        
+        Args:
+            queue: Work queue to lease shards from.
+            orchestrator: Orchestrator running each shard.
+            output_dir: Directory shard outputs are written under.
+            miner_func: Miner passed to ``run_batch``. If None, shards only
+                generate samples.
+            worker_id: Identifier recorded on leases (default:
+                ``"<host>-<pid>-<random>"``).
+            heartbeat_interval: Seconds between heartbeats (default: a third
+                of the lease timeout).
+        """
+        self.queue = queue
+        self.orchestrator = orchestrator
+        self.output_dir = Path(output_dir)
+        self.miner_func = miner_func
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.heartbeat_interval = heartbeat_interval or queue.lease_timeout / 3
+        self.logger = logging.getLogger(__name__)
+        self.completed = 0
+        
+    async def run(
+        self,
+        run_id: Optional[str] = None,
+        max_tasks: Optional[int] = None,
+        poll_interval: float = 5.0,
+        idle_timeout: Optional[float] = 0.0
+    ) -> int:
+        """Process shards until the queue is drained.
+        
+        Args:
+            run_id: Only work on this run.
+            max_tasks: Stop after this many shards.
+            poll_interval: Seconds between polls while the queue is empty.
+            idle_timeout: Seconds to keep polling an empty queue before
+                returning (None polls forever). Leased shards of other
+                workers may still come back if their leases expire.
+                
+        Returns:
+            Number of shards this call completed.
+        """
+        completed = 0
+        idle_since = time.monotonic()
+        while max_tasks is None or completed < max_tasks:
+            tasks = await asyncio.to_thread(self.queue.lease, self.worker_id, 1, run_id)
+            if not tasks:
+                if idle_timeout is not None and time.monotonic() - idle_since >= idle_timeout:
+                    break
+                await asyncio.sleep(poll_interval)
+                continue
+                
+            if await self.process(tasks[0]):
+                completed += 1
+            idle_since = time.monotonic()
+        return completed
+        
+    async def process(self, task: Dict[str, Any]) -> bool:
+        """Run one leased shard, heartbeating until it finishes.
+        
+        Args:
+            task: Task returned by ``WorkQueue.lease``.
+            
+        Returns:
+            True if the shard was completed by this worker.
+        """
+        lease_lost = asyncio.Event()
+        heartbeat = asyncio.ensure_future(self._heartbeat(task["id"], lease_lost))
+        try:
+            records = await self._run_shard(task["run_id"], task["payload"])
+        except Exception as e:
+            self.logger.warning(f"Shard {task['id']} failed on attempt {task['attempts']}: {str(e)}")
+            await asyncio.to_thread(self.queue.fail, task["id"], self.worker_id, str(e))
+            return False
+        finally:
+            heartbeat.cancel()
+            
+        if lease_lost.is_set():
+            self.logger.warning(f"Lease on shard {task['id']} expired; discarding its results")
+            return False
+            
+        payload = task["payload"]
+        path = shard_output_path(self.output_dir, task["run_id"], payload["shard"])
+        await asyncio.to_thread(save_results, records, path, "jsonl")
+        if not await asyncio.to_thread(self.queue.complete, task["id"], self.worker_id, {"path": str(path)}):
+            self.logger.warning(f"Lease on shard {task['id']} was lost before completion")
+            return False
+        self.completed += 1
+        return True
+        
+    async def _heartbeat(self, task_id: str, lease_lost: asyncio.Event) -> None:
+        """Keep a lease alive until cancelled."""
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            if not await asyncio.to_thread(self.queue.heartbeat, task_id, self.worker_id):
+                lease_lost.set()
+                return
+                
+    async def _run_shard(self, run_id: str, payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Produce the records of one shard."""
+        start, count = payload["start"], payload["count"]
+        seed_shard(payload["seed"])
+        
+        if self.miner_func is not None:
+            # run_batch numbers samples from 0 for every shard
+            namespaced = hasattr(self.orchestrator, "run_id")
+            if namespaced:
+                base_run_id = self.orchestrator.run_id
+                self.orchestrator.run_id = f"{run_id}-shard{payload['shard']}"
+            try:
+                records = await self._maybe_await(self.orchestrator.run_batch(self.miner_func, count))
+            finally:
+                if namespaced:
+                    self.orchestrator.run_id = base_run_id
+        else:
+            samples = await self._maybe_await(self.orchestrator.generator.batch_generate(count))
+            records = []
+            for sample in samples:
+                if isinstance(sample, Exception):
+                    records.append({"error": str(sample), "failed_stage": "generate"})
+                else:
+                    query, reference = sample
+                    records.append({"query": query, "reference": reference})
+                    
+        for offset, record in enumerate(records):
+            record["id"] = f"{run_id}-{start + offset}"
+            record.setdefault("metadata", {})["shard"] = payload["shard"]
+        return records
+        
+    @staticmethod
+    async def _maybe_await(result: Any) -> Any:
+        """Await a result if a component returned an awaitable."""
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+class QueueCoordinator:
+    """Splits runs into shards, tracks them and merges their outputs."""
+    
+    def __init__(self, queue: WorkQueue, output_dir: Union[str, Path]):
+        """Initialize the coordinator.
+        
+        Args:
+            queue: Work queue shared with the workers.
+            output_dir: Directory the workers write shard outputs under.
+        """
+        self.queue = queue
+        self.output_dir = Path(output_dir)
+        self.logger = logging.getLogger(__name__)
+        
+    def submit(self, run_id: str, batch_size: int, shard_size: int = 64, seed: int = 0) -> List[str]:
+        """Enqueue a run of ``batch_size`` samples.
+        
+        Submitting the same run again adds nothing, so a restarted
+        coordinator can safely resubmit.
+        
+        Args:
+            run_id: Unique run identifier.
+            batch_size: Number of samples in the run.
+            shard_size: Samples per shard.
+            seed: Run seed each shard's seed is derived from.
+            
+        Returns:
+            Task IDs of the run's shards.
+            
+        Raises:
+            InvalidArgumentError: If batch_size is negative or shard_size is
+                not positive.
+        """
+        if batch_size < 0:
+            raise InvalidArgumentError("batch_size", "must be non-negative")
+        if shard_size < 1:
+            raise InvalidArgumentError("shard_size", "must be at least 1")
+            
+        payloads = [
+            {
+                "shard": shard,
+                "start": start,
+                "count": min(shard_size, batch_size - start),
+                "seed": derive_shard_seed(seed, shard)
+            }
+            for shard, start in enumerate(range(0, batch_size, shard_size))
+        ]
+        return self.queue.enqueue(run_id, payloads)
+        
+    def progress(self, run_id: str) -> Dict[str, int]:
+        """Count a run's shards per status."""
+        return self.queue.get_stats(run_id)
+        
+    async def wait(self, run_id: str, poll_interval: float = 5.0, timeout: Optional[float] = None) -> Dict[str, int]:
+        """Wait until every shard of a run is done or failed.
+        
+        Expired leases are returned to the queue while waiting, so a run
+        finishes even if workers die and others pick up their shards.
+        
+        Args:
+            run_id: Run to wait for.
+            poll_interval: Seconds between progress checks.
+            timeout: Maximum seconds to wait (None waits forever).
+            
+        Returns:
+            Final per-status shard counts.
+            
+        Raises:
+            PipelineError: If the timeout expires first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            await asyncio.to_thread(self.queue.requeue_expired)
+            stats = await asyncio.to_thread(self.queue.get_stats, run_id)
+            if stats[WorkQueue.PENDING] == 0 and stats[WorkQueue.LEASED] == 0:
+                return stats
+            if deadline is not None and time.monotonic() >= deadline:
+                raise PipelineError(f"Run {run_id} did not finish in {timeout}s: {stats}")
+            await asyncio.sleep(poll_interval)
+            
+    def merge(self, run_id: str, output_path: Union[str, Path]) -> int:
+        """Concatenate a run's shard outputs into one file, in sample order.
+        
+        The merged file is written to a temporary file and renamed into
+        place, so it appears complete or not at all.
+        
+        Args:
+            run_id: Run to merge.
+            output_path: jsonl file to write.
+            
+        Returns:
+            Number of records written.
+            
+        Raises:
+            PipelineError: If any shard is not done.
+            StorageError: If the output cannot be written.
+        """
+        tasks = self.queue.get_tasks(run_id)
+        unfinished = [task["id"] for task in tasks if task["status"] != WorkQueue.DONE]
+        if unfinished:
+            raise PipelineError(f"Cannot merge run {run_id}: {len(unfinished)} shards not done ({unfinished[:5]})")
+            
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = output_path.with_name(f".{output_path.name}.{os.getpid()}.tmp")
+        records = 0
+        try:
+            with open(temp_path, "wb") as out:
+                for task in sorted(tasks, key=lambda task: task["payload"]["shard"]):
+                    with open(task["result"]["path"], "rb") as shard_file:
+                        for line in shard_file:
+                            out.write(line)
+                            records += 1
+                out.flush()
+                os.fsync(out.fileno())
+            os.replace(temp_path, output_path)
+        except OSError as e:
+            raise StorageError(f"Error merging run {run_id}: {str(e)}")
+        finally:
+            if temp_path.exists():
+                temp_path.unlink()
+                
+        self.logger.info(f"Merged {len(tasks)} shards ({records} records) of run {run_id} into {output_path}")
+        return records